@@ -1,27 +1,78 @@
 """The Soundbeats component."""
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Awaitable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
 import logging
-from typing import Any
+from pathlib import Path
+import time
+from typing import Any, TypeVar
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.components.frontend import async_register_built_in_panel
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.components import websocket_api
-from homeassistant.components.http import StaticPathConfig
+from homeassistant.helpers.event import async_track_time_interval
 
-from .const import DOMAIN
+from .analytics import GameAnalytics
+from .const import CONF_MUSIC_FOLDER, DOMAIN, LIBRARY_RESCAN_INTERVAL
 from .game_manager import GameManager
+from .http_api import async_setup_http_api
+from .long_term_stats import GameStatisticsExporter
+from .scoring import async_load_scoring_rules
+from .library import MusicLibraryIndexer
+from .media_controller import MediaController
+from .panel import async_register_panel
+from .rate_limit import RateLimiter
+from .song_catalog import SongCatalog
+from .song_stats import SongStatsTracker
+from .subscriptions import SubscriptionRegistry
 from .websocket_api import async_setup_websocket_api
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.MEDIA_PLAYER]
 
+_T = TypeVar("_T")
+
+
+class _SetupTimer:
+    """Measures the steps of setting up a config entry."""
+
+    def __init__(self) -> None:
+        """Start the clock."""
+        self.start = time.perf_counter()
+        self.steps: dict[str, float] = {}
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """Record the duration of a step in milliseconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = round((time.perf_counter() - start) * 1000, 2)
+
+    async def async_step(self, name: str, awaitable: Awaitable[_T]) -> _T:
+        """Await a step, so steps running concurrently are measured separately."""
+        with self.step(name):
+            return await awaitable
+
+    def as_dict(self) -> dict[str, float]:
+        """Return the step durations and the total."""
+        return {**self.steps, "total": round((time.perf_counter() - self.start) * 1000, 2)}
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Soundbeats from a config entry."""
+    """Set up Soundbeats from a config entry.
+
+    Only what the first state broadcast needs is loaded here; the song
+    catalog is read on first use and cross-game analytics are built on the
+    first statistics request.
+    """
+    timer = _SetupTimer()
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
         "config": entry.data,
@@ -29,44 +80,91 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         "game_history": entry.data.get("game_history", [])
     }
     
-    # Initialize game manager
-    game_manager = GameManager(hass, entry.entry_id)
-    await game_manager.initialize()
-    hass.data[DOMAIN][entry.entry_id]["game_manager"] = game_manager
-
-    # Register static path for frontend assets
-    await hass.http.async_register_static_paths([
-        StaticPathConfig(
-            "/soundbeats_static",
-            str(hass.config.path(f"custom_components/{DOMAIN}/frontend/dist")),
-            False
+    # Song catalog, read when a game first needs a song
+    catalog = SongCatalog(hass)
+    hass.data[DOMAIN][entry.entry_id]["catalog"] = catalog
+    entry.async_on_unload(catalog.async_shutdown)
+    
+    # Index the local music library in the background; songs stream into the catalog
+    if music_folder := entry.data.get(CONF_MUSIC_FOLDER):
+        library = MusicLibraryIndexer(hass, entry.entry_id, music_folder, catalog)
+        hass.data[DOMAIN][entry.entry_id]["library"] = library
+        entry.async_create_background_task(
+            hass, library.async_scan(), f"{DOMAIN}_library_scan"
         )
-    ])
-
-    # Register panel in sidebar
-    if DOMAIN not in hass.data.get("frontend_panels", {}):
-        async_register_built_in_panel(
-            hass,
-            component_name="custom",
-            sidebar_title="Soundbeats",
-            sidebar_icon="mdi:music-note",
-            frontend_url_path="soundbeats",
-            config={
-                "_panel_custom": {
-                    "name": "soundbeats-frontend",
-                    "embed_iframe": True,
-                    "trust_external": False,
-                    "js_url": "/soundbeats_static/soundbeats-panel.js",
-                }
-            },
-            require_admin=False,
+        
+        @callback
+        def _async_rescan(_now: datetime) -> None:
+            """Pick up files added or retagged since the last scan."""
+            entry.async_create_background_task(
+                hass, library.async_scan(), f"{DOMAIN}_library_rescan"
+            )
+        
+        entry.async_on_unload(
+            async_track_time_interval(hass, _async_rescan, LIBRARY_RESCAN_INTERVAL)
         )
+    
+    # Per-song guess statistics, scoring rules and the panel do not depend on each other
+    song_stats = SongStatsTracker(hass, entry.entry_id)
+    _, scoring, _ = await asyncio.gather(
+        timer.async_step("song_stats", song_stats.async_load()),
+        timer.async_step("scoring_rules", async_load_scoring_rules(hass)),
+        timer.async_step(
+            "panel",
+            async_register_panel(
+                hass, Path(hass.config.path(f"custom_components/{DOMAIN}/frontend/dist"))
+            ),
+        ),
+    )
+    hass.data[DOMAIN][entry.entry_id]["song_stats"] = song_stats
+    entry.async_on_unload(song_stats.async_save)
+    
+    # Cross-game aggregates, built from the history on first use
+    analytics = GameAnalytics()
+    hass.data[DOMAIN][entry.entry_id]["analytics"] = analytics
+    
+    # Initialize game manager
+    media_controller = MediaController(hass, entry, catalog, song_stats)
+    game_manager = GameManager(
+        hass,
+        entry.entry_id,
+        media_controller,
+        song_stats,
+        analytics,
+        scoring,
+    )
+    await timer.async_step("game_manager", game_manager.initialize())
+    hass.data[DOMAIN][entry.entry_id]["game_manager"] = game_manager
+    hass.data[DOMAIN][entry.entry_id]["rate_limiter"] = RateLimiter(game_manager.has_team)
+    
+    # Websocket subscribers, all dropped when the entry unloads
+    subscriptions = SubscriptionRegistry(
+        hass, entry.entry_id, game_manager.get_broadcast_state
+    )
+    hass.data[DOMAIN][entry.entry_id]["subscriptions"] = subscriptions
+    entry.async_on_unload(subscriptions.async_start())
+    
+    # Feed finished games into long-term statistics
+    if "recorder" in hass.config.components:
+        exporter = GameStatisticsExporter(hass, entry.entry_id)
+        entry.async_on_unload(exporter.async_start(game_manager.get_state()))
 
     # Register WebSocket API
     async_setup_websocket_api(hass)
+    
+    # Register export view
+    async_setup_http_api(hass)
 
     # Forward entry setup to platforms
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    await timer.async_step(
+        "platforms", hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    )
+    
+    # Watch the catalog file only once nothing else can fail the setup
+    entry.async_on_unload(catalog.async_start_watching())
+    
+    timings = hass.data[DOMAIN][entry.entry_id]["setup_timings"] = timer.as_dict()
+    _LOGGER.debug("Set up Soundbeats in %.1f ms: %s", timings["total"], timings)
     return True
 
 
@@ -77,7 +175,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         # Save final state before unloading
         game_manager = hass.data[DOMAIN][entry.entry_id]["game_manager"]
         state_data = {
-            "active_game": game_manager.get_state(),
+            "active_game": game_manager.get_stored_state(),
             "game_history": game_manager.get_history()
         }
         
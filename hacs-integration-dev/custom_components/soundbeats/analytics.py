@@ -0,0 +1,152 @@
+"""Cross-game analytics for Soundbeats."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+FIRST_DECADE = 1900
+DECADE_COUNT = 21  # 1900s up to and including the 2100s
+
+
+@dataclass
+class _Columns:
+    """Flat columns of the guesses and teams of one or more games."""
+
+    decades: np.ndarray = field(default_factory=lambda: np.empty(0, np.intp))
+    errors: np.ndarray = field(default_factory=lambda: np.empty(0, np.int64))
+    rounds: int = 0
+    points: int = 0
+    team_names: list[str] = field(default_factory=list)
+    team_wins: list[bool] = field(default_factory=list)
+
+    @classmethod
+    def from_games(cls, games: Iterable[dict[str, Any]]) -> _Columns:
+        """Flatten archived game dicts into columns."""
+        years: list[int] = []
+        guesses: list[int] = []
+        columns = cls()
+        for game in games:
+            for game_round in game.get("rounds_played", []):
+                actual_year = game_round.get("actual_year") or 0
+                columns.rounds += 1
+                columns.points += sum(game_round.get("team_scores", {}).values())
+                if not actual_year:
+                    continue
+                for guess in game_round.get("team_guesses", {}).values():
+                    years.append(actual_year)
+                    guesses.append(guess)
+
+            teams = game.get("teams", [])
+            best = max((team["score"] for team in teams), default=0)
+            for team in teams:
+                columns.team_names.append(team["name"])
+                # Nobody wins a game without points
+                columns.team_wins.append(best > 0 and team["score"] == best)
+
+        year_column = np.asarray(years, dtype=np.int64)
+        columns.decades = np.clip(
+            (year_column - FIRST_DECADE) // 10, 0, DECADE_COUNT - 1
+        ).astype(np.intp)
+        columns.errors = np.abs(np.asarray(guesses, dtype=np.int64) - year_column)
+        return columns
+
+
+class GameAnalytics:
+    """Aggregates over all archived games, kept up to date incrementally.
+
+    Each view is a small NumPy array (per decade or per team name) plus a
+    few counters. Archiving a game folds just that game into the views, and
+    answering a query only reads the views, so neither depends on the size
+    of the history. ``rebuild`` recomputes everything from the archive in
+    one vectorized pass.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty views."""
+        self.games = 0
+        self.rounds = 0
+        self.points = 0
+        self._decade_guesses = np.zeros(DECADE_COUNT, np.int64)
+        self._decade_errors = np.zeros(DECADE_COUNT, np.int64)
+        self._decade_exact = np.zeros(DECADE_COUNT, np.int64)
+        self._team_index: dict[str, int] = {}
+        self._team_games = np.zeros(0, np.int64)
+        self._team_wins = np.zeros(0, np.int64)
+
+    def rebuild(self, games: list[dict[str, Any]]) -> None:
+        """Recompute the views from the full archive; safe to run in the executor."""
+        fresh = GameAnalytics()
+        fresh._fold(len(games), _Columns.from_games(games))
+        self.__dict__.update(fresh.__dict__)
+
+    def add_game(self, game: dict[str, Any]) -> None:
+        """Fold an archived game into the views."""
+        self._fold(1, _Columns.from_games([game]))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all views."""
+        decades = np.flatnonzero(self._decade_guesses)
+        guesses = self._decade_guesses[decades]
+        teams = [
+            {
+                "name": name,
+                "games": int(self._team_games[index]),
+                "wins": int(self._team_wins[index]),
+                "win_rate": round(
+                    float(self._team_wins[index] / self._team_games[index]), 3
+                ),
+            }
+            for name, index in self._team_index.items()
+        ]
+        return {
+            "games": self.games,
+            "rounds": self.rounds,
+            "guesses": int(self._decade_guesses.sum()),
+            "points_per_round": round(self.points / self.rounds, 2) if self.rounds else 0.0,
+            "teams": sorted(teams, key=lambda team: team["win_rate"], reverse=True),
+            "decades": [
+                {
+                    "decade": FIRST_DECADE + 10 * int(decade),
+                    "guesses": int(count),
+                    "mean_error": round(float(error / count), 2),
+                    "exact_rate": round(float(exact / count), 3),
+                }
+                for decade, count, error, exact in zip(
+                    decades,
+                    guesses,
+                    self._decade_errors[decades],
+                    self._decade_exact[decades],
+                )
+            ],
+        }
+
+    def _fold(self, games: int, columns: _Columns) -> None:
+        """Add flattened games to the views."""
+        self.games += games
+        self.rounds += columns.rounds
+        self.points += columns.points
+
+        self._decade_guesses += np.bincount(columns.decades, minlength=DECADE_COUNT)
+        self._decade_errors += np.bincount(
+            columns.decades, weights=columns.errors, minlength=DECADE_COUNT
+        ).astype(np.int64)
+        self._decade_exact += np.bincount(
+            columns.decades[columns.errors == 0], minlength=DECADE_COUNT
+        )
+
+        for name in columns.team_names:
+            self._team_index.setdefault(name, len(self._team_index))
+        if len(self._team_index) > len(self._team_games):
+            grow = len(self._team_index) - len(self._team_games)
+            self._team_games = np.concatenate([self._team_games, np.zeros(grow, np.int64)])
+            self._team_wins = np.concatenate([self._team_wins, np.zeros(grow, np.int64)])
+        indexes = np.fromiter(
+            (self._team_index[name] for name in columns.team_names),
+            np.intp,
+            len(columns.team_names),
+        )
+        np.add.at(self._team_games, indexes, 1)
+        np.add.at(self._team_wins, indexes, np.asarray(columns.team_wins, np.int64))
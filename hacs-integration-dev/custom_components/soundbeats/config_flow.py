@@ -8,14 +8,44 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import selector
 
-from .const import DOMAIN, CONF_API_KEY
+from .const import (
+    DOMAIN,
+    CONF_API_KEY,
+    CONF_CLIP_DURATION,
+    CONF_MEDIA_PLAYER,
+    CONF_MEDIA_SOURCE,
+    CONF_MEDIA_VOLUME,
+    CONF_MOCK_LATENCIES,
+    CONF_MOCK_PROFILE,
+    CONF_MUSIC_FOLDER,
+    DEFAULT_CLIP_DURATION,
+    DEFAULT_MOCK_PROFILE,
+)
+from .media_player import SIMULATION_PROFILES, parse_latencies
 
 _LOGGER = logging.getLogger(__name__)
 
+
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_API_KEY): str,
+        vol.Optional(CONF_MEDIA_PLAYER): selector.EntitySelector(
+            selector.EntitySelectorConfig(domain="media_player", multiple=True)
+        ),
+        vol.Optional(CONF_MEDIA_SOURCE): str,
+        vol.Optional(CONF_MEDIA_VOLUME): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=1)
+        ),
+        vol.Optional(CONF_CLIP_DURATION, default=DEFAULT_CLIP_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=5, max=120)
+        ),
+        vol.Optional(CONF_MOCK_LATENCIES, default="0"): str,
+        vol.Optional(CONF_MOCK_PROFILE, default=DEFAULT_MOCK_PROFILE): vol.In(
+            list(SIMULATION_PROFILES)
+        ),
+        vol.Optional(CONF_MUSIC_FOLDER): str,
     }
 )
 
@@ -32,6 +62,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors: dict[str, str] = {}
         
         if user_input is not None:
+            try:
+                parse_latencies(user_input.get(CONF_MOCK_LATENCIES, "0"))
+            except ValueError:
+                errors[CONF_MOCK_LATENCIES] = "invalid_latencies"
+        
+        if user_input is not None and not errors:
             # TODO: Validate the API key
             # TODO: Create unique ID
             # TODO: Check for existing entry
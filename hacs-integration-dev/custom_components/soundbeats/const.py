@@ -1,14 +1,75 @@
 """Constants for Soundbeats."""
+from datetime import timedelta
 from typing import Final
 
 DOMAIN: Final = "soundbeats"
 
 # Configuration
 CONF_API_KEY: Final = "api_key"
+CONF_MEDIA_PLAYER: Final = "media_player"
+CONF_MEDIA_SOURCE: Final = "media_source"
+CONF_MEDIA_VOLUME: Final = "media_volume"
+CONF_CLIP_DURATION: Final = "clip_duration"
+CONF_MOCK_LATENCIES: Final = "mock_latencies"
+CONF_MOCK_PROFILE: Final = "mock_profile"
+CONF_MUSIC_FOLDER: Final = "music_folder"
 
 # Defaults
 DEFAULT_NAME: Final = "Soundbeats"
 DEFAULT_SCAN_INTERVAL: Final = 300  # 5 minutes
+DEFAULT_MOCK_PROFILE: Final = "instant"
+
+# Song catalog, relative to the Home Assistant config directory
+SONG_CATALOG_FILE: Final = "soundbeats/songs.json"
+SCORING_RULES_FILE: Final = "soundbeats/scoring.yaml"
+CATALOG_WATCH_INTERVAL: Final = timedelta(seconds=10)
+CATALOG_REBUILD_COOLDOWN: Final = 1.0  # seconds to batch source changes into one rebuild
+DEFAULT_PLAYLIST: Final = "default"  # every song in the catalog
+
+# Local music library
+LIBRARY_BATCH_SIZE: Final = 500  # files per executor job and catalog update
+LIBRARY_PARALLEL_BATCHES: Final = 4  # executor jobs reading tags at once
+LIBRARY_SAVE_INTERVAL: Final = 30.0  # seconds between cache saves during a scan
+LIBRARY_RESCAN_INTERVAL: Final = timedelta(minutes=5)
+
+# Media playback
+MEDIA_START_TIMEOUT: Final = 10.0  # seconds to wait for a player to report playing
+MEDIA_PREROLL_TIMEOUT: Final = 5.0  # seconds to wait for a player to buffer
+DEFAULT_CLIP_DURATION: Final = 30.0  # seconds of audio per round
+MAX_STOP_LEAD: Final = 2.0  # cap on how early a stop command may be sent
+DEFAULT_TARGET_SKEW: Final = 0.05  # seconds between the first and last speaker
+
+# Images
+IMAGES_DIR: Final = "soundbeats/images"  # relative to the config directory
+IMAGE_CACHE_DIR: Final = ".storage/soundbeats_images"
+IMAGE_CACHE_MAX_BYTES: Final = 64 * 1024 * 1024
+IMAGE_QUALITY: Final = 80  # WebP quality of rendered variants
+IMAGE_VARIANTS: Final = {"thumb": 160, "card": 480, "tv": 1280}  # longest side in pixels
+
+# Teams
+MAX_TEAMS: Final = 5
+MAX_TEAMS_LARGE: Final = 100  # large-team mode for company events
+LEADERBOARD_SIZE: Final = 10  # teams in leaderboards and standings
+
+# Rounds of the active game kept as objects; older ones are compressed in blocks
+HOT_ROUNDS: Final = 20
+ROUND_BLOCK_SIZE: Final = 50
 
 # Events
-EVENT_GAME_STATE_CHANGED: Final = "soundbeats_game_state_changed"
\ No newline at end of file
+EVENT_GAME_STATE_CHANGED: Final = "soundbeats_game_state_changed"
+
+# Game state subscriptions a single websocket connection may hold
+MAX_SUBSCRIPTIONS_PER_CONNECTION: Final = 4
+
+# Recent client operation ids remembered for deduplicating retries
+OPERATION_CACHE_SIZE: Final = 256
+
+# Rate limits of mutating websocket commands as (burst, refill per second)
+RATE_LIMIT_CONNECTION: Final = (20, 10.0)
+RATE_LIMIT_TEAM: Final = (5, 2.0)
+
+# Seconds to gather finished games into one long-term statistics import
+STATISTICS_FLUSH_DELAY: Final = 1.0
+
+# Sensors
+SENSOR_MIN_UPDATE_INTERVAL: Final = 2.0  # seconds between recorder writes
@@ -0,0 +1,40 @@
+"""Diagnostics support for Soundbeats."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_API_KEY, DOMAIN
+from .game_manager import GameManager
+from .http_api import DATA_IMAGES
+
+TO_REDACT = {CONF_API_KEY}
+# Games saved into the entry on unload; summarised by game_state and history_games
+TO_DROP = {"active_game", "game_history"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    game_manager: GameManager = data["game_manager"]
+    media_controller = game_manager.media_controller
+
+    return {
+        "entry": async_redact_data(
+            {key: value for key, value in entry.data.items() if key not in TO_DROP},
+            TO_REDACT,
+        ),
+        "catalog": data["catalog"].stats,
+        "game_state": game_manager.get_state(),
+        "history_games": len(game_manager.get_history()),
+        "media": media_controller.stats if media_controller else None,
+        "rate_limits": data["rate_limiter"].stats,
+        "subscriptions": data["subscriptions"].stats,
+        "setup_timings": data.get("setup_timings"),
+        "images": images.stats if (images := hass.data.get(DATA_IMAGES)) else None,
+    }
@@ -3,6 +3,13 @@ import { customElement, property, state } from "lit/decorators.js";
 import { WebSocketService } from "../services/websocket-service";
 import { GameState, Team, HomeAssistant } from "../types";
 
+// Mirrors MAX_TEAMS, MAX_TEAMS_LARGE and LEADERBOARD_SIZE in const.py
+const MAX_TEAMS = 5;
+const MAX_TEAMS_LARGE = 100;
+const TEAM_PAGE_SIZE = 10;
+
+type TeamRow = Pick<Team, "id" | "name">;
+
 @customElement("soundbeats-game-setup")
 export class SoundbeatsGameSetup extends LitElement {
   @property({ attribute: false }) hass!: HomeAssistant;
@@ -10,6 +17,11 @@ export class SoundbeatsGameSetup extends LitElement {
   
   @state() private gameState?: GameState;
   @state() private loading = false;
+  @state() private playlists: string[] = [];
+  @state() private playlistId = "default";
+  @state() private largeTeams = false;
+  @state() private page = 0;
+  @state() private pageTeams?: TeamRow[];
   
   private wsService?: WebSocketService;
   private unsubscribe?: () => void;
@@ -76,6 +88,16 @@ export class SoundbeatsGameSetup extends LitElement {
       margin: 0 auto;
     }
     
+    .options,
+    .pager {
+      display: flex;
+      gap: 16px;
+      align-items: center;
+      justify-content: center;
+      margin-top: 16px;
+      color: var(--primary-text-color);
+    }
+    
     ha-card {
       max-width: 800px;
       margin: 0 auto;
@@ -96,6 +118,12 @@ export class SoundbeatsGameSetup extends LitElement {
     // Subscribe to state changes
     this.unsubscribe = this.wsService.subscribeToStateChanges((state) => {
       this.gameState = state;
+      // Large-team broadcasts carry the first page; others are fetched
+      if (state.large_teams && this.page > 0) {
+        this.loadPage();
+      } else {
+        this.pageTeams = undefined;
+      }
     });
   }
   
@@ -109,8 +137,15 @@ export class SoundbeatsGameSetup extends LitElement {
   private async loadGameState() {
     this.loading = true;
     try {
-      const { state } = await this.wsService!.getGameState();
+      const [{ state }, playlists] = await Promise.all([
+        this.wsService!.getGameState(),
+        this.wsService!.getPlaylists(),
+      ]);
       this.gameState = state || undefined;
+      this.playlists = playlists;
+      this.playlistId = state?.playlist_id ?? "default";
+      this.largeTeams = state?.large_teams ?? false;
+      await this.loadPage();
     } catch (err) {
       console.error("Failed to load game state:", err);
     } finally {
@@ -118,11 +153,59 @@ export class SoundbeatsGameSetup extends LitElement {
     }
   }
   
+  private get maxTeams(): number {
+    return this.gameState?.large_teams ? MAX_TEAMS_LARGE : MAX_TEAMS;
+  }
+  
+  private get teamCount(): number {
+    return this.gameState?.team_count ?? this.gameState?.teams.length ?? 0;
+  }
+  
+  // Large-team games are listed a page at a time, best ranked first
+  private get visibleTeams(): TeamRow[] {
+    if (!this.gameState?.large_teams) {
+      return this.gameState?.teams ?? [];
+    }
+    return this.pageTeams ?? this.gameState.teams.slice(0, TEAM_PAGE_SIZE);
+  }
+  
+  private async loadPage() {
+    if (!this.gameState?.large_teams) {
+      this.pageTeams = undefined;
+      return;
+    }
+    try {
+      const leaderboard = await this.wsService!.getLeaderboard(
+        TEAM_PAGE_SIZE,
+        undefined,
+        this.page * TEAM_PAGE_SIZE
+      );
+      this.pageTeams = leaderboard.top;
+    } catch (err) {
+      console.error("Failed to load teams:", err);
+    }
+  }
+  
+  private changePage(delta: number) {
+    this.page += delta;
+    this.loadPage();
+  }
+  
   private async createNewGame() {
     this.loading = true;
     try {
-      const teamCount = this.gameState?.teams.length || 2;
-      await this.wsService!.newGame(teamCount);
+      const teamCount = Math.min(
+        this.teamCount || 2,
+        this.largeTeams ? MAX_TEAMS_LARGE : MAX_TEAMS
+      );
+      this.page = 0;
+      this.pageTeams = undefined;
+      await this.wsService!.newGame(
+        teamCount,
+        undefined,
+        this.largeTeams,
+        this.playlistId
+      );
     } catch (err) {
       console.error("Failed to create game:", err);
     } finally {
@@ -130,7 +213,7 @@ export class SoundbeatsGameSetup extends LitElement {
     }
   }
   
-  private async updateTeamName(team: Team, event: Event) {
+  private async updateTeamName(team: TeamRow, event: Event) {
     const input = event.target as HTMLInputElement;
     const newName = input.value.trim();
     
@@ -146,7 +229,7 @@ export class SoundbeatsGameSetup extends LitElement {
   }
   
   private async addTeam() {
-    if (this.gameState && this.gameState.teams.length < 5) {
+    if (this.gameState && this.teamCount < this.maxTeams) {
       try {
         await this.wsService!.addTeam();
       } catch (err) {
@@ -156,7 +239,7 @@ export class SoundbeatsGameSetup extends LitElement {
   }
   
   private async removeTeam(teamId: string) {
-    if (this.gameState && this.gameState.teams.length > 1) {
+    if (this.gameState && this.teamCount > 1) {
       try {
         await this.wsService!.removeTeam(teamId);
       } catch (err) {
@@ -165,6 +248,62 @@ export class SoundbeatsGameSetup extends LitElement {
     }
   }
   
+  private renderOptions() {
+    return html`
+      <div class="options">
+        ${this.playlists.length > 1 ? html`
+          <label>
+            Playlist
+            <select
+              .value=${this.playlistId}
+              @change=${(e: Event) => {
+                this.playlistId = (e.target as HTMLSelectElement).value;
+              }}
+            >
+              ${this.playlists.map(
+                (playlist) => html`<option value=${playlist}>${playlist}</option>`
+              )}
+            </select>
+          </label>
+        ` : ''}
+        <label>
+          <input
+            type="checkbox"
+            .checked=${this.largeTeams}
+            @change=${(e: Event) => {
+              this.largeTeams = (e.target as HTMLInputElement).checked;
+            }}
+          />
+          Large teams (up to ${MAX_TEAMS_LARGE})
+        </label>
+      </div>
+    `;
+  }
+  
+  private renderPager() {
+    if (!this.gameState?.large_teams || this.teamCount <= TEAM_PAGE_SIZE) {
+      return "";
+    }
+    const first = this.page * TEAM_PAGE_SIZE;
+    return html`
+      <div class="pager">
+        <mwc-button ?disabled=${this.page === 0} @click=${() => this.changePage(-1)}>
+          Previous
+        </mwc-button>
+        <span>
+          Teams ${first + 1}–${Math.min(first + TEAM_PAGE_SIZE, this.teamCount)}
+          of ${this.teamCount}
+        </span>
+        <mwc-button
+          ?disabled=${first + TEAM_PAGE_SIZE >= this.teamCount}
+          @click=${() => this.changePage(1)}
+        >
+          Next
+        </mwc-button>
+      </div>
+    `;
+  }
+  
   render() {
     if (this.loading) {
       return html`<ha-circular-progress active></ha-circular-progress>`;
@@ -176,6 +315,7 @@ export class SoundbeatsGameSetup extends LitElement {
           <div class="card-content">
             <h2>Welcome to Soundbeats!</h2>
             <p>Create a new game to get started.</p>
+            ${this.renderOptions()}
             <div class="controls">
               <mwc-button raised @click=${this.createNewGame}>
                 Create New Game
@@ -192,7 +332,7 @@ export class SoundbeatsGameSetup extends LitElement {
           <h2>Game Setup</h2>
           
           <div class="team-list">
-            ${this.gameState.teams.map(team => html`
+            ${this.visibleTeams.map(team => html`
               <div class="team-item">
                 <ha-icon class="team-icon" icon="mdi:account-group"></ha-icon>
                 <input
@@ -206,7 +346,7 @@ export class SoundbeatsGameSetup extends LitElement {
                     }
                   }}
                 />
-                ${this.gameState!.teams.length > 1 ? html`
+                ${this.teamCount > 1 ? html`
                   <mwc-icon-button
                     icon="mdi:delete"
                     @click=${() => this.removeTeam(team.id)}
@@ -215,9 +355,10 @@ export class SoundbeatsGameSetup extends LitElement {
               </div>
             `)}
           </div>
+          ${this.renderPager()}
           
           <div class="controls">
-            ${this.gameState.teams.length < 5 ? html`
+            ${this.teamCount < this.maxTeams ? html`
               <mwc-button outlined @click=${this.addTeam}>
                 Add Team
               </mwc-button>
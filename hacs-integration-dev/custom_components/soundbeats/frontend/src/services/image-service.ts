@@ -0,0 +1,55 @@
+import { HomeAssistant } from "../types";
+
+// Longest side in pixels of each variant, mirrors IMAGE_VARIANTS in const.py
+const VARIANTS: [string, number][] = [
+  ["thumb", 160],
+  ["card", 480],
+  ["tv", 1280],
+];
+
+export class ImageService {
+  private hass: HomeAssistant;
+  private urls = new Map<string, Promise<string>>();
+  
+  constructor(hass: HomeAssistant) {
+    this.hass = hass;
+  }
+  
+  /**
+   * Return the smallest variant covering a display size in CSS pixels on
+   * this screen.
+   */
+  static variantFor(displaySize: number): string {
+    const pixels = displaySize * (window.devicePixelRatio || 1);
+    const match = VARIANTS.find(([, size]) => size >= pixels);
+    return (match ?? VARIANTS[VARIANTS.length - 1])[0];
+  }
+  
+  /**
+   * Return an object URL for an image below <config>/soundbeats/images,
+   * e.g. "playlist-images/80s.jpg", sized for its display size.
+   */
+  imageUrl(name: string, displaySize: number): Promise<string> {
+    const path = `/api/soundbeats/images/${ImageService.variantFor(displaySize)}/${encodeURI(name)}`;
+    let url = this.urls.get(path);
+    if (!url) {
+      url = this.hass.fetchWithAuth(path).then(async (response) => {
+        if (!response.ok) {
+          throw new Error(`Failed to load ${name}: ${response.status}`);
+        }
+        return URL.createObjectURL(await response.blob());
+      });
+      url.catch(() => this.urls.delete(path));
+      this.urls.set(path, url);
+    }
+    return url;
+  }
+  
+  /** Release the object URLs of all loaded images. */
+  dispose(): void {
+    for (const url of this.urls.values()) {
+      url.then((objectUrl) => URL.revokeObjectURL(objectUrl), () => undefined);
+    }
+    this.urls.clear();
+  }
+}
@@ -1,4 +1,19 @@
-import { HomeAssistant, GameState, Team } from "../types";
+import {
+  HomeAssistant,
+  GameState,
+  GameRound,
+  Team,
+  SongMatch,
+  SongStats,
+  GameStats,
+  Difficulty,
+  Leaderboard,
+} from "../types";
+
+// home-assistant-js-websocket error code for a dropped connection
+const ERR_CONNECTION_LOST = 3;
+const MUTATION_ATTEMPTS = 3;
+const RETRY_DELAY_MS = 1000;
 
 export class WebSocketService {
   private hass: HomeAssistant;
@@ -9,15 +24,49 @@ export class WebSocketService {
     this.entryId = entryId;
   }
   
-  async newGame(teamCount: number): Promise<GameState> {
-    const response = await this.hass.connection.sendMessagePromise({
+  /**
+   * Send a mutating command with an operation id, retrying with the same id
+   * when the connection drops. The backend applies each id at most once and
+   * answers retries with the original result.
+   */
+  private async mutate(message: Record<string, unknown>): Promise<any> {
+    const opMessage = { ...message, entry_id: this.entryId, op_id: crypto.randomUUID() };
+    for (let attempt = 1; ; attempt++) {
+      try {
+        return await this.hass.connection.sendMessagePromise(opMessage);
+      } catch (err: any) {
+        if (err?.code !== ERR_CONNECTION_LOST || attempt >= MUTATION_ATTEMPTS) {
+          throw err;
+        }
+        await new Promise((resolve) => setTimeout(resolve, RETRY_DELAY_MS));
+      }
+    }
+  }
+  
+  async newGame(
+    teamCount: number,
+    difficulty?: Difficulty,
+    largeTeams = false,
+    playlistId?: string
+  ): Promise<GameState> {
+    const response = await this.mutate({
       type: "soundbeats/new_game",
-      entry_id: this.entryId,
       team_count: teamCount,
+      large_teams: largeTeams,
+      ...(difficulty ? { difficulty } : {}),
+      ...(playlistId ? { playlist_id: playlistId } : {}),
     });
     return response;
   }
   
+  async getPlaylists(): Promise<string[]> {
+    const response = await this.hass.connection.sendMessagePromise({
+      type: "soundbeats/get_playlists",
+      entry_id: this.entryId,
+    });
+    return response.playlists;
+  }
+  
   async getGameState(): Promise<{ state: GameState | null; history: any[] }> {
     const response = await this.hass.connection.sendMessagePromise({
       type: "soundbeats/get_game_state",
@@ -27,30 +76,107 @@ export class WebSocketService {
   }
   
   async updateTeamName(teamId: string, name: string): Promise<void> {
-    await this.hass.connection.sendMessagePromise({
+    await this.mutate({
       type: "soundbeats/update_team_name",
-      entry_id: this.entryId,
       team_id: teamId,
       name: name,
     });
   }
   
   async addTeam(): Promise<Team> {
-    const response = await this.hass.connection.sendMessagePromise({
+    const response = await this.mutate({
       type: "soundbeats/add_team",
-      entry_id: this.entryId,
     });
     return response.team;
   }
   
   async removeTeam(teamId: string): Promise<void> {
-    await this.hass.connection.sendMessagePromise({
+    await this.mutate({
       type: "soundbeats/remove_team",
-      entry_id: this.entryId,
       team_id: teamId,
     });
   }
   
+  async startRound(): Promise<GameRound> {
+    const response = await this.mutate({
+      type: "soundbeats/start_round",
+    });
+    return response.round;
+  }
+  
+  async submitGuess(teamId: string, year: number, bet = false): Promise<void> {
+    await this.mutate({
+      type: "soundbeats/submit_guess",
+      team_id: teamId,
+      year,
+      bet,
+    });
+  }
+  
+  async lockGuesses(): Promise<void> {
+    await this.mutate({
+      type: "soundbeats/lock_guesses",
+    });
+  }
+  
+  async endRound(): Promise<GameRound> {
+    const response = await this.mutate({
+      type: "soundbeats/end_round",
+    });
+    return response.round;
+  }
+  
+  async endGame(): Promise<void> {
+    await this.mutate({
+      type: "soundbeats/end_game",
+    });
+  }
+  
+  async searchSongs(query: string, limit = 20): Promise<SongMatch[]> {
+    const response = await this.hass.connection.sendMessagePromise({
+      type: "soundbeats/search_songs",
+      entry_id: this.entryId,
+      query,
+      limit,
+    });
+    return response.songs;
+  }
+  
+  async getSongStats(limit = 10): Promise<SongStats[]> {
+    const response = await this.hass.connection.sendMessagePromise({
+      type: "soundbeats/get_song_stats",
+      entry_id: this.entryId,
+      limit,
+    });
+    return response.hardest;
+  }
+  
+  async getStats(): Promise<GameStats> {
+    return await this.hass.connection.sendMessagePromise({
+      type: "soundbeats/get_stats",
+      entry_id: this.entryId,
+    });
+  }
+  
+  async getLeaderboard(limit = 10, teamId?: string, offset = 0): Promise<Leaderboard> {
+    return await this.hass.connection.sendMessagePromise({
+      type: "soundbeats/get_leaderboard",
+      entry_id: this.entryId,
+      limit,
+      offset,
+      ...(teamId ? { team_id: teamId } : {}),
+    });
+  }
+  
+  async getRounds(start = 0, limit = 50): Promise<{ start: number; rounds: GameRound[] }> {
+    return await this.hass.connection.sendMessagePromise({
+      type: "soundbeats/get_rounds",
+      entry_id: this.entryId,
+      start,
+      limit,
+    });
+  }
+  
   subscribeToStateChanges(callback: (state: GameState) => void): () => void {
     const unsubscribe = this.hass.connection.subscribeMessage(
       (msg) => callback(msg.state),
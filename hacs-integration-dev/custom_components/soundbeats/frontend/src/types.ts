@@ -3,6 +3,7 @@
  */
 
 export interface HomeAssistant {
+  fetchWithAuth: (path: string, init?: RequestInit) => Promise<Response>;
   connection: {
     sendMessagePromise: (message: any) => Promise<any>;
     subscribeMessage: (
@@ -27,13 +28,33 @@ export interface HomeAssistant {
 
 export interface GameState {
   game_id: string;
-  teams: Team[];
+  teams: Team[];  // large-team broadcasts list the leaderboard's teams only
+  team_count?: number;  // set when teams is partial; page with getLeaderboard
   current_round: number;
-  rounds_played: GameRound[];
+  rounds_played: GameRound[];  // recent rounds only; see getRounds
+  round_count: number;
+  round_totals: RoundTotals;
   playlist_id: string;
   played_song_ids: number[];
   is_active: boolean;
   created_at: string;
+  active_round: GameRound | null;
+  difficulty: Difficulty | null;
+  large_teams: boolean;
+  reveal: Reveal | null;
+}
+
+export interface RoundTotals {
+  rounds: number;
+  points: number;
+  guesses: number;
+  error_sum: number;
+}
+
+export interface Reveal {
+  round_number: number;
+  rank_changes: Record<string, number>;
+  song: Song | null;
 }
 
 export interface Team {
@@ -42,6 +63,7 @@ export interface Team {
   score: number;
   current_guess?: number;
   has_bet: boolean;
+  streak: number;
 }
 
 export interface GameRound {
@@ -52,6 +74,55 @@ export interface GameRound {
   team_scores: Record<string, number>;
   actual_year: number;
   timestamp: string;
+  guesses_locked: boolean;
+}
+
+export interface Song {
+  id: number;
+  title: string;
+  artist: string;
+  year: number;
+  media_id: string;
+  media_type: string;
+}
+
+export interface SongMatch extends Song {
+  score: number;
+}
+
+export type Difficulty = "easy" | "medium" | "hard";
+
+export interface SongStats {
+  song_id: number;
+  song: Song | null;
+  guesses: number;
+  mean_error: number;
+  hit_rate: number;
+  median_error: number | null;
+  p90_error: number | null;
+  difficulty: Difficulty | null;
+}
+
+export interface GameStats {
+  games: number;
+  rounds: number;
+  guesses: number;
+  points_per_round: number;
+  teams: { name: string; games: number; wins: number; win_rate: number }[];
+  decades: { decade: number; guesses: number; mean_error: number; exact_rate: number }[];
+}
+
+export interface LeaderboardEntry {
+  rank: number;
+  id: string;
+  name: string;
+  score: number;
+}
+
+export interface Leaderboard {
+  team_count: number;
+  top: LeaderboardEntry[];
+  team: LeaderboardEntry | null;
 }
 
 export interface GameHistory {
@@ -1,18 +1,57 @@
 import { defineConfig } from 'vite'
+import { readFileSync, writeFileSync } from 'node:fs'
+import { join } from 'node:path'
+import { brotliCompressSync, gzipSync, constants } from 'node:zlib'
+
+// Write .gz and .br siblings of the built assets; the integration serves
+// whichever one the browser accepts.
+function precompress() {
+  let outDir
+  return {
+    name: 'soundbeats-precompress',
+    apply: 'build',
+    configResolved(config) {
+      outDir = config.build.outDir
+    },
+    writeBundle(_options, bundle) {
+      for (const fileName of Object.keys(bundle)) {
+        if (!/\.(js|css|html|svg|json)$/.test(fileName)) continue
+        const path = join(outDir, fileName)
+        const data = readFileSync(path)
+        writeFileSync(`${path}.gz`, gzipSync(data, { level: 9 }))
+        writeFileSync(
+          `${path}.br`,
+          brotliCompressSync(data, {
+            params: { [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY },
+          })
+        )
+      }
+    },
+  }
+}
 
 export default defineConfig({
+  plugins: [precompress()],
   build: {
     lib: {
       entry: 'src/soundbeats-panel.ts',
       formats: ['es'],
-      fileName: () => 'soundbeats-panel.js'
     },
     rollupOptions: {
       external: [],  // Bundle everything including Lit
+      output: {
+        // Content-hashed names let the integration cache them forever
+        entryFileNames: 'soundbeats-panel.[hash].js',
+        chunkFileNames: '[name].[hash].js',
+        assetFileNames: '[name].[hash][extname]',
+      },
     },
+    // .vite/manifest.json maps the entry to its hashed file for the panel URL
+    manifest: true,
     outDir: 'dist',
+    emptyOutDir: true,
     sourcemap: true,
     minify: 'terser',
     target: 'es2015'
   }
-})
\ No newline at end of file
+})
@@ -1,25 +1,102 @@
 """Game manager for Soundbeats - handles game state and operations."""
 import asyncio
+from collections import OrderedDict
+from dataclasses import replace
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Awaitable, Callable, FrozenSet, Hashable, Tuple, TypeVar, TYPE_CHECKING
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_send
 from .models import GameState, Team, GameRound
-from .const import DOMAIN, EVENT_GAME_STATE_CHANGED
+from .scoring import ScoringRules
+from .serialization import all_rounds, compress_rounds, decode_game, decompress_rounds, encode_game
+from .const import (
+    DEFAULT_PLAYLIST,
+    DOMAIN,
+    EVENT_GAME_STATE_CHANGED,
+    HOT_ROUNDS,
+    LEADERBOARD_SIZE,
+    MAX_TEAMS,
+    MAX_TEAMS_LARGE,
+    OPERATION_CACHE_SIZE,
+    ROUND_BLOCK_SIZE,
+)
+
+if TYPE_CHECKING:
+    from .analytics import GameAnalytics
+    from .media_controller import MediaController
+    from .song_stats import SongStatsTracker
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+
+def _rank_teams(teams: List[Team]) -> List[Tuple[int, Team]]:
+    """Return (rank, team) pairs, best first; equal scores share a rank."""
+    ranked: List[Tuple[int, Team]] = []
+    for position, team in enumerate(sorted(teams, key=lambda t: t.score, reverse=True)):
+        tied = ranked and ranked[-1][1].score == team.score
+        ranked.append((ranked[-1][0] if tied else position + 1, team))
+    return ranked
+
+
+def _tier_rounds(state: GameState) -> GameState:
+    """Compress the oldest rounds into blocks, keeping at least HOT_ROUNDS as objects.
+    
+    Rounds move in whole blocks, so memory of a long game stays flat while
+    round N is always in block N // ROUND_BLOCK_SIZE.
+    """
+    rounds = state.rounds_played
+    archived = state.archived_rounds
+    while len(rounds) >= HOT_ROUNDS + ROUND_BLOCK_SIZE:
+        block, rounds = rounds[:ROUND_BLOCK_SIZE], rounds[ROUND_BLOCK_SIZE:]
+        archived = archived.add_block(compress_rounds(block), block)
+    if archived is state.archived_rounds:
+        return state
+    return replace(state, rounds_played=rounds, archived_rounds=archived)
+
 
 class GameManager:
-    """Manages game state and operations."""
+    """Manages game state and operations.
+    
+    The game state is a chain of snapshots. A mutation copies only the teams
+    and round it changes, shares everything else with the previous snapshot
+    and publishes the result, so readers never lock and never see a change
+    half-applied. Building and publishing a snapshot happen in one step of
+    the event loop; writers that await in between (starting a round waits
+    for the song) check the version afterwards and rebuild on the newer
+    snapshot instead of holding a lock that would queue every guess.
+    """
     
-    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        media_controller: Optional["MediaController"] = None,
+        song_stats: Optional["SongStatsTracker"] = None,
+        analytics: Optional["GameAnalytics"] = None,
+        scoring: Optional[ScoringRules] = None,
+    ) -> None:
         """Initialize game manager."""
         self.hass = hass
         self.entry_id = entry_id
+        self.media_controller = media_controller
+        self.song_stats = song_stats
+        self.analytics = analytics
+        self.scoring = scoring or ScoringRules.compile()
+        # Published snapshots are never modified; writers replace them
         self._game_state: Optional[GameState] = None
-        self._lock = asyncio.Lock()
+        self._version = 0
+        self._state_dict: Optional[Dict[str, Any]] = None
+        self._broadcast_dict: Optional[Dict[str, Any]] = None
+        self._ranking: Optional[Tuple[List[Tuple[int, Team]], Dict[str, int]]] = None
+        self._team_ids: Optional[FrozenSet[str]] = None
+        # (version it was built from, revealed snapshot, its dictionary)
+        self._reveal: Optional[Tuple[int, GameState, Dict[str, Any]]] = None
         self._game_history: List[Dict[str, Any]] = []
+        self._operations: "OrderedDict[Hashable, asyncio.Future]" = OrderedDict()
+        self._analytics_task: Optional[asyncio.Task] = None
+        self._analytics_ready = False
     
     async def initialize(self) -> None:
         """Initialize game manager with persisted state."""
@@ -27,102 +104,516 @@ class GameManager:
         stored_data = self.hass.data[DOMAIN][self.entry_id]
         if "active_game" in stored_data and stored_data["active_game"]:
             try:
-                self._game_state = GameState.from_dict(stored_data["active_game"])
+                self._game_state = decode_game(stored_data["active_game"])
                 _LOGGER.info("Restored active game state")
             except Exception as err:
                 _LOGGER.error("Failed to restore game state: %s", err)
         
-        # Load game history
+        # Load game history; analytics are built from it on first use
         if "game_history" in stored_data:
             self._game_history = stored_data.get("game_history", [])
     
-    async def new_game(self, team_count: int) -> GameState:
+    async def async_get_analytics(self) -> Optional["GameAnalytics"]:
+        """Return the cross-game analytics, building them on first use."""
+        if self.analytics is None:
+            return None
+        if not self._analytics_ready:
+            if self._analytics_task is None:
+                self._analytics_task = self.hass.async_create_task(
+                    self._async_build_analytics(), f"{DOMAIN}_analytics"
+                )
+            task = self._analytics_task
+            try:
+                await asyncio.shield(task)
+            except Exception:
+                # Forget the failed build so the next request retries it
+                if self._analytics_task is task:
+                    self._analytics_task = None
+                raise
+        return self.analytics
+    
+    async def _async_build_analytics(self) -> None:
+        """Build the analytics from the history in the executor."""
+        games = list(self._game_history)
+        await self.hass.async_add_executor_job(self.analytics.rebuild, games)
+        # Games archived while the executor job ran
+        for game in self._game_history[len(games):]:
+            self.analytics.add_game(game)
+        self._analytics_ready = True
+    
+    async def async_run_once(
+        self, op_key: Optional[Hashable], operation: Callable[[], Awaitable[_T]]
+    ) -> _T:
+        """Run a mutating operation at most once per operation key.
+        
+        The caller builds the key from the client operation id and whatever
+        scopes it, such as the user and the command. A retry with a recent
+        key gets the result of the first attempt, or waits for it if it is
+        still running. Failed attempts are forgotten, so retrying them runs
+        the operation again.
+        """
+        if op_key is None:
+            return await operation()
+        
+        future = self._operations.get(op_key)
+        if future is not None:
+            self._operations.move_to_end(op_key)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The first attempt was cancelled before it finished
+                return await self.async_run_once(op_key, operation)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._operations[op_key] = future
+        if len(self._operations) > OPERATION_CACHE_SIZE:
+            self._operations.popitem(last=False)
+        try:
+            result = await operation()
+        except asyncio.CancelledError:
+            self._operations.pop(op_key, None)
+            future.cancel()
+            raise
+        except Exception as err:
+            self._operations.pop(op_key, None)
+            future.set_exception(err)
+            # Retries already waiting re-raise it; nobody else needs to see it
+            future.exception()
+            raise
+        future.set_result(result)
+        return result
+    
+    @property
+    def snapshot(self) -> Optional[GameState]:
+        """Return the latest published game state; it must not be modified."""
+        return self._game_state
+    
+    @property
+    def version(self) -> int:
+        """Return the number of snapshots published so far."""
+        return self._version
+    
+    async def new_game(
+        self,
+        team_count: int,
+        difficulty: Optional[str] = None,
+        large_teams: bool = False,
+        playlist_id: str = DEFAULT_PLAYLIST,
+    ) -> GameState:
         """Create a new game with specified number of teams."""
-        async with self._lock:
-            # Archive current game if exists
-            if self._game_state and not self._game_state.is_active:
-                self._game_history.append(self._game_state.to_dict())
-            
-            # Create new game
-            teams = []
-            for i in range(team_count):
-                team = Team(name=f"Team {i + 1}")
-                teams.append(team)
-            
-            self._game_state = GameState(teams=teams)
-            
-            # Persist state
-            await self._save_state()
-            
-            # Broadcast state change
-            self._broadcast_state_change()
-            
-            _LOGGER.info("Created new game with %d teams", team_count)
-            return self._game_state
+        limit = MAX_TEAMS_LARGE if large_teams else MAX_TEAMS
+        if team_count > limit:
+            raise ValueError(f"At most {limit} teams allowed")
+        if playlist_id != DEFAULT_PLAYLIST and self.media_controller:
+            catalog = self.media_controller.catalog
+            await catalog.async_ensure_loaded()
+            if playlist_id not in catalog.get_playlists():
+                raise ValueError(f"Unknown playlist {playlist_id}")
+        
+        previous = self._game_state
+        
+        # Archive current game if exists, with all of its rounds
+        if previous and not previous.is_active:
+            archived = self.get_state()
+            if previous.archived_rounds.blocks:
+                archived = {
+                    **archived,
+                    "rounds_played": [r.to_dict() for r in all_rounds(previous)],
+                }
+            self._game_history.append(archived)
+            if self.analytics and self._analytics_ready:
+                self.analytics.add_game(archived)
+        
+        if previous and self.media_controller:
+            self.media_controller.async_release_game(previous.game_id)
+        
+        game_state = GameState(
+            teams=[Team(name=f"Team {i + 1}") for i in range(team_count)],
+            playlist_id=playlist_id,
+            difficulty=difficulty,
+            large_teams=large_teams,
+        )
+        await self._async_publish(game_state)
+        
+        # Get the first song ready while teams are being set up
+        if self.media_controller:
+            self.media_controller.async_schedule_prefetch(game_state)
+        
+        _LOGGER.info("Created new game with %d teams", team_count)
+        return game_state
     
     async def update_team_name(self, team_id: str, name: str) -> None:
         """Update team name."""
-        async with self._lock:
-            if not self._game_state:
-                raise ValueError("No active game")
-            
-            team = self._get_team(team_id)
-            if team:
-                team.name = name
-                await self._save_state()
-                self._broadcast_state_change()
-                _LOGGER.debug("Updated team %s name to %s", team_id, name)
+        state = self._require_game()
+        index = self._team_index(state, team_id)
+        if index is None:
+            return
+        
+        teams = list(state.teams)
+        teams[index] = replace(teams[index], name=name)
+        await self._async_publish(replace(state, teams=teams))
+        _LOGGER.debug("Updated team %s name to %s", team_id, name)
     
     async def add_team(self) -> Optional[Team]:
         """Add a new team if under limit."""
-        async with self._lock:
-            if not self._game_state:
-                raise ValueError("No active game")
-            
-            if len(self._game_state.teams) >= 5:
-                return None
-            
-            team = Team(name=f"Team {len(self._game_state.teams) + 1}")
-            self._game_state.teams.append(team)
-            
-            await self._save_state()
-            self._broadcast_state_change()
-            
-            _LOGGER.info("Added new team: %s", team.name)
-            return team
+        state = self._require_game()
+        if len(state.teams) >= (MAX_TEAMS_LARGE if state.large_teams else MAX_TEAMS):
+            return None
+        
+        team = Team(name=f"Team {len(state.teams) + 1}")
+        await self._async_publish(replace(state, teams=[*state.teams, team]))
+        
+        _LOGGER.info("Added new team: %s", team.name)
+        return team
     
     async def remove_team(self, team_id: str) -> bool:
         """Remove a team if more than 1 remain."""
-        async with self._lock:
-            if not self._game_state:
-                raise ValueError("No active game")
-            
-            if len(self._game_state.teams) <= 1:
-                return False
-            
-            self._game_state.teams = [t for t in self._game_state.teams if t.id != team_id]
-            
-            await self._save_state()
-            self._broadcast_state_change()
-            
-            _LOGGER.info("Removed team: %s", team_id)
-            return True
+        state = self._require_game()
+        if len(state.teams) <= 1:
+            return False
+        
+        teams = [t for t in state.teams if t.id != team_id]
+        await self._async_publish(replace(state, teams=teams))
+        
+        _LOGGER.info("Removed team: %s", team_id)
+        return True
+    
+    async def start_round(self) -> GameRound:
+        """Start the next round and play its song."""
+        state = self._game_state
+        self._check_can_start_round(state)
+        
+        prepared = None
+        if self.media_controller:
+            version = self._version
+            prepared = await self.media_controller.async_take_prepared(state)
+            if self._version != version:
+                # Published while the song was prepared; build on the newer snapshot
+                game_id = state.game_id
+                state = self._game_state
+                try:
+                    self._check_can_start_round(state)
+                    if state.game_id != game_id:
+                        raise ValueError("Game changed while starting the round")
+                except ValueError:
+                    if prepared and state and state.game_id == prepared.game_id:
+                        # The players stay prerolled on it; keep it for the next round
+                        self.media_controller.async_return_prepared(prepared)
+                    raise
+        
+        game_round = GameRound(round_number=state.current_round + 1)
+        played_song_ids = state.played_song_ids
+        if prepared:
+            # Audio first: the song should be playing by the time clients render the round
+            self.media_controller.async_start_playback(prepared)
+            game_round.song_id = prepared.song.id
+            game_round.actual_year = prepared.song.year
+            played_song_ids = [*played_song_ids, prepared.song.id]
+        
+        teams = [
+            replace(team, current_guess=None, has_bet=False)
+            if team.current_guess is not None or team.has_bet
+            else team
+            for team in state.teams
+        ]
+        await self._async_publish(
+            replace(
+                state,
+                teams=teams,
+                current_round=game_round.round_number,
+                active_round=game_round,
+                played_song_ids=played_song_ids,
+                reveal=None,
+            )
+        )
+        
+        _LOGGER.info("Started round %d", game_round.round_number)
+        return game_round
+    
+    async def submit_guess(self, team_id: str, year: int, bet: bool = False) -> None:
+        """Record a team's guess for the round in progress."""
+        state = self._game_state
+        if not state or not state.active_round:
+            raise ValueError("No round in progress")
+        
+        index = self._team_index(state, team_id)
+        if index is None:
+            raise ValueError("Unknown team")
+        
+        game_round = state.active_round
+        active_round = replace(
+            game_round,
+            team_guesses={**game_round.team_guesses, team_id: year},
+            team_bets={**game_round.team_bets, team_id: bet},
+        )
+        teams = list(state.teams)
+        teams[index] = replace(teams[index], current_guess=year, has_bet=bet)
+        await self._async_publish(replace(state, teams=teams, active_round=active_round))
+        
+        # The last guess locks the round; a guess after that is a correction
+        if active_round.guesses_locked or len(active_round.team_guesses) >= len(teams):
+            self._precompute_reveal()
+        
+        _LOGGER.debug("Team %s guessed %d", team_id, year)
+    
+    async def lock_guesses(self) -> None:
+        """Close the round in progress for guesses and prepare its reveal."""
+        state = self._game_state
+        if not state or not state.active_round:
+            raise ValueError("No round in progress")
+        
+        if not state.active_round.guesses_locked:
+            active_round = replace(state.active_round, guesses_locked=True)
+            await self._async_publish(replace(state, active_round=active_round))
+        self._precompute_reveal()
+    
+    async def end_round(self) -> GameRound:
+        """End the round in progress and reveal its results."""
+        state = self._game_state
+        if not state or not state.active_round:
+            raise ValueError("No round in progress")
+        
+        reveal, self._reveal = self._reveal, None
+        if reveal and reveal[0] == self._version:
+            _, state, state_dict = reveal
+        else:
+            state, state_dict = self._build_reveal(state), None
+        game_round = state.rounds_played[-1]
+        
+        if self.song_stats:
+            self.song_stats.record_round(game_round)
+        
+        await self._async_publish(state, state_dict)
+        
+        # Select and buffer the next song while this round is being scored
+        if self.media_controller:
+            self.media_controller.async_schedule_prefetch(state)
+        
+        _LOGGER.info("Ended round %d", game_round.round_number)
+        return game_round
+    
+    async def end_game(self) -> None:
+        """Finish the active game; it is archived when the next game starts."""
+        state = self._require_game()
+        if self.media_controller:
+            self.media_controller.async_release_game(state.game_id)
+        
+        await self._async_publish(replace(state, is_active=False))
+        
+        _LOGGER.info("Ended game: %s", state.game_id)
     
     def get_state(self) -> Optional[Dict[str, Any]]:
-        """Get current game state as dictionary."""
+        """Get current game state as dictionary.
+        
+        The dictionary is built once per snapshot and shared by all readers,
+        so it must not be modified.
+        """
+        if not self._game_state:
+            return None
+        if self._state_dict is None:
+            self._state_dict = self._game_state.to_dict()
+        return self._state_dict
+    
+    def get_broadcast_state(self) -> Optional[Dict[str, Any]]:
+        """Get the game state sent to subscribed clients.
+        
+        In large-team mode only the teams on the leaderboard are included
+        and the recent rounds are left out, so a broadcast stays the size of
+        a leaderboard however many teams play. ``team_count`` tells clients
+        how many teams there are; they page through the rest with
+        get_leaderboard and get_rounds.
+        """
+        state = self.get_state()
+        if state is None or not state["large_teams"]:
+            return state
+        if self._broadcast_dict is None:
+            leaderboard = self.get_leaderboard()
+            teams = {team["id"]: team for team in state["teams"]}
+            self._broadcast_dict = {
+                **state,
+                "teams": [teams[entry["id"]] for entry in leaderboard["top"]],
+                "team_count": leaderboard["team_count"],
+                "rounds_played": [],
+            }
+        return self._broadcast_dict
+    
+    def get_stored_state(self) -> Optional[Dict[str, Any]]:
+        """Get current game state in its versioned storage layout."""
+        if not self._game_state:
+            return None
+        return encode_game(self._game_state)
+    
+    def has_team(self, team_id: str) -> bool:
+        """Return if a team plays in the current game."""
+        if not self._game_state:
+            return False
+        if self._team_ids is None:
+            self._team_ids = frozenset(team.id for team in self._game_state.teams)
+        return team_id in self._team_ids
+    
+    def get_leaderboard(
+        self,
+        limit: int = LEADERBOARD_SIZE,
+        team_id: Optional[str] = None,
+        offset: int = 0,
+    ) -> Optional[Dict[str, Any]]:
+        """Get a page of the ranked teams and, optionally, the rank of one team.
+        
+        Teams with equal scores share a rank. The ranking is computed once
+        per snapshot, so the payload and its cost do not grow with the
+        number of teams beyond the sort.
+        """
         if not self._game_state:
             return None
-        return self._game_state.to_dict()
+        if self._ranking is None:
+            ranked = _rank_teams(self._game_state.teams)
+            self._ranking = (ranked, {team.id: i for i, (_, team) in enumerate(ranked)})
+        
+        ranked, positions = self._ranking
+        
+        def _entry(rank: int, team: Team) -> Dict[str, Any]:
+            """Return a leaderboard row."""
+            return {"rank": rank, "id": team.id, "name": team.name, "score": team.score}
+        
+        own = None
+        if team_id is not None and team_id in positions:
+            own = _entry(*ranked[positions[team_id]])
+        return {
+            "team_count": len(ranked),
+            "top": [_entry(rank, team) for rank, team in ranked[offset:offset + limit]],
+            "team": own,
+        }
+    
+    def get_rounds(self, start: int, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Get played rounds from index start on, decoding only the blocks needed."""
+        state = self._game_state
+        if not state:
+            return None
+        stop = min(start + limit, state.round_count)
+        blocks = state.archived_rounds.blocks
+        archived_count = len(blocks) * ROUND_BLOCK_SIZE
+        
+        rounds: List[GameRound] = []
+        for index in range(start // ROUND_BLOCK_SIZE, len(blocks)):
+            first = index * ROUND_BLOCK_SIZE
+            if first >= stop:
+                break
+            rounds.extend(decompress_rounds(blocks[index])[max(start - first, 0):stop - first])
+        rounds.extend(
+            state.rounds_played[max(start - archived_count, 0):max(stop - archived_count, 0)]
+        )
+        return [game_round.to_dict() for game_round in rounds]
     
     def get_history(self) -> List[Dict[str, Any]]:
         """Get game history."""
         return self._game_history
     
-    def _get_team(self, team_id: str) -> Optional[Team]:
-        """Get team by ID."""
+    def _score_round(
+        self, teams: List[Team], game_round: GameRound
+    ) -> Tuple[GameRound, List[Team]]:
+        """Score the guesses of a finished round with the compiled rules."""
+        if not game_round.actual_year:
+            return game_round, teams
+        
+        trailing = set()
+        if self.scoring.is_comeback_round(game_round.round_number, len(teams)):
+            ranked = sorted(teams, key=lambda t: t.score)
+            trailing = {t.id for t in ranked[:self.scoring.comeback_bottom]}
+        
+        team_scores: Dict[str, int] = {}
+        scored: List[Team] = []
+        for team in teams:
+            guess = game_round.team_guesses.get(team.id)
+            if guess is None:
+                scored.append(replace(team, streak=0) if team.streak else team)
+                continue
+            points = self.scoring.score(
+                abs(guess - game_round.actual_year),
+                game_round.team_bets.get(team.id, False),
+                team.streak,
+                team.id in trailing,
+            )
+            team_scores[team.id] = points
+            scored.append(
+                replace(
+                    team,
+                    score=team.score + points,
+                    streak=team.streak + 1 if points else 0,
+                )
+            )
+        return replace(game_round, team_scores=team_scores), scored
+    
+    def _build_reveal(self, state: GameState) -> GameState:
+        """Return the snapshot with the round in progress scored and revealed."""
+        game_round, teams = self._score_round(state.teams, state.active_round)
+        
+        ranks_before = {team.id: rank for rank, team in _rank_teams(state.teams)}
+        rank_changes = {
+            team.id: ranks_before[team.id] - rank for rank, team in _rank_teams(teams)
+        }
+        song = None
+        if self.media_controller and game_round.song_id:
+            if found := self.media_controller.catalog.get_song(game_round.song_id):
+                song = found.to_dict()
+        
+        revealed = replace(
+            state,
+            teams=teams,
+            rounds_played=[*state.rounds_played, game_round],
+            active_round=None,
+            reveal={
+                "round_number": game_round.round_number,
+                "rank_changes": rank_changes,
+                "song": song,
+            },
+        )
+        return _tier_rounds(revealed)
+    
+    def _precompute_reveal(self) -> None:
+        """Build the reveal of the latest snapshot ahead of end_round.
+        
+        It stays valid until another snapshot is published; a late correction
+        publishes one, so the reveal is then built again or on demand.
+        """
+        state = self._game_state
+        if not state or not state.active_round:
+            return
+        revealed = self._build_reveal(state)
+        self._reveal = (self._version, revealed, revealed.to_dict())
+    
+    def _require_game(self) -> GameState:
+        """Return the latest snapshot or raise if there is no game."""
         if not self._game_state:
-            return None
-        return next((t for t in self._game_state.teams if t.id == team_id), None)
+            raise ValueError("No active game")
+        return self._game_state
+    
+    @staticmethod
+    def _check_can_start_round(state: Optional[GameState]) -> None:
+        """Raise if a round cannot be started on a snapshot."""
+        if not state or not state.is_active:
+            raise ValueError("No active game")
+        if state.active_round:
+            raise ValueError("Round already in progress")
+    
+    @staticmethod
+    def _team_index(state: GameState, team_id: str) -> Optional[int]:
+        """Get the position of a team in a snapshot."""
+        return next((i for i, t in enumerate(state.teams) if t.id == team_id), None)
+    
+    async def _async_publish(
+        self, state: GameState, state_dict: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Make a new snapshot the current one, persist it and broadcast it."""
+        self._game_state = state
+        self._version += 1
+        self._state_dict = state_dict
+        self._broadcast_dict = None
+        self._ranking = None
+        self._team_ids = None
+        await self._save_state()
+        self._broadcast_state_change()
     
     async def _save_state(self) -> None:
         """Save current state to storage."""
@@ -130,7 +621,7 @@ class GameManager:
             return
         
         # Update hass.data immediately
-        self.hass.data[DOMAIN][self.entry_id]["active_game"] = self._game_state.to_dict()
+        self.hass.data[DOMAIN][self.entry_id]["active_game"] = self.get_stored_state()
         self.hass.data[DOMAIN][self.entry_id]["game_history"] = self._game_history
         
         # Note: ConfigEntry update has delay, consider Store helper for immediate persistence
@@ -0,0 +1,231 @@
+"""HTTP API for Soundbeats."""
+from __future__ import annotations
+
+import asyncio
+import csv
+from collections.abc import Iterable, Iterator
+from datetime import date
+from http import HTTPStatus
+import io
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, IMAGE_CACHE_DIR, IMAGE_VARIANTS, IMAGES_DIR
+from .game_manager import GameManager
+from .images import ImagePipeline
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_HTTP_API = f"{DOMAIN}_http_api"
+DATA_IMAGES = f"{DOMAIN}_images"
+
+# Bytes buffered before a chunk is written to the client
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+CSV_COLUMNS = (
+    "game_id",
+    "created_at",
+    "round_number",
+    "song_id",
+    "actual_year",
+    "team_id",
+    "team_name",
+    "guess",
+    "bet",
+    "points",
+)
+
+
+@callback
+def async_setup_http_api(hass: HomeAssistant) -> None:
+    """Register the HTTP views once for all config entries."""
+    if hass.data.get(DATA_HTTP_API):
+        return
+    hass.data[DATA_HTTP_API] = True
+    hass.data[DATA_IMAGES] = ImagePipeline(
+        hass, Path(hass.config.path(IMAGES_DIR)), Path(hass.config.path(IMAGE_CACHE_DIR))
+    )
+    hass.http.register_view(SoundbeatsExportView())
+    hass.http.register_view(SoundbeatsImageView())
+
+
+class SoundbeatsExportView(HomeAssistantView):
+    """Stream archived games as NDJSON or CSV.
+
+    Query parameters:
+      format   ``ndjson`` (one game per line, default) or ``csv`` (one row per
+               team per round)
+      since    only games created on or after this date (YYYY-MM-DD)
+      until    only games created on or before this date (YYYY-MM-DD)
+      game_id  only these games; may be repeated
+
+    Games are serialized one at a time and written in chunks, so memory use
+    does not grow with the size of the archive.
+    """
+
+    url = "/api/soundbeats/{entry_id}/export"
+    name = "api:soundbeats:export"
+    requires_auth = True
+
+    async def get(self, request: web.Request, entry_id: str) -> web.StreamResponse:
+        """Stream the export."""
+        hass: HomeAssistant = request.app["hass"]
+        if entry_id not in hass.data.get(DOMAIN, {}):
+            return self.json_message("Invalid entry ID", HTTPStatus.NOT_FOUND)
+
+        query = request.query
+        export_format = query.get("format", "ndjson")
+        if export_format not in ("ndjson", "csv"):
+            return self.json_message("Unknown format", HTTPStatus.BAD_REQUEST)
+        try:
+            since = date.fromisoformat(query["since"]).isoformat() if "since" in query else None
+            until = date.fromisoformat(query["until"]).isoformat() if "until" in query else None
+        except ValueError:
+            return self.json_message("Invalid date", HTTPStatus.BAD_REQUEST)
+        game_ids = set(query.getall("game_id", []))
+
+        game_manager: GameManager = hass.data[DOMAIN][entry_id]["game_manager"]
+        games = _filter_games(game_manager.get_history(), since, until, game_ids)
+
+        response = web.StreamResponse(
+            headers={
+                "Content-Type": (
+                    "text/csv; charset=utf-8"
+                    if export_format == "csv"
+                    else "application/x-ndjson"
+                ),
+                "Content-Disposition": (
+                    f'attachment; filename="soundbeats.{export_format}"'
+                ),
+            }
+        )
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+
+        lines = _csv_lines(games) if export_format == "csv" else _ndjson_lines(games)
+        await _async_stream(response, lines)
+        return response
+
+
+class SoundbeatsImageView(HomeAssistantView):
+    """Serve a resized variant of an image below ``<config>/soundbeats/images``.
+
+    ``variant`` is one of ``IMAGE_VARIANTS``; clients pick the smallest one
+    covering their viewport. Responses carry the content digest as ETag.
+    """
+
+    url = "/api/soundbeats/images/{variant}/{name:.+}"
+    name = "api:soundbeats:images"
+    requires_auth = True
+
+    async def get(self, request: web.Request, variant: str, name: str) -> web.StreamResponse:
+        """Serve the variant."""
+        if variant not in IMAGE_VARIANTS:
+            return self.json_message("Unknown variant", HTTPStatus.NOT_FOUND)
+
+        hass: HomeAssistant = request.app["hass"]
+        pipeline: ImagePipeline = hass.data[DATA_IMAGES]
+        if (result := await pipeline.async_get(name, variant)) is None:
+            return self.json_message("Image not found", HTTPStatus.NOT_FOUND)
+
+        path, digest = result
+        headers = {
+            "ETag": f'"{digest}-{variant}"',
+            "Cache-Control": "private, max-age=86400",
+        }
+        if request.headers.get("If-None-Match") == headers["ETag"]:
+            return web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+        return web.FileResponse(path, headers=headers)
+
+
+async def _async_stream(response: web.StreamResponse, lines: Iterable[str]) -> None:
+    """Write lines in chunks of about ``EXPORT_CHUNK_SIZE`` and finish the response.
+
+    A client that goes away mid-download ends the export quietly; no more
+    games are serialized for it.
+    """
+    buffer: list[str] = []
+    size = 0
+    try:
+        for line in lines:
+            buffer.append(line)
+            size += len(line)
+            if size >= EXPORT_CHUNK_SIZE:
+                await response.write("".join(buffer).encode())
+                buffer.clear()
+                size = 0
+        if buffer:
+            await response.write("".join(buffer).encode())
+        await response.write_eof()
+    except ConnectionResetError:
+        _LOGGER.debug("Export client disconnected")
+    except asyncio.CancelledError:
+        # aiohttp cancels the handler when the client disconnects
+        _LOGGER.debug("Export cancelled")
+        raise
+
+
+def _filter_games(
+    games: Iterable[dict[str, Any]],
+    since: str | None,
+    until: str | None,
+    game_ids: set[str],
+) -> Iterator[dict[str, Any]]:
+    """Yield the games matching the filters."""
+    for game in games:
+        created = game.get("created_at", "")[:10]
+        if since and created < since:
+            continue
+        if until and created > until:
+            continue
+        if game_ids and game.get("game_id") not in game_ids:
+            continue
+        yield game
+
+
+def _ndjson_lines(games: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """Yield one JSON line per game."""
+    for game in games:
+        yield json.dumps(game, separators=(",", ":")) + "\n"
+
+
+def _csv_lines(games: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """Yield a header and one CSV line per team per round."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+
+    def _flush() -> str:
+        line = output.getvalue()
+        output.seek(0)
+        output.truncate()
+        return line
+
+    writer.writerow(CSV_COLUMNS)
+    yield _flush()
+    for game in games:
+        teams = {team["id"]: team["name"] for team in game.get("teams", [])}
+        for game_round in game.get("rounds_played", []):
+            guesses = game_round.get("team_guesses", {})
+            for team_id, team_name in teams.items():
+                writer.writerow(
+                    (
+                        game.get("game_id"),
+                        game.get("created_at"),
+                        game_round.get("round_number"),
+                        game_round.get("song_id"),
+                        game_round.get("actual_year"),
+                        team_id,
+                        team_name,
+                        guesses.get(team_id),
+                        game_round.get("team_bets", {}).get(team_id, False),
+                        game_round.get("team_scores", {}).get(team_id, 0),
+                    )
+                )
+            yield _flush()
@@ -0,0 +1,174 @@
+"""Resized image variants for Soundbeats."""
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+import hashlib
+import logging
+import os
+from pathlib import Path
+import tempfile
+import threading
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from homeassistant.core import HomeAssistant
+
+from .const import IMAGE_CACHE_MAX_BYTES, IMAGE_QUALITY, IMAGE_VARIANTS
+
+_LOGGER = logging.getLogger(__name__)
+
+IMAGE_SUFFIXES = frozenset({".gif", ".jpeg", ".jpg", ".png", ".webp"})
+
+
+class ImagePipeline:
+    """Serves images below a source directory as resized WebP variants.
+
+    Playlist images and album art are uploaded at full size, while phones
+    only show thumbnails and the TV view a card. Each variant is rendered
+    once per source content in the executor and kept on disk as
+    ``<content digest>-<variant>.webp``, so an edited image gets new files
+    and an unchanged one is never rendered twice. The cache is trimmed to
+    ``max_bytes``, evicting the least recently served files first.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        source_dir: Path,
+        cache_dir: Path,
+        max_bytes: int = IMAGE_CACHE_MAX_BYTES,
+    ) -> None:
+        """Initialize the pipeline."""
+        self.hass = hass
+        self._source_dir = source_dir.resolve()
+        self._cache_dir = cache_dir
+        self._max_bytes = max_bytes
+        # source -> (mtime_ns, size, digest), so unchanged files are not hashed again
+        self._digests: dict[Path, tuple[int, int, str]] = {}
+        # cached file name -> size in bytes, least recently served first
+        self._cache: OrderedDict[str, int] | None = None
+        self._cache_bytes = 0
+        # Guards the digests and the cache index, used by several executor threads
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[str, str], asyncio.Future[tuple[Path, str] | None]] = {}
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Return the size of the cache."""
+        return {"files": len(self._cache or ()), "bytes": self._cache_bytes}
+
+    async def async_get(self, name: str, variant: str) -> tuple[Path, str] | None:
+        """Return the file and content digest of a variant, rendering it if needed.
+
+        Concurrent requests for the same variant share one executor job.
+        """
+        key = (name, variant)
+        if (future := self._pending.get(key)) is not None:
+            return await asyncio.shield(future)
+
+        future = self.hass.async_add_executor_job(self._get_variant, name, variant)
+        self._pending[key] = future
+        try:
+            return await future
+        finally:
+            self._pending.pop(key, None)
+
+    def _get_variant(self, name: str, variant: str) -> tuple[Path, str] | None:
+        """Return a cached variant, rendering it first if needed; runs in the executor."""
+        source = (self._source_dir / name).resolve()
+        if (
+            source.suffix.lower() not in IMAGE_SUFFIXES
+            or not source.is_relative_to(self._source_dir)
+            or not source.is_file()
+        ):
+            return None
+
+        try:
+            digest = self._digest(source)
+            file_name = f"{digest}-{variant}.webp"
+            target = self._cache_dir / file_name
+            with self._lock:
+                cached = file_name in self._load_cache()
+                if cached:
+                    self._cache.move_to_end(file_name)
+            if cached and target.exists():
+                # Recency survives restarts through the modification time
+                os.utime(target)
+                return target, digest
+
+            size = self._render(source, target, IMAGE_VARIANTS[variant])
+        except (
+            OSError,
+            UnidentifiedImageError,
+            Image.DecompressionBombError,
+            SyntaxError,
+            ValueError,
+        ) as err:
+            _LOGGER.warning("Failed to render %s variant of %s: %s", variant, name, err)
+            return None
+
+        with self._lock:
+            self._add(file_name, size)
+        return target, digest
+
+    def _digest(self, source: Path) -> str:
+        """Return the content digest of a source image."""
+        stat = source.stat()
+        with self._lock:
+            known = self._digests.get(source)
+        if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+            return known[2]
+        digest = hashlib.sha256(source.read_bytes()).hexdigest()[:16]
+        with self._lock:
+            self._digests[source] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def _render(self, source: Path, target: Path, longest_side: int) -> int:
+        """Write a resized WebP copy of an image and return its size.
+
+        The image is written to a temporary file of its own and then moved
+        into place, so concurrent renders of the same variant never expose
+        a half-written file.
+        """
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((longest_side, longest_side), Image.Resampling.LANCZOS)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert(
+                    "RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB"
+                )
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, partial = tempfile.mkstemp(suffix=".partial", dir=self._cache_dir)
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    image.save(file, "WEBP", quality=IMAGE_QUALITY, method=4)
+                size = os.stat(partial).st_size
+                os.replace(partial, target)
+            except BaseException:
+                Path(partial).unlink(missing_ok=True)
+                raise
+        return size
+
+    def _load_cache(self) -> OrderedDict[str, int]:
+        """Return the cache index, reading the cache directory the first time."""
+        if self._cache is None:
+            entries = []
+            if self._cache_dir.is_dir():
+                for path in self._cache_dir.glob("*.webp"):
+                    stat = path.stat()
+                    entries.append((stat.st_mtime_ns, path.name, stat.st_size))
+            entries.sort()
+            self._cache = OrderedDict((name, size) for _, name, size in entries)
+            self._cache_bytes = sum(self._cache.values())
+        return self._cache
+
+    def _add(self, file_name: str, size: int) -> None:
+        """Add a rendered file to the cache and evict the oldest past the limit."""
+        cache = self._load_cache()
+        self._cache_bytes += size - cache.pop(file_name, 0)
+        cache[file_name] = size
+        while self._cache_bytes > self._max_bytes and len(cache) > 1:
+            evicted, evicted_size = cache.popitem(last=False)
+            self._cache_bytes -= evicted_size
+            (self._cache_dir / evicted).unlink(missing_ok=True)
@@ -0,0 +1,239 @@
+"""Local music library indexer for Soundbeats."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable, Iterator
+import logging
+import os
+from pathlib import Path
+import re
+import time
+from typing import Any
+
+import mutagen
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    LIBRARY_BATCH_SIZE,
+    LIBRARY_PARALLEL_BATCHES,
+    LIBRARY_SAVE_INTERVAL,
+)
+from .models import Song
+from .song_catalog import SongCatalog
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Library songs get ids above this so they never clash with songs.json ids
+LIBRARY_SONG_ID_BASE = 1_000_000
+
+AUDIO_EXTENSIONS = frozenset(
+    {".mp3", ".flac", ".ogg", ".oga", ".opus", ".m4a", ".mp4", ".aac", ".wav", ".wma"}
+)
+
+YEAR_PATTERN = re.compile(r"\d{4}")
+
+# Cache entry layout: [mtime_ns, size, song_id, title, artist, year]
+CacheEntry = list[Any]
+
+
+class MusicLibraryIndexer:
+    """Builds catalog songs from the tags of a local music folder.
+
+    Only files whose mtime or size changed since the last scan are opened;
+    everything else comes from a persisted cache. Tags are read in batches
+    on the executor and every finished batch is handed to the catalog, so
+    songs become playable while a large first scan is still running. The
+    cache is saved every ``LIBRARY_SAVE_INTERVAL`` seconds during a scan,
+    so a restart in the middle of a long first scan resumes from there.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, entry_id: str, folder: str, catalog: SongCatalog
+    ) -> None:
+        """Initialize the library indexer."""
+        self.hass = hass
+        self.folder = Path(folder)
+        self.catalog = catalog
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.library"
+        )
+        self._scan_lock = asyncio.Lock()
+
+    async def async_scan(self) -> dict[str, int]:
+        """Scan the folder and update the catalog; return scan counters."""
+        async with self._scan_lock:
+            return await self._async_scan()
+
+    async def _async_scan(self) -> dict[str, int]:
+        """Run a scan."""
+        started = time.monotonic()
+        stored = await self._store.async_load() or {}
+        cache: dict[str, CacheEntry] = stored.get("files", {})
+        next_id: int = stored.get("next_id", LIBRARY_SONG_ID_BASE)
+
+        files = await self.hass.async_add_executor_job(_list_audio_files, self.folder)
+
+        new_cache: dict[str, CacheEntry] = {}
+        changed: list[tuple[str, int, int, int]] = []
+        for relpath, (mtime_ns, size) in files.items():
+            entry = cache.get(relpath)
+            if entry is not None and entry[0] == mtime_ns and entry[1] == size:
+                new_cache[relpath] = entry
+                continue
+            if entry is not None:
+                song_id = entry[2]
+            else:
+                song_id, next_id = next_id, next_id + 1
+            changed.append((relpath, mtime_ns, size, song_id))
+
+        removed = [entry[2] for relpath, entry in cache.items() if relpath not in files]
+        if removed:
+            self.catalog.remove_songs(removed)
+
+        # Cached songs are cheap to rebuild; stream in those the catalog lacks
+        missing = [
+            (relpath, entry)
+            for relpath, entry in new_cache.items()
+            if self.catalog.get_song(entry[2]) is None
+        ]
+        for batch in _batched(missing, LIBRARY_BATCH_SIZE):
+            self.catalog.add_songs(self._songs(batch))
+
+        batches = list(_batched(changed, LIBRARY_BATCH_SIZE))
+        saved = time.monotonic()
+        for index in range(0, len(batches), LIBRARY_PARALLEL_BATCHES):
+            results = await asyncio.gather(
+                *(
+                    self.hass.async_add_executor_job(_read_tags, self.folder, batch)
+                    for batch in batches[index : index + LIBRARY_PARALLEL_BATCHES]
+                )
+            )
+            for result in results:
+                new_cache.update(result)
+                # A retagged file may have lost its year
+                self.catalog.remove_songs(
+                    entry[2] for entry in result.values() if entry[5] is None
+                )
+                self.catalog.add_songs(self._songs(result.items()))
+
+            if time.monotonic() - saved >= LIBRARY_SAVE_INTERVAL:
+                # Files not read yet keep their old entries and ids
+                await self._store.async_save(
+                    {"next_id": next_id, "files": {**cache, **new_cache}}
+                )
+                saved = time.monotonic()
+
+        await self._store.async_save({"next_id": next_id, "files": new_cache})
+
+        counters = {
+            "files": len(files),
+            "read": len(changed),
+            "cached": len(files) - len(changed),
+            "removed": len(removed),
+        }
+        _LOGGER.info(
+            "Indexed %s in %.1f s: %s", self.folder, time.monotonic() - started, counters
+        )
+        return counters
+
+    def _songs(self, entries: Iterable[tuple[str, CacheEntry]]) -> list[Song]:
+        """Build catalog songs from cache entries that have a year."""
+        return [
+            Song(
+                id=entry[2],
+                title=entry[3],
+                artist=entry[4],
+                year=entry[5],
+                media_id=self._media_id(relpath),
+            )
+            for relpath, entry in entries
+            if entry[5] is not None
+        ]
+
+    def _media_id(self, relpath: str) -> str:
+        """Return a playable media id for a library file."""
+        path = self.folder / relpath
+        for media_dir_id, media_dir in self.hass.config.media_dirs.items():
+            if path.is_relative_to(media_dir):
+                return (
+                    f"media-source://media_source/{media_dir_id}/"
+                    f"{path.relative_to(media_dir).as_posix()}"
+                )
+        return str(path)
+
+
+def _batched(items: list[Any], size: int) -> Iterator[list[Any]]:
+    """Yield successive batches of a list."""
+    for index in range(0, len(items), size):
+        yield items[index : index + size]
+
+
+def _list_audio_files(folder: Path) -> dict[str, tuple[int, int]]:
+    """Return relative path -> (mtime_ns, size) of audio files; runs in the executor."""
+    files: dict[str, tuple[int, int]] = {}
+    pending = [str(folder)]
+    while pending:
+        directory = pending.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError as err:
+            _LOGGER.warning("Cannot read %s: %s", directory, err)
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                        continue
+                    if os.path.splitext(entry.name)[1].lower() not in AUDIO_EXTENSIONS:
+                        continue
+                    stat = entry.stat()
+                except OSError as err:
+                    # Broken links and files removed while scanning
+                    _LOGGER.debug("Cannot read %s: %s", entry.path, err)
+                    continue
+                relpath = os.path.relpath(entry.path, folder)
+                files[relpath] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+def _read_tags(
+    folder: Path, batch: list[tuple[str, int, int, int]]
+) -> dict[str, CacheEntry]:
+    """Read title, artist and year of a batch of files; runs in the executor."""
+    entries: dict[str, CacheEntry] = {}
+    for relpath, mtime_ns, size, song_id in batch:
+        title = artist = None
+        year = None
+        try:
+            audio = mutagen.File(folder / relpath, easy=True)
+        except Exception as err:
+            # Parsers do not wrap every failure in MutagenError
+            _LOGGER.debug("Cannot read tags of %s: %s", relpath, err)
+            audio = None
+        if audio is not None and audio.tags is not None:
+            title = _first(audio.tags.get("title"))
+            artist = _first(audio.tags.get("artist"))
+            if (date := _first(audio.tags.get("date"))) and (
+                match := YEAR_PATTERN.search(date)
+            ):
+                year = int(match.group())
+        entries[relpath] = [
+            mtime_ns,
+            size,
+            song_id,
+            title or Path(relpath).stem,
+            artist or "Unknown Artist",
+            year,
+        ]
+    return entries
+
+
+def _first(values: list[str] | None) -> str | None:
+    """Return the first value of a tag."""
+    return values[0] if values else None
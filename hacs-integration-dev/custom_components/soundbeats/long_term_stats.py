@@ -0,0 +1,268 @@
+"""Long-term statistics of finished Soundbeats games."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import logging
+from typing import Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .const import DOMAIN, EVENT_GAME_STATE_CHANGED, MAX_TEAMS, STATISTICS_FLUSH_DELAY
+
+_LOGGER = logging.getLogger(__name__)
+
+GAMES_PLAYED = "games_played"
+
+# key -> (name, unit)
+MEASUREMENTS: dict[str, tuple[str, str | None]] = {
+    "winning_score": ("Winning score", "points"),
+    "points_per_round": ("Points per round", "points"),
+    "average_error": ("Average guess error", "years"),
+    **{
+        f"team_{slot}_final_score": (f"Team {slot} final score", "points")
+        for slot in range(1, MAX_TEAMS + 1)
+    },
+}
+
+
+@dataclass
+class _HourlyValue:
+    """Values of one statistic within an hour."""
+
+    start: datetime
+    count: int = 0
+    total: float = 0.0
+    min: float = 0.0
+    max: float = 0.0
+
+    @classmethod
+    def from_row(cls, start: datetime, row: dict[str, Any]) -> _HourlyValue:
+        """Resume an hour from its imported row; its state holds the count."""
+        count = int(row.get("state") or 1)
+        mean = row.get("mean") or 0.0
+        low = mean if row.get("min") is None else row["min"]
+        high = mean if row.get("max") is None else row["max"]
+        return cls(start, count, mean * count, low, high)
+
+    def add(self, value: float) -> None:
+        """Add a value."""
+        if not self.count:
+            self.min = self.max = value
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def as_statistic(self) -> StatisticData:
+        """Return the recorder row of this hour."""
+        return StatisticData(
+            start=self.start,
+            mean=self.total / self.count,
+            min=self.min,
+            max=self.max,
+            state=self.count,
+        )
+
+
+class GameStatisticsExporter:
+    """Imports the results of finished games as external statistics.
+
+    Results are folded into hourly rows when a game ends, so dashboards can
+    chart months of games from compact aggregates rather than from every
+    sensor state change. Several games finished within the same hour are
+    combined into one row. Imports are queued on the recorder thread and
+    never wait on the database from the event loop.
+
+    The current hour and the games total are read back from the recorder
+    when the exporter starts, so a restart continues the hour instead of
+    overwriting it. Changed rows are flushed together shortly after a game
+    ends, one import per statistic however many games finished. Statistic
+    ids include the config entry, so entries keep separate statistics.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the exporter."""
+        self.hass = hass
+        self.entry_id = entry_id
+        self._prefix = f"{DOMAIN}:{slugify(entry_id)}_"
+        self._hours: dict[str, _HourlyValue] = {}
+        self._exported_game_id: str | None = None
+        self._games_total = 0.0
+        self._seed_task: asyncio.Task[None] | None = None
+        self._dirty: set[str] = set()
+        self._cancel_flush: CALLBACK_TYPE | None = None
+
+    def statistic_id(self, key: str) -> str:
+        """Return the statistic id of a key for this entry."""
+        return f"{self._prefix}{key}"
+
+    @callback
+    def async_start(self, game_state: dict[str, Any] | None) -> CALLBACK_TYPE:
+        """Export every game that finishes from now on; return a stop callback."""
+        if game_state and not game_state["is_active"]:
+            # Finished before a restart and exported back then
+            self._exported_game_id = game_state["game_id"]
+        self._seed_task = self.hass.async_create_background_task(
+            self._async_seed(), f"{DOMAIN}_seed_statistics"
+        )
+        unsub = async_dispatcher_connect(
+            self.hass,
+            f"{EVENT_GAME_STATE_CHANGED}_{self.entry_id}",
+            self._async_handle_game_state,
+        )
+
+        @callback
+        def _async_stop() -> None:
+            """Stop listening and import whatever is still pending."""
+            unsub()
+            self._async_flush()
+
+        return _async_stop
+
+    async def _async_seed(self) -> None:
+        """Resume the current hour and the games total from the recorder."""
+        keys = [GAMES_PLAYED, *MEASUREMENTS]
+        rows = await get_instance(self.hass).async_add_executor_job(
+            self._read_last_rows, [self.statistic_id(key) for key in keys]
+        )
+        hour = _current_hour()
+        for key in keys:
+            if (row := rows.get(self.statistic_id(key))) is None:
+                continue
+            if key == GAMES_PLAYED:
+                self._games_total = row.get("sum") or 0.0
+            if _row_start(row["start"]) != hour:
+                continue
+            if key == GAMES_PLAYED:
+                self._hours[key] = _HourlyValue(hour, count=int(row.get("state") or 0))
+            else:
+                self._hours[key] = _HourlyValue.from_row(hour, row)
+
+    def _read_last_rows(self, statistic_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        """Return the last row of each statistic; runs on the recorder executor."""
+        rows: dict[str, dict[str, Any]] = {}
+        for statistic_id in statistic_ids:
+            last = get_last_statistics(
+                self.hass, 1, statistic_id, True, {"state", "sum", "mean", "min", "max"}
+            )
+            if found := last.get(statistic_id):
+                rows[statistic_id] = found[0]
+        return rows
+
+    @callback
+    def _async_handle_game_state(self, game_state: dict[str, Any] | None) -> None:
+        """Export a game once it has finished."""
+        if (
+            not game_state
+            or game_state["is_active"]
+            or game_state["game_id"] == self._exported_game_id
+        ):
+            return
+        self._exported_game_id = game_state["game_id"]
+        self.hass.async_create_background_task(
+            self._async_export(game_state), f"{DOMAIN}_export_statistics"
+        )
+
+    async def _async_export(self, game_state: dict[str, Any]) -> None:
+        """Fold a finished game into the hourly rows."""
+        if self._seed_task is not None:
+            await asyncio.shield(self._seed_task)
+
+        # Nothing below awaits, so games finishing together never interleave
+        start = _current_hour()
+        values = _game_values(game_state)
+        for slot, team in enumerate(game_state["teams"][:MAX_TEAMS]):
+            values[f"team_{slot + 1}_final_score"] = team["score"]
+        for key, value in values.items():
+            self._hour(key, start).add(value)
+            self._dirty.add(key)
+
+        self._games_total += 1
+        self._hour(GAMES_PLAYED, start).count += 1
+        self._dirty.add(GAMES_PLAYED)
+
+        if self._cancel_flush is None:
+            self._cancel_flush = async_call_later(
+                self.hass, STATISTICS_FLUSH_DELAY, self._async_flush
+            )
+
+    @callback
+    def _async_flush(self, _now: datetime | None = None) -> None:
+        """Import the changed hourly rows, one import per statistic."""
+        if self._cancel_flush is not None:
+            self._cancel_flush()
+            self._cancel_flush = None
+        dirty, self._dirty = self._dirty, set()
+        for key in dirty:
+            hour = self._hours[key]
+            if key == GAMES_PLAYED:
+                async_add_external_statistics(
+                    self.hass,
+                    self._metadata(key, "Games played", None, has_sum=True),
+                    [StatisticData(start=hour.start, state=hour.count, sum=self._games_total)],
+                )
+                continue
+            name, unit = MEASUREMENTS[key]
+            async_add_external_statistics(
+                self.hass, self._metadata(key, name, unit), [hour.as_statistic()]
+            )
+
+    def _hour(self, key: str, start: datetime) -> _HourlyValue:
+        """Return the accumulator of a statistic for an hour."""
+        hour = self._hours.get(key)
+        if hour is None or hour.start != start:
+            hour = self._hours[key] = _HourlyValue(start)
+        return hour
+
+    def _metadata(
+        self, key: str, name: str, unit: str | None, has_sum: bool = False
+    ) -> StatisticMetaData:
+        """Return the metadata of a statistic."""
+        return StatisticMetaData(
+            has_mean=not has_sum,
+            has_sum=has_sum,
+            name=f"Soundbeats {name.lower()}",
+            source=DOMAIN,
+            statistic_id=self.statistic_id(key),
+            unit_of_measurement=unit,
+        )
+
+
+def _current_hour() -> datetime:
+    """Return the start of the current hour."""
+    return dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+
+
+def _row_start(start: float | datetime) -> datetime:
+    """Return the start of a recorder row, which newer versions give as a timestamp."""
+    if isinstance(start, datetime):
+        return start
+    return datetime.fromtimestamp(start, timezone.utc)
+
+
+def _game_values(game_state: dict[str, Any]) -> dict[str, float]:
+    """Return the measurements of a finished game."""
+    values: dict[str, float] = {}
+    if scores := [team["score"] for team in game_state["teams"]]:
+        values["winning_score"] = max(scores)
+
+    # Totals cover archived rounds, which the state only lists in part
+    totals = game_state["round_totals"]
+    if totals["rounds"]:
+        values["points_per_round"] = totals["points"] / totals["rounds"]
+    if totals["guesses"]:
+        values["average_error"] = totals["error_sum"] / totals["guesses"]
+    return values
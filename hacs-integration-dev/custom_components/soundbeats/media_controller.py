@@ -0,0 +1,664 @@
+"""Media controller for Soundbeats - song prefetch, pre-roll and playback."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+import logging
+from typing import Any
+
+from homeassistant.components import media_source
+from homeassistant.components.media_player import (
+    DOMAIN as MEDIA_PLAYER_DOMAIN,
+    MediaPlayerEntityFeature,
+    MediaPlayerState,
+    async_process_play_media_url,
+)
+from homeassistant.components.media_player.const import (
+    ATTR_INPUT_SOURCE,
+    ATTR_MEDIA_CONTENT_ID,
+    ATTR_MEDIA_CONTENT_TYPE,
+    ATTR_MEDIA_SEEK_POSITION,
+    ATTR_MEDIA_VOLUME_LEVEL,
+    ATTR_MEDIA_VOLUME_MUTED,
+    SERVICE_PLAY_MEDIA,
+    SERVICE_SELECT_SOURCE,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    ATTR_SUPPORTED_FEATURES,
+    SERVICE_MEDIA_PAUSE,
+    SERVICE_MEDIA_PLAY,
+    SERVICE_MEDIA_SEEK,
+    SERVICE_MEDIA_STOP,
+    SERVICE_VOLUME_MUTE,
+    SERVICE_VOLUME_SET,
+)
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import (
+    CONF_CLIP_DURATION,
+    CONF_MEDIA_PLAYER,
+    CONF_MEDIA_SOURCE,
+    CONF_MEDIA_VOLUME,
+    DEFAULT_CLIP_DURATION,
+    DEFAULT_TARGET_SKEW,
+    DOMAIN,
+    MAX_STOP_LEAD,
+    MEDIA_PREROLL_TIMEOUT,
+    MEDIA_START_TIMEOUT,
+)
+from .models import GameState, Song
+from .playlists import ConstraintChecker
+from .song_catalog import CatalogIndex, SongCatalog
+from .song_stats import SongStatsTracker
+
+_LOGGER = logging.getLogger(__name__)
+
+LATENCY_SAMPLES = 20
+LATENCY_SMOOTHING = 0.3
+STOP_LEAD_SMOOTHING = 0.5
+# Songs drawn when looking for one of the game's difficulty
+DIFFICULTY_DRAWS = 8
+
+STOPPED_STATES = (
+    MediaPlayerState.PAUSED,
+    MediaPlayerState.IDLE,
+    MediaPlayerState.OFF,
+    MediaPlayerState.ON,
+)
+
+
+@dataclass
+class PreparedSong:
+    """A song selected and resolved ahead of its round."""
+
+    game_id: str
+    song: Song
+    media_id: str
+    media_type: str
+    warmed: set[str] = field(default_factory=set)
+
+
+class MediaController:
+    """Selects, pre-rolls and starts the songs of a game.
+
+    While a round is being scored the next song is picked from the catalog,
+    its media id is resolved and the target players are warmed up: the source
+    is selected, the volume preset applied and the song buffered and paused
+    while muted. Starting the next round is then a single ``media_play`` per
+    player, issued through the playback group.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        catalog: SongCatalog,
+        song_stats: SongStatsTracker | None = None,
+    ) -> None:
+        """Initialize the media controller."""
+        self.hass = hass
+        self.entry_id = entry.entry_id
+        self.catalog = catalog
+        self.song_stats = song_stats
+        self._config = {**entry.data, **entry.options}
+        self._prepared: PreparedSong | None = None
+        # game id -> checker of its dynamic playlist, kept up to date per draw
+        self._checkers: dict[str, ConstraintChecker | None] = {}
+        self._prefetch_task: asyncio.Task | None = None
+        self._latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._warm_starts = 0
+        self._cold_starts = 0
+        self._start_timeouts = 0
+        self.clip_scheduler = ClipScheduler(
+            self, self._config.get(CONF_CLIP_DURATION, DEFAULT_CLIP_DURATION)
+        )
+        self.playback_group = PlaybackGroup(self, DEFAULT_TARGET_SKEW)
+
+    @property
+    def entity_ids(self) -> list[str]:
+        """Return the media players used for playback."""
+        if entity_ids := self._config.get(CONF_MEDIA_PLAYER):
+            # Entries created before multi-speaker support store a single id
+            return [entity_ids] if isinstance(entity_ids, str) else list(entity_ids)
+        return [
+            entity.entity_id
+            for entity in er.async_entries_for_config_entry(
+                er.async_get(self.hass), self.entry_id
+            )
+            if entity.domain == MEDIA_PLAYER_DOMAIN
+        ]
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return playback start latency statistics."""
+        latencies = list(self._latencies)
+        return {
+            "last_start_latency": latencies[-1] if latencies else None,
+            "avg_start_latency": sum(latencies) / len(latencies) if latencies else None,
+            "max_start_latency": max(latencies) if latencies else None,
+            "warm_starts": self._warm_starts,
+            "cold_starts": self._cold_starts,
+            "start_timeouts": self._start_timeouts,
+            "clip": self.clip_scheduler.stats,
+            "group": self.playback_group.stats,
+        }
+
+    @callback
+    def async_schedule_prefetch(self, game_state: GameState) -> None:
+        """Prefetch the next song in the background."""
+        if self._prefetch_task and not self._prefetch_task.done():
+            return
+        self._prefetch_task = self.hass.async_create_background_task(
+            self.async_prefetch(game_state), f"{DOMAIN}_prefetch_{self.entry_id}"
+        )
+
+    async def async_prefetch(self, game_state: GameState) -> PreparedSong | None:
+        """Select and resolve the next song and warm up the player."""
+        # A round ended early leaves its clip playing; end it before buffering
+        await self.clip_scheduler.async_stop_now()
+        prepared = await self._async_prepare(game_state)
+        if prepared is None:
+            return None
+        entity_ids = self.entity_ids
+        results = await asyncio.gather(
+            *(self._async_preroll(entity_id, prepared) for entity_id in entity_ids)
+        )
+        prepared.warmed = {
+            entity_id for entity_id, warmed in zip(entity_ids, results) if warmed
+        }
+        self._prepared = prepared
+        _LOGGER.debug(
+            "Prefetched song %s (warmed: %s)", prepared.song.id, sorted(prepared.warmed)
+        )
+        return prepared
+
+    async def async_take_prepared(self, game_state: GameState) -> PreparedSong | None:
+        """Return the song for the next round, preparing one if needed."""
+        if self._prefetch_task and not self._prefetch_task.done():
+            await asyncio.shield(self._prefetch_task)
+
+        prepared, self._prepared = self._prepared, None
+        if (
+            prepared is None
+            or prepared.game_id != game_state.game_id
+            or prepared.song.id in game_state.played_song_ids
+        ):
+            prepared = await self._async_prepare(game_state)
+        return prepared
+
+    @callback
+    def async_return_prepared(self, prepared: PreparedSong) -> None:
+        """Keep a taken song for the next round when its round did not start."""
+        if self._prepared is None:
+            self._prepared = prepared
+
+    @callback
+    def async_release_game(self, game_id: str) -> None:
+        """Drop everything held for a finished game."""
+        self.catalog.release(game_id)
+        self._checkers.pop(game_id, None)
+        if self._prepared and self._prepared.game_id == game_id:
+            self._prepared = None
+
+    @callback
+    def async_start_playback(self, prepared: PreparedSong) -> None:
+        """Start playback without waiting for the player to confirm."""
+        self.hass.async_create_background_task(
+            self.async_play(prepared), f"{DOMAIN}_play_{self.entry_id}"
+        )
+
+    async def async_play(self, prepared: PreparedSong) -> float | None:
+        """Start playback and return the measured start latency in seconds."""
+        if not (entity_ids := self.entity_ids):
+            _LOGGER.warning("No media player available for playback")
+            return None
+
+        started = self.hass.loop.time()
+        commands: dict[str, tuple[str, dict[str, Any]]] = {}
+        for entity_id in entity_ids:
+            state = self.hass.states.get(entity_id)
+            buffered = (
+                entity_id in prepared.warmed
+                and state is not None
+                and state.state == MediaPlayerState.PAUSED
+                and state.attributes.get(ATTR_MEDIA_CONTENT_ID)
+                in (None, prepared.media_id)
+            )
+            if buffered:
+                commands[entity_id] = (SERVICE_MEDIA_PLAY, {})
+            else:
+                commands[entity_id] = (SERVICE_PLAY_MEDIA, self._play_media_data(prepared))
+
+        warm = all(service == SERVICE_MEDIA_PLAY for service, _ in commands.values())
+        if warm:
+            self._warm_starts += 1
+        else:
+            self._cold_starts += 1
+
+        reached = await self.playback_group.async_start(commands)
+        playing = {entity_id: at for entity_id, at in reached.items() if at is not None}
+        if not playing:
+            self._start_timeouts += 1
+            _LOGGER.warning(
+                "No player reported playing song %s within %.0f s",
+                prepared.song.id,
+                MEDIA_START_TIMEOUT,
+            )
+            return None
+
+        # The clip runs from the moment audio starts, not from the command
+        first_audio = min(playing.values())
+        self.clip_scheduler.async_schedule(list(playing), first_audio, prepared.song.id)
+
+        latency = first_audio - started
+        self._latencies.append(latency)
+        _LOGGER.info(
+            "Started song %s on %d of %d players in %.0f ms (%s start)",
+            prepared.song.id,
+            len(playing),
+            len(entity_ids),
+            latency * 1000,
+            "warm" if warm else "cold",
+        )
+        return latency
+
+    async def _async_prepare(self, game_state: GameState) -> PreparedSong | None:
+        """Pick the next song for a game and resolve its media id."""
+        await self.catalog.async_ensure_loaded()
+        song = self._pick_song(self.catalog.index_for(game_state.game_id), game_state)
+        if song is None:
+            _LOGGER.warning("No unplayed songs left in playlist %s", game_state.playlist_id)
+            return None
+
+        media_id, media_type = song.media_id, song.media_type
+        if media_source.is_media_source_id(media_id):
+            try:
+                entity_ids = self.entity_ids
+                play_item = await media_source.async_resolve_media(
+                    self.hass, media_id, entity_ids[0] if entity_ids else None
+                )
+            except HomeAssistantError as err:
+                _LOGGER.error("Failed to resolve %s: %s", media_id, err)
+                return None
+            media_id = async_process_play_media_url(self.hass, play_item.url)
+            media_type = play_item.mime_type
+
+        return PreparedSong(game_state.game_id, song, media_id, media_type)
+
+    def _pick_song(self, index: CatalogIndex, game_state: GameState) -> Song | None:
+        """Pick a song, preferring the game's difficulty.
+
+        Songs without enough guesses yet are accepted for any difficulty; if
+        none of a few draws matches, the last one is used anyway.
+        """
+        if game_state.game_id not in self._checkers:
+            self._checkers[game_state.game_id] = index.checker(game_state.playlist_id)
+        checker = self._checkers[game_state.game_id]
+        song = index.pick_song(game_state.playlist_id, game_state.played_song_ids, checker)
+        if not game_state.difficulty or self.song_stats is None:
+            return song
+        for _ in range(DIFFICULTY_DRAWS):
+            if song is None or self.song_stats.difficulty(song.id) in (
+                game_state.difficulty,
+                None,
+            ):
+                break
+            song = index.pick_song(game_state.playlist_id, game_state.played_song_ids, checker)
+        return song
+
+    async def _async_preroll(self, entity_id: str, prepared: PreparedSong) -> bool:
+        """Warm up a player and leave the song buffered and paused."""
+        state = self.hass.states.get(entity_id)
+        if state is None or state.state in (
+            MediaPlayerState.PLAYING,
+            MediaPlayerState.BUFFERING,
+        ):
+            # Never cut off whatever is still playing
+            return False
+
+        features = state.attributes.get(ATTR_SUPPORTED_FEATURES, 0)
+        source = self._config.get(CONF_MEDIA_SOURCE)
+        volume = self._config.get(CONF_MEDIA_VOLUME)
+
+        try:
+            if (
+                source
+                and features & MediaPlayerEntityFeature.SELECT_SOURCE
+                and state.attributes.get(ATTR_INPUT_SOURCE) != source
+            ):
+                await self._async_call(
+                    SERVICE_SELECT_SOURCE, entity_id, {ATTR_INPUT_SOURCE: source}
+                )
+            if (
+                volume is not None
+                and features & MediaPlayerEntityFeature.VOLUME_SET
+                and state.attributes.get(ATTR_MEDIA_VOLUME_LEVEL) != volume
+            ):
+                await self._async_call(
+                    SERVICE_VOLUME_SET, entity_id, {ATTR_MEDIA_VOLUME_LEVEL: volume}
+                )
+            if not features & MediaPlayerEntityFeature.PAUSE:
+                return False
+
+            mute = bool(features & MediaPlayerEntityFeature.VOLUME_MUTE)
+            if mute:
+                await self._async_call(
+                    SERVICE_VOLUME_MUTE, entity_id, {ATTR_MEDIA_VOLUME_MUTED: True}
+                )
+            try:
+                buffered = await self._async_call_and_wait(
+                    entity_id,
+                    SERVICE_PLAY_MEDIA,
+                    self._play_media_data(prepared),
+                    MEDIA_PREROLL_TIMEOUT,
+                )
+                await self._async_call(SERVICE_MEDIA_PAUSE, entity_id)
+                if features & MediaPlayerEntityFeature.SEEK:
+                    await self._async_call(
+                        SERVICE_MEDIA_SEEK, entity_id, {ATTR_MEDIA_SEEK_POSITION: 0}
+                    )
+            finally:
+                if mute:
+                    await self._async_call(
+                        SERVICE_VOLUME_MUTE, entity_id, {ATTR_MEDIA_VOLUME_MUTED: False}
+                    )
+        except HomeAssistantError as err:
+            _LOGGER.warning(
+                "Pre-roll of song %s on %s failed: %s", prepared.song.id, entity_id, err
+            )
+            return False
+
+        return buffered is not None
+
+    async def _async_call_and_wait(
+        self,
+        entity_id: str,
+        service: str,
+        data: dict[str, Any],
+        timeout: float,
+        states: tuple[str, ...] = (MediaPlayerState.PLAYING,),
+    ) -> float | None:
+        """Call a service and return the loop time the player reaches a state."""
+        reached: asyncio.Future[float] = self.hass.loop.create_future()
+
+        @callback
+        def _async_state_listener(event: Event) -> None:
+            """Resolve once the player reports one of the target states."""
+            new_state = event.data["new_state"]
+            if (
+                new_state is not None
+                and new_state.state in states
+                and not reached.done()
+            ):
+                reached.set_result(self.hass.loop.time())
+
+        # Subscribe first; players that update synchronously report before the call returns
+        unsub = async_track_state_change_event(
+            self.hass, [entity_id], _async_state_listener
+        )
+        try:
+            await self._async_call(service, entity_id, data)
+            return await asyncio.wait_for(reached, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            unsub()
+
+    async def _async_call(
+        self, service: str, entity_id: str, data: dict[str, Any] | None = None
+    ) -> None:
+        """Call a media player service on an entity."""
+        await self.hass.services.async_call(
+            MEDIA_PLAYER_DOMAIN,
+            service,
+            {ATTR_ENTITY_ID: entity_id, **(data or {})},
+            blocking=True,
+        )
+
+    @staticmethod
+    def _play_media_data(prepared: PreparedSong) -> dict[str, Any]:
+        """Return the play_media service data for a prepared song."""
+        return {
+            ATTR_MEDIA_CONTENT_ID: prepared.media_id,
+            ATTR_MEDIA_CONTENT_TYPE: prepared.media_type,
+        }
+
+
+@dataclass
+class _Clip:
+    """A clip that is currently playing."""
+
+    entity_ids: list[str]
+    song_id: int
+    playing_at: float
+    deadline: float
+
+
+class ClipScheduler:
+    """Stops each song after exactly the configured clip duration.
+
+    The clip is timed from the player's own transition to playing, so start
+    latency never shortens it, and the stop is scheduled on the loop's
+    monotonic clock rather than derived from ``media_position`` updates. The
+    stop command is sent early by a learned lead that covers both event loop
+    lag and the player's stop latency, so every room hears the same length.
+    """
+
+    def __init__(self, controller: MediaController, duration: float) -> None:
+        """Initialize the clip scheduler."""
+        self.hass = controller.hass
+        self.duration = duration
+        self._controller = controller
+        self._clip: _Clip | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        self._stop_lead = 0.0
+        self._clip_lengths: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return achieved clip length statistics."""
+        lengths = list(self._clip_lengths)
+        return {
+            "target": self.duration,
+            "stop_lead": self._stop_lead,
+            "last_length": lengths[-1] if lengths else None,
+            "max_error": max(abs(length - self.duration) for length in lengths)
+            if lengths
+            else None,
+        }
+
+    @callback
+    def async_schedule(
+        self, entity_ids: list[str], playing_at: float, song_id: int
+    ) -> None:
+        """Schedule the stop of a clip that started playing at ``playing_at``."""
+        self.async_cancel()
+        self._clip = _Clip(entity_ids, song_id, playing_at, playing_at + self.duration)
+        self._timer = self.hass.loop.call_at(
+            self._clip.deadline - self._stop_lead, self._async_fire
+        )
+
+    @callback
+    def async_cancel(self) -> None:
+        """Forget the current clip without stopping playback."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._clip = None
+
+    async def async_stop_now(self) -> None:
+        """Stop the current clip immediately, if one is still playing."""
+        if self._timer is None:
+            return
+        self._timer.cancel()
+        self._timer = None
+        await self._async_stop(self.hass.loop.time(), scheduled=False)
+
+    @callback
+    def _async_fire(self) -> None:
+        """Handle the stop timer."""
+        fire_at = self._timer.when() if self._timer else self.hass.loop.time()
+        self._timer = None
+        self.hass.async_create_background_task(
+            self._async_stop(fire_at, scheduled=True), f"{DOMAIN}_clip_stop"
+        )
+
+    async def _async_stop(self, fire_at: float, scheduled: bool) -> None:
+        """Stop the player and record the achieved clip length."""
+        if (clip := self._clip) is None:
+            return
+        self._clip = None
+
+        results = await asyncio.gather(
+            *(self._async_stop_player(entity_id) for entity_id in clip.entity_ids)
+        )
+        if not (stopped_at := [at for at in results if at is not None]):
+            _LOGGER.warning("Song %s did not stop within %.0f s", clip.song_id, MEDIA_START_TIMEOUT)
+            return
+
+        stopped = max(stopped_at)
+        length = stopped - clip.playing_at
+        if scheduled:
+            # Rounds ended early say nothing about lag or clip accuracy
+            self._clip_lengths.append(length)
+            observed_lead = min(MAX_STOP_LEAD, max(0.0, stopped - fire_at))
+            self._stop_lead += STOP_LEAD_SMOOTHING * (observed_lead - self._stop_lead)
+        _LOGGER.info(
+            "Clip of song %s lasted %.3f s (target %.3f s, stop lead %.0f ms)",
+            clip.song_id,
+            length,
+            self.duration,
+            self._stop_lead * 1000,
+        )
+
+    async def _async_stop_player(self, entity_id: str) -> float | None:
+        """Pause or stop a player and return the loop time it went quiet."""
+        state = self.hass.states.get(entity_id)
+        features = state.attributes.get(ATTR_SUPPORTED_FEATURES, 0) if state else 0
+        service = (
+            SERVICE_MEDIA_PAUSE
+            if features & MediaPlayerEntityFeature.PAUSE
+            else SERVICE_MEDIA_STOP
+        )
+        try:
+            return await self._controller._async_call_and_wait(
+                entity_id, service, {}, MEDIA_START_TIMEOUT, STOPPED_STATES
+            )
+        except HomeAssistantError as err:
+            _LOGGER.error("Failed to stop %s: %s", entity_id, err)
+            return None
+
+
+class PlaybackGroup:
+    """Starts several players so that their audio begins together.
+
+    Each player's command-to-playing latency is learned per command, since a
+    warm ``media_play`` answers much faster than a cold ``play_media``. All
+    commands are issued concurrently, with faster players held back by their
+    difference to the slowest expected latency, so that playback begins on
+    every speaker within ``target_skew``.
+    """
+
+    def __init__(self, controller: MediaController, target_skew: float) -> None:
+        """Initialize the playback group."""
+        self.hass = controller.hass
+        self.target_skew = target_skew
+        self._controller = controller
+        self._expected: dict[tuple[str, str], float] = {}
+        self._samples: dict[str, deque[float]] = {}
+        self._skews: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._skew_misses = 0
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return per-player latency and group skew statistics."""
+        skews = list(self._skews)
+        return {
+            "target_skew": self.target_skew,
+            "last_skew": skews[-1] if skews else None,
+            "max_skew": max(skews) if skews else None,
+            "skew_misses": self._skew_misses,
+            "players": {
+                entity_id: {
+                    "avg_latency": sum(samples) / len(samples),
+                    "max_latency": max(samples),
+                    "samples": len(samples),
+                }
+                for entity_id, samples in self._samples.items()
+                if samples
+            },
+        }
+
+    def expected_latency(self, entity_id: str, service: str) -> float:
+        """Return the learned command-to-playing latency of a player."""
+        return self._expected.get((entity_id, service), 0.0)
+
+    async def async_start(
+        self, commands: dict[str, tuple[str, dict[str, Any]]]
+    ) -> dict[str, float | None]:
+        """Start all players and return the loop time each reported playing."""
+        expected = {
+            entity_id: self.expected_latency(entity_id, service)
+            for entity_id, (service, _) in commands.items()
+        }
+        slowest = max(expected.values(), default=0.0)
+        start = self.hass.loop.time()
+
+        results = await asyncio.gather(
+            *(
+                self._async_start_player(
+                    entity_id, service, data, start + slowest - expected[entity_id]
+                )
+                for entity_id, (service, data) in commands.items()
+            )
+        )
+        reached = dict(zip(commands, results))
+
+        playing_at = [at for at in results if at is not None]
+        if len(playing_at) > 1:
+            skew = max(playing_at) - min(playing_at)
+            self._skews.append(skew)
+            if skew > self.target_skew:
+                self._skew_misses += 1
+                _LOGGER.warning(
+                    "Players started %.0f ms apart (target %.0f ms)",
+                    skew * 1000,
+                    self.target_skew * 1000,
+                )
+        return reached
+
+    async def _async_start_player(
+        self, entity_id: str, service: str, data: dict[str, Any], issue_at: float
+    ) -> float | None:
+        """Issue a start command at ``issue_at`` and learn the player's latency."""
+        if (delay := issue_at - self.hass.loop.time()) > 0:
+            await asyncio.sleep(delay)
+
+        issued = self.hass.loop.time()
+        try:
+            reached = await self._controller._async_call_and_wait(
+                entity_id, service, data, MEDIA_START_TIMEOUT
+            )
+        except HomeAssistantError as err:
+            _LOGGER.error("Failed to start %s: %s", entity_id, err)
+            return None
+        if reached is None:
+            _LOGGER.warning(
+                "%s did not report playing within %.0f s", entity_id, MEDIA_START_TIMEOUT
+            )
+            return None
+
+        latency = reached - issued
+        key = (entity_id, service)
+        if (previous := self._expected.get(key)) is None:
+            self._expected[key] = latency
+        else:
+            self._expected[key] = previous + LATENCY_SMOOTHING * (latency - previous)
+        self._samples.setdefault(entity_id, deque(maxlen=LATENCY_SAMPLES)).append(latency)
+        return reached
@@ -1,7 +1,12 @@
 """Soundbeats media player entities."""
 from __future__ import annotations
 
+import asyncio
+from collections import Counter
+from dataclasses import dataclass, replace
+from datetime import datetime
 import logging
+import random
 from typing import Any
 
 from homeassistant.components.media_player import (
@@ -10,42 +15,143 @@ from homeassistant.components.media_player import (
     MediaPlayerState,
     MediaType,
 )
+from homeassistant.components.media_player.const import (
+    ATTR_MEDIA_POSITION,
+    ATTR_MEDIA_POSITION_UPDATED_AT,
+)
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .const import CONF_MOCK_LATENCIES, CONF_MOCK_PROFILE, DEFAULT_MOCK_PROFILE, DOMAIN
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class SimulationProfile:
+    """How a mock player deviates from an ideal, instant player."""
+
+    latency_mean: float = 0.0  # seconds from command to effect
+    latency_jitter: float = 0.0  # standard deviation of the latency
+    buffering_delay: float = 0.0  # seconds spent buffering before playing new media
+    drop_rate: float = 0.0  # probability that a command is silently ignored
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Return the latency of a single command."""
+        if not self.latency_jitter:
+            return self.latency_mean
+        return max(0.0, rng.gauss(self.latency_mean, self.latency_jitter))
+
+
+SIMULATION_PROFILES: dict[str, SimulationProfile] = {
+    "instant": SimulationProfile(),
+    "speaker": SimulationProfile(
+        latency_mean=0.15,
+        latency_jitter=0.03,
+        buffering_delay=0.3,
+    ),
+    "cloud": SimulationProfile(
+        latency_mean=0.8,
+        latency_jitter=0.3,
+        buffering_delay=1.5,
+        drop_rate=0.02,
+    ),
+    "flaky": SimulationProfile(
+        latency_mean=0.4,
+        latency_jitter=0.4,
+        buffering_delay=1.0,
+        drop_rate=0.15,
+    ),
+}
+
+
+def parse_latencies(value: str) -> list[float]:
+    """Parse a comma separated list of mock player latencies in seconds."""
+    latencies = [float(part) for part in value.split(",") if part.strip()]
+    if not latencies or any(latency < 0 for latency in latencies):
+        raise ValueError("Expected one or more non-negative latencies")
+    return latencies
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    """Set up the mock media player."""
-    async_add_entities([MockMediaPlayer(config_entry.entry_id)], True)
+    """Set up the mock media players, one per configured latency."""
+    latencies = parse_latencies(config_entry.data.get(CONF_MOCK_LATENCIES, "0"))
+    profile = SIMULATION_PROFILES[
+        config_entry.data.get(CONF_MOCK_PROFILE, DEFAULT_MOCK_PROFILE)
+    ]
+    async_add_entities(
+        [
+            MockMediaPlayer(
+                config_entry.entry_id,
+                latency,
+                index,
+                replace(profile, latency_mean=profile.latency_mean + latency),
+            )
+            for index, latency in enumerate(latencies)
+        ],
+        True,
+    )
 
 
 class MockMediaPlayer(MediaPlayerEntity):
-    """Soundbeats media player entities."""
+    """Soundbeats media player entities.
+
+    A simulation profile makes the player behave like real hardware: commands
+    take effect after a sampled latency, new media buffers before playing
+    and some commands are dropped. Every received command is counted so
+    timing code can be benchmarked against it.
+
+    State is only written when the player changes state. The position is
+    reported with the time it was taken, from which the frontend advances
+    it while playing, so playback causes no periodic writes.
+    """
 
     _attr_has_entity_name = True
     _attr_name = "Mock Player"
-    
-    def __init__(self, entry_id: str) -> None:
+    _unrecorded_attributes = frozenset({
+        "commands_received",
+        "commands_dropped",
+        "command_counts",
+        ATTR_MEDIA_POSITION,
+        ATTR_MEDIA_POSITION_UPDATED_AT,
+    })
+
+    def __init__(
+        self,
+        entry_id: str,
+        latency: float = 0.0,
+        index: int = 0,
+        profile: SimulationProfile | None = None,
+        seed: int | None = None,
+    ) -> None:
         """Initialize the mock media player."""
         self._entry_id = entry_id
+        self._profile = profile or SimulationProfile(latency_mean=latency)
+        self._rng = random.Random(seed)
+        self.command_counts: Counter[str] = Counter()
+        self.dropped_commands = 0
         self._attr_unique_id = f"{entry_id}_mock_player"
+        if index:
+            # The first player keeps the original unique id
+            self._attr_unique_id = f"{entry_id}_mock_player_{index + 1}"
+            self._attr_name = f"Mock Player {index + 1}"
         self._state = MediaPlayerState.IDLE
         self._volume = 0.5
         self._is_muted = False
+        self._media_content_id: str | None = None
         self._media_title: str | None = None
         self._media_artist: str | None = None
         self._media_duration: int | None = None
         self._media_position: int | None = None
-        
+        self._media_position_updated_at: datetime | None = None
+        self._playing_since: float | None = None
+
         # Define supported features
         self._attr_supported_features = (
             MediaPlayerEntityFeature.PLAY
@@ -55,6 +161,7 @@ class MockMediaPlayer(MediaPlayerEntity):
             | MediaPlayerEntityFeature.VOLUME_MUTE
             | MediaPlayerEntityFeature.VOLUME_STEP
             | MediaPlayerEntityFeature.PLAY_MEDIA
+            | MediaPlayerEntityFeature.SEEK
             | MediaPlayerEntityFeature.NEXT_TRACK
             | MediaPlayerEntityFeature.PREVIOUS_TRACK
         )
@@ -92,6 +199,11 @@ class MockMediaPlayer(MediaPlayerEntity):
             return MediaType.MUSIC
         return None
 
+    @property
+    def media_content_id(self) -> str | None:
+        """Return the content ID of current playing media."""
+        return self._media_content_id
+
     @property
     def media_title(self) -> str | None:
         """Return the title of current playing media."""
@@ -112,73 +224,158 @@ class MockMediaPlayer(MediaPlayerEntity):
         """Return the position of current playing media in seconds."""
         return self._media_position
 
+    @property
+    def media_position_updated_at(self) -> datetime | None:
+        """Return when the position was last reported."""
+        return self._media_position_updated_at
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return simulation counters."""
+        return {
+            "commands_received": sum(self.command_counts.values()),
+            "commands_dropped": self.dropped_commands,
+            "command_counts": dict(self.command_counts),
+        }
+
+    async def _async_receive(self, command: str) -> bool:
+        """Count a command and simulate its latency; return False if dropped."""
+        self.command_counts[command] += 1
+        if self._profile.drop_rate and self._rng.random() < self._profile.drop_rate:
+            self.dropped_commands += 1
+            _LOGGER.debug("Dropping %s command", command)
+            return False
+        if latency := self._profile.sample_latency(self._rng):
+            await asyncio.sleep(latency)
+        return True
+
+    def _start_position(self) -> None:
+        """Let the position advance from where it is."""
+        self._playing_since = self.hass.loop.time() - (self._media_position or 0)
+        self._media_position_updated_at = dt_util.utcnow()
+
+    def _freeze_position(self) -> None:
+        """Stop the position where playback is."""
+        if self._playing_since is not None:
+            self._media_position = int(self.hass.loop.time() - self._playing_since)
+            self._media_position_updated_at = dt_util.utcnow()
+            self._playing_since = None
+
+    def _set_position(self, position: int) -> None:
+        """Move the position, which keeps advancing if playing."""
+        self._media_position = position
+        if self._playing_since is not None:
+            self._start_position()
+        else:
+            self._media_position_updated_at = dt_util.utcnow()
+
     async def async_play_media(
         self, media_type: MediaType | str, media_id: str, **kwargs: Any
     ) -> None:
         """Play media."""
         _LOGGER.debug("Playing media: %s - %s", media_type, media_id)
-        self._state = MediaPlayerState.PLAYING
+        if not await self._async_receive("play_media"):
+            return
+        self._freeze_position()
+        self._media_content_id = media_id
         self._media_title = f"Mock Track: {media_id}"
         self._media_artist = "Mock Artist"
         self._media_duration = 180  # 3 minutes
         self._media_position = 0
+        if self._profile.buffering_delay:
+            self._state = MediaPlayerState.BUFFERING
+            self.async_write_ha_state()
+            await asyncio.sleep(self._profile.buffering_delay)
+        self._state = MediaPlayerState.PLAYING
+        self._start_position()
         self.async_write_ha_state()
 
     async def async_media_play(self) -> None:
         """Start playing."""
+        if not await self._async_receive("media_play"):
+            return
         if self._state == MediaPlayerState.PAUSED:
             self._state = MediaPlayerState.PLAYING
+            self._start_position()
             self.async_write_ha_state()
 
     async def async_media_pause(self) -> None:
         """Pause playback."""
+        if not await self._async_receive("media_pause"):
+            return
         if self._state == MediaPlayerState.PLAYING:
             self._state = MediaPlayerState.PAUSED
+            self._freeze_position()
             self.async_write_ha_state()
 
     async def async_media_stop(self) -> None:
         """Stop playback."""
+        if not await self._async_receive("media_stop"):
+            return
+        self._freeze_position()
         self._state = MediaPlayerState.IDLE
+        self._media_content_id = None
         self._media_title = None
         self._media_artist = None
         self._media_duration = None
         self._media_position = None
+        self._media_position_updated_at = None
         self.async_write_ha_state()
 
+    async def async_media_seek(self, position: float) -> None:
+        """Seek to a position in the current media."""
+        if not await self._async_receive("media_seek"):
+            return
+        if self._state in (MediaPlayerState.PLAYING, MediaPlayerState.PAUSED):
+            self._set_position(int(position))
+            self.async_write_ha_state()
+
     async def async_media_next_track(self) -> None:
         """Skip to next track."""
         _LOGGER.debug("Skipping to next track")
+        if not await self._async_receive("media_next_track"):
+            return
         if self._state in (MediaPlayerState.PLAYING, MediaPlayerState.PAUSED):
             self._media_title = "Mock Track: Next"
-            self._media_position = 0
+            self._set_position(0)
             self.async_write_ha_state()
 
     async def async_media_previous_track(self) -> None:
         """Skip to previous track."""
         _LOGGER.debug("Skipping to previous track")
+        if not await self._async_receive("media_previous_track"):
+            return
         if self._state in (MediaPlayerState.PLAYING, MediaPlayerState.PAUSED):
             self._media_title = "Mock Track: Previous"
-            self._media_position = 0
+            self._set_position(0)
             self.async_write_ha_state()
 
     async def async_set_volume_level(self, volume: float) -> None:
         """Set volume level."""
+        if not await self._async_receive("volume_set"):
+            return
         self._volume = volume
         self.async_write_ha_state()
 
     async def async_mute_volume(self, mute: bool) -> None:
         """Mute/unmute volume."""
+        if not await self._async_receive("volume_mute"):
+            return
         self._is_muted = mute
         self.async_write_ha_state()
 
     async def async_volume_up(self) -> None:
         """Increase volume."""
+        if not await self._async_receive("volume_up"):
+            return
         if self._volume < 1.0:
             self._volume = min(1.0, self._volume + 0.1)
             self.async_write_ha_state()
 
     async def async_volume_down(self) -> None:
         """Decrease volume."""
+        if not await self._async_receive("volume_down"):
+            return
         if self._volume > 0.0:
             self._volume = max(0.0, self._volume - 0.1)
-            self.async_write_ha_state()
\ No newline at end of file
+            self.async_write_ha_state()
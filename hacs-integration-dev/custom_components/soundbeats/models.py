@@ -1,6 +1,6 @@
 """Data models for Soundbeats game state management."""
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 import uuid
 
@@ -13,6 +13,7 @@ class Team:
     score: int = 0
     current_guess: Optional[int] = None
     has_bet: bool = False
+    streak: int = 0  # Consecutive scoring rounds
 
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
@@ -21,7 +22,8 @@ class Team:
             "name": self.name,
             "score": self.score,
             "current_guess": self.current_guess,
-            "has_bet": self.has_bet
+            "has_bet": self.has_bet,
+            "streak": self.streak
         }
 
 
@@ -35,6 +37,7 @@ class GameRound:
     team_scores: Dict[str, int] = field(default_factory=dict)
     actual_year: int = 0  # Placeholder for Phase 4
     timestamp: datetime = field(default_factory=datetime.now)
+    guesses_locked: bool = False  # Later guesses are corrections
 
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
@@ -45,10 +48,106 @@ class GameRound:
             "team_bets": self.team_bets,
             "team_scores": self.team_scores,
             "actual_year": self.actual_year,
-            "timestamp": self.timestamp.isoformat()
+            "timestamp": self.timestamp.isoformat(),
+            "guesses_locked": self.guesses_locked
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "GameRound":
+        """Create GameRound from dictionary."""
+        return cls(
+            round_number=data["round_number"],
+            song_id=data.get("song_id", 0),
+            team_guesses=data.get("team_guesses", {}),
+            team_bets=data.get("team_bets", {}),
+            team_scores=data.get("team_scores", {}),
+            actual_year=data.get("actual_year", 0),
+            timestamp=_parse_datetime(data.get("timestamp")),
+            guesses_locked=data.get("guesses_locked", False)
+        )
+
+
+@dataclass
+class Song:
+    """Represents a song in the catalog."""
+    id: int
+    title: str
+    artist: str
+    year: int
+    media_id: str
+    media_type: str = "music"
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "id": self.id,
+            "title": self.title,
+            "artist": self.artist,
+            "year": self.year,
+            "media_id": self.media_id,
+            "media_type": self.media_type
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Song":
+        """Create Song from dictionary."""
+        return cls(
+            id=int(data["id"]),
+            title=data["title"],
+            artist=data["artist"],
+            year=int(data["year"]),
+            media_id=data["media_id"],
+            media_type=data.get("media_type", "music")
+        )
+
+
+@dataclass(frozen=True)
+class RoundTotals:
+    """Aggregates of a set of rounds."""
+    rounds: int = 0
+    points: int = 0
+    guesses: int = 0  # Guesses on rounds with a known year
+    error_sum: int = 0  # Years between those guesses and the actual year
+
+    def add_round(self, game_round: GameRound) -> "RoundTotals":
+        """Return the totals with a round added."""
+        year = game_round.actual_year
+        guesses = game_round.team_guesses.values() if year else ()
+        return RoundTotals(
+            rounds=self.rounds + 1,
+            points=self.points + sum(game_round.team_scores.values()),
+            guesses=self.guesses + len(guesses),
+            error_sum=self.error_sum + sum(abs(guess - year) for guess in guesses),
+        )
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            "rounds": self.rounds,
+            "points": self.points,
+            "guesses": self.guesses,
+            "error_sum": self.error_sum
         }
 
 
+@dataclass(frozen=True)
+class ArchivedRounds:
+    """Older rounds of a game, held as compressed blocks of ROUND_BLOCK_SIZE rounds.
+    
+    Blocks are decoded only when a client asks for old rounds or the game
+    is archived; the totals cover every round in them.
+    """
+    blocks: Tuple[bytes, ...] = ()
+    totals: RoundTotals = field(default_factory=RoundTotals)
+
+    def add_block(self, block: bytes, rounds: List[GameRound]) -> "ArchivedRounds":
+        """Return the archive with an encoded block of rounds appended."""
+        totals = self.totals
+        for game_round in rounds:
+            totals = totals.add_round(game_round)
+        return ArchivedRounds(blocks=(*self.blocks, block), totals=totals)
+
+
 @dataclass
 class GameState:
     """Represents complete game state."""
@@ -60,59 +159,52 @@ class GameState:
     played_song_ids: List[int] = field(default_factory=list)
     is_active: bool = True
     created_at: datetime = field(default_factory=datetime.now)
+    active_round: Optional[GameRound] = None
+    difficulty: Optional[str] = None  # Prefer songs of this difficulty
+    large_teams: bool = False  # Allows up to MAX_TEAMS_LARGE teams
+    reveal: Optional[dict] = None  # Rank changes and song of the last round
+    # Rounds before those in rounds_played, which holds only the recent ones
+    archived_rounds: ArchivedRounds = field(default_factory=ArchivedRounds)
+
+    @property
+    def round_count(self) -> int:
+        """Return the number of rounds played, archived ones included."""
+        return self.archived_rounds.totals.rounds + len(self.rounds_played)
+
+    def round_totals(self) -> RoundTotals:
+        """Return the aggregates of every round played."""
+        totals = self.archived_rounds.totals
+        for game_round in self.rounds_played:
+            totals = totals.add_round(game_round)
+        return totals
 
     def to_dict(self) -> dict:
-        """Convert to dictionary for JSON serialization."""
+        """Convert to dictionary for JSON serialization.
+        
+        Only the recent rounds are included; round_count and round_totals
+        cover all of them.
+        """
         return {
             "game_id": self.game_id,
             "teams": [team.to_dict() for team in self.teams],
             "current_round": self.current_round,
             "rounds_played": [round.to_dict() for round in self.rounds_played],
+            "round_count": self.round_count,
+            "round_totals": self.round_totals().to_dict(),
             "playlist_id": self.playlist_id,
             "played_song_ids": self.played_song_ids,
             "is_active": self.is_active,
-            "created_at": self.created_at.isoformat()
+            "created_at": self.created_at.isoformat(),
+            "active_round": self.active_round.to_dict() if self.active_round else None,
+            "difficulty": self.difficulty,
+            "large_teams": self.large_teams,
+            "reveal": self.reveal
         }
 
-    @classmethod
-    def from_dict(cls, data: dict) -> "GameState":
-        """Create GameState from dictionary."""
-        state = cls(
-            game_id=data.get("game_id", str(uuid.uuid4())),
-            current_round=data.get("current_round", 0),
-            playlist_id=data.get("playlist_id", "default"),
-            played_song_ids=data.get("played_song_ids", []),
-            is_active=data.get("is_active", True),
-        )
-        
-        # Reconstruct teams
-        for team_data in data.get("teams", []):
-            team = Team(
-                id=team_data["id"],
-                name=team_data["name"],
-                score=team_data["score"],
-                current_guess=team_data.get("current_guess"),
-                has_bet=team_data.get("has_bet", False)
-            )
-            state.teams.append(team)
-        
-        # Reconstruct rounds
-        for round_data in data.get("rounds_played", []):
-            game_round = GameRound(
-                round_number=round_data["round_number"],
-                song_id=round_data.get("song_id", 0),
-                team_guesses=round_data.get("team_guesses", {}),
-                team_bets=round_data.get("team_bets", {}),
-                team_scores=round_data.get("team_scores", {}),
-                actual_year=round_data.get("actual_year", 0)
-            )
-            state.rounds_played.append(game_round)
-        
-        # Parse created_at if it exists
-        if "created_at" in data:
-            try:
-                state.created_at = datetime.fromisoformat(data["created_at"])
-            except (ValueError, TypeError):
-                pass
-        
-        return state
\ No newline at end of file
+
+def _parse_datetime(value: Optional[str]) -> datetime:
+    """Parse an ISO timestamp, falling back to now."""
+    try:
+        return datetime.fromisoformat(value)
+    except (ValueError, TypeError):
+        return datetime.now()
\ No newline at end of file
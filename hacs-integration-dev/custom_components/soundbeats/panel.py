@@ -0,0 +1,144 @@
+"""Sidebar panel and its static assets."""
+from __future__ import annotations
+
+from http import HTTPStatus
+import json
+import logging
+import mimetypes
+from pathlib import Path
+import re
+
+from aiohttp import web
+
+from homeassistant.components.frontend import async_register_built_in_panel
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_PANEL = f"{DOMAIN}_panel"
+
+STATIC_URL = "/soundbeats_static"
+PANEL_ENTRY = "soundbeats-panel.js"
+
+# Precompressed siblings in order of preference: (encoding, suffix)
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# Vite puts an 8 character content hash into every built file name
+_HASHED_NAME = re.compile(r"\.[A-Za-z0-9_-]{8}\.[a-z0-9]+$")
+
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "no-cache"
+
+# file name -> {encoding: path}; "identity" is the uncompressed file
+Assets = dict[str, dict[str, Path]]
+
+
+async def async_register_panel(hass: HomeAssistant, dist: Path) -> None:
+    """Serve the built frontend and register the sidebar panel once."""
+    if DATA_PANEL in hass.data:
+        return
+    assets, entry = await hass.async_add_executor_job(_scan_dist, dist)
+    hass.data[DATA_PANEL] = assets
+    hass.http.register_view(SoundbeatsStaticView(assets))
+
+    async_register_built_in_panel(
+        hass,
+        component_name="custom",
+        sidebar_title="Soundbeats",
+        sidebar_icon="mdi:music-note",
+        frontend_url_path="soundbeats",
+        config={
+            "_panel_custom": {
+                "name": "soundbeats-frontend",
+                "embed_iframe": True,
+                "trust_external": False,
+                "js_url": f"{STATIC_URL}/{entry}",
+            }
+        },
+        require_admin=False,
+    )
+
+
+def _scan_dist(dist: Path) -> tuple[Assets, str]:
+    """Index the built files and find the panel entry; runs in the executor."""
+    assets: Assets = {}
+    for path in dist.rglob("*"):
+        if not path.is_file() or path.suffix in (".br", ".gz"):
+            continue
+        name = path.relative_to(dist).as_posix()
+        if name.startswith(".vite/"):
+            continue
+        variants = {"identity": path}
+        for encoding, suffix in ENCODINGS:
+            sibling = path.with_name(path.name + suffix)
+            if sibling.is_file():
+                variants[encoding] = sibling
+        assets[name] = variants
+
+    entry = PANEL_ENTRY
+    manifest = dist / ".vite" / "manifest.json"
+    if manifest.is_file():
+        try:
+            chunks = json.loads(manifest.read_text(encoding="utf-8"))
+            entry = next(chunk["file"] for chunk in chunks.values() if chunk.get("isEntry"))
+        except (OSError, ValueError, KeyError, StopIteration) as err:
+            _LOGGER.warning("Invalid frontend manifest %s: %s", manifest, err)
+    if entry not in assets:
+        _LOGGER.error("Soundbeats panel %s not found in %s", entry, dist)
+    return assets, entry
+
+
+def _select(variants: dict[str, Path], accept_encoding: str) -> tuple[str, Path]:
+    """Return the smallest encoding of a file the client accepts."""
+    accepted = set()
+    for token in accept_encoding.split(","):
+        coding, *params = (part.strip() for part in token.split(";"))
+        try:
+            quality = next(
+                (float(param[2:]) for param in params if param.startswith("q=")), 1.0
+            )
+        except ValueError:
+            continue
+        if quality > 0:
+            accepted.add(coding.lower())
+    for encoding, _suffix in ENCODINGS:
+        if encoding in accepted and encoding in variants:
+            return encoding, variants[encoding]
+    return "identity", variants["identity"]
+
+
+class SoundbeatsStaticView(HomeAssistantView):
+    """Serve the built frontend.
+
+    Files are looked up in an index built at setup, so requests never touch
+    the file system beyond the file itself. Content-hashed files are cached
+    by browsers forever; anything else is revalidated.
+    """
+
+    url = STATIC_URL + "/{filename:.+}"
+    name = "soundbeats:static"
+    requires_auth = False
+
+    def __init__(self, assets: Assets) -> None:
+        """Initialize the view."""
+        self._assets = assets
+
+    async def get(self, request: web.Request, filename: str) -> web.StreamResponse:
+        """Serve a file in the encoding the client prefers."""
+        if (variants := self._assets.get(filename)) is None:
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+
+        encoding, path = _select(variants, request.headers.get("Accept-Encoding", ""))
+        headers = {
+            "Content-Type": mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            "Cache-Control": (
+                CACHE_IMMUTABLE if _HASHED_NAME.search(filename) else CACHE_REVALIDATE
+            ),
+            "Vary": "Accept-Encoding",
+        }
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return web.FileResponse(path, headers=headers)
@@ -0,0 +1,227 @@
+"""Constraint-based playlists for Soundbeats."""
+from __future__ import annotations
+
+from collections import Counter, deque
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+import random
+from typing import Any
+
+from .models import Song
+
+BALANCE_NONE = "none"
+BALANCE_DECADE = "decade"
+BALANCE_YEAR = "year"
+
+# Draws before falling back to scanning every candidate
+MAX_DRAWS = 32
+
+_RNG = random.Random()
+
+
+@dataclass(frozen=True)
+class PlaylistRules:
+    """Constraints a dynamic playlist draws songs under.
+
+    Defined in ``songs.json`` next to the fixed playlists::
+
+        "playlists": {
+            "80s": [1, 2, 3],
+            "classics": {"year_min": 1975, "year_max": 1995,
+                         "artist_gap": 10, "balance": "decade"}
+        }
+    """
+
+    year_min: int | None = None
+    year_max: int | None = None
+    artist_gap: int = 0  # rounds before an artist may be played again
+    balance: str = BALANCE_NONE  # spread draws evenly over decades or years
+    decade_weights: Mapping[int, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> PlaylistRules:
+        """Create rules from a playlist definition."""
+        balance = data.get("balance", BALANCE_NONE)
+        if balance not in (BALANCE_NONE, BALANCE_DECADE, BALANCE_YEAR):
+            raise ValueError(f"Unknown balance {balance!r}")
+        return cls(
+            year_min=data.get("year_min"),
+            year_max=data.get("year_max"),
+            artist_gap=int(data.get("artist_gap", 0)),
+            balance=balance,
+            decade_weights={
+                int(decade): float(weight)
+                for decade, weight in data.get("decade_weights", {}).items()
+            },
+        )
+
+
+class AliasTable:
+    """Walker's alias method: O(1) draws from a fixed discrete distribution."""
+
+    __slots__ = ("_probabilities", "_aliases")
+
+    def __init__(self, weights: Sequence[float]) -> None:
+        """Build the table with Vose's algorithm."""
+        count = len(weights)
+        total = sum(weights)
+        if not count or total <= 0:
+            raise ValueError("Alias table needs at least one positive weight")
+
+        scaled = [weight * count / total for weight in weights]
+        small = [index for index, weight in enumerate(scaled) if weight < 1.0]
+        large = [index for index, weight in enumerate(scaled) if weight >= 1.0]
+        probabilities = [1.0] * count
+        aliases = list(range(count))
+        while small and large:
+            less, more = small.pop(), large.pop()
+            probabilities[less] = scaled[less]
+            aliases[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+
+        self._probabilities = probabilities
+        self._aliases = aliases
+
+    def sample(self, rng: random.Random) -> int:
+        """Return a random index according to the weights."""
+        index = rng.randrange(len(self._probabilities))
+        if rng.random() < self._probabilities[index]:
+            return index
+        return self._aliases[index]
+
+
+class ConstraintChecker:
+    """Checks candidates against the songs a game has already played.
+
+    A game keeps one checker per playlist and ``sync`` folds in only the
+    songs played since the last draw, so a draw costs the same in round 5
+    and round 500. The artist window holds the last ``artist_gap`` songs.
+    """
+
+    __slots__ = ("_artist_gap", "_songs", "_played", "_count", "_window", "_recent_artists")
+
+    def __init__(self, rules: PlaylistRules, songs: Mapping[int, Song]) -> None:
+        """Initialize the checker."""
+        self._artist_gap = rules.artist_gap
+        self._songs = songs
+        self._reset()
+
+    def _reset(self) -> None:
+        """Forget every played song."""
+        self._played: set[int] = set()
+        self._count = 0
+        self._window: deque[str | None] = deque()
+        self._recent_artists: Counter[str] = Counter()
+
+    def sync(self, played: Sequence[int]) -> None:
+        """Record the songs played since the last sync, oldest first."""
+        if len(played) < self._count:
+            # A different history; start over
+            self._reset()
+        for song_id in played[self._count :]:
+            self.record(song_id)
+
+    def record(self, song_id: int) -> None:
+        """Record a played song."""
+        self._played.add(song_id)
+        self._count += 1
+        if not self._artist_gap:
+            return
+        song = self._songs.get(song_id)
+        artist = song.artist.casefold() if song else None
+        self._window.append(artist)
+        if artist is not None:
+            self._recent_artists[artist] += 1
+        if len(self._window) > self._artist_gap:
+            expired = self._window.popleft()
+            if expired is not None:
+                self._recent_artists[expired] -= 1
+                if not self._recent_artists[expired]:
+                    del self._recent_artists[expired]
+
+    def accepts(self, song: Song) -> bool:
+        """Return if a song may be played next."""
+        return self.unplayed(song) and song.artist.casefold() not in self._recent_artists
+
+    def unplayed(self, song: Song) -> bool:
+        """Return if a song has not been played in this game."""
+        return song.id not in self._played
+
+
+class ConstraintPlaylist:
+    """A dynamic playlist drawing from precomputed year buckets."""
+
+    __slots__ = ("rules", "_songs", "_buckets", "_table")
+
+    def __init__(
+        self,
+        rules: PlaylistRules,
+        songs: Mapping[int, Song],
+        year_buckets: Mapping[int, tuple[int, ...]],
+    ) -> None:
+        """Group the matching songs into buckets and weight them."""
+        self.rules = rules
+        self._songs = songs
+
+        groups: dict[int, list[int]] = {}
+        for year, song_ids in year_buckets.items():
+            if rules.year_min is not None and year < rules.year_min:
+                continue
+            if rules.year_max is not None and year > rules.year_max:
+                continue
+            key = year if rules.balance == BALANCE_YEAR else year // 10 * 10
+            groups.setdefault(key, []).extend(song_ids)
+
+        ordered = sorted(groups.items())
+        self._buckets = [tuple(song_ids) for _, song_ids in ordered]
+        weights = []
+        for key, song_ids in ordered:
+            weight = 1.0 if rules.balance != BALANCE_NONE else float(len(song_ids))
+            decade = key // 10 * 10
+            weights.append(weight * rules.decade_weights.get(decade, 1.0))
+        self._table = AliasTable(weights) if sum(weights) > 0 else None
+
+    def __len__(self) -> int:
+        """Return the number of songs in the playlist."""
+        return sum(len(bucket) for bucket in self._buckets)
+
+    def checker(self) -> ConstraintChecker:
+        """Return a checker for a game drawing from this playlist."""
+        return ConstraintChecker(self.rules, self._songs)
+
+    def pick_song(
+        self,
+        played: Sequence[int],
+        rng: random.Random | None = None,
+        checker: ConstraintChecker | None = None,
+    ) -> Song | None:
+        """Draw a song that satisfies the rules.
+
+        Draws are O(1); only when the rules rule out nearly every song does
+        this fall back to scanning the remaining candidates. If the artist
+        gap cannot be kept, any unplayed song is better than ending the game.
+        Pass the game's checker to avoid replaying its history.
+        """
+        if self._table is None:
+            return None
+        rng = rng or _RNG
+        checker = checker or self.checker()
+        checker.sync(played)
+
+        for _ in range(MAX_DRAWS):
+            bucket = self._buckets[self._table.sample(rng)]
+            song = self._songs[bucket[rng.randrange(len(bucket))]]
+            if checker.accepts(song):
+                return song
+
+        for accepts in (checker.accepts, checker.unplayed):
+            candidates = [
+                song_id
+                for bucket in self._buckets
+                for song_id in bucket
+                if accepts(self._songs[song_id])
+            ]
+            if candidates:
+                return self._songs[rng.choice(candidates)]
+        return None
@@ -0,0 +1,96 @@
+"""Rate limiting of Soundbeats commands."""
+from __future__ import annotations
+
+from collections import Counter, OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import time
+from typing import Any
+
+from .const import RATE_LIMIT_CONNECTION, RATE_LIMIT_TEAM
+
+# Team buckets remembered; older ones belong to teams of past games
+MAX_TEAM_BUCKETS = 256
+
+
+@dataclass
+class TokenBucket:
+    """Allows ``capacity`` calls at once, refilled at ``rate`` per second."""
+
+    capacity: float
+    rate: float
+    tokens: float = field(init=False)
+    updated: float = field(default_factory=time.monotonic)
+
+    def __post_init__(self) -> None:
+        """Start with a full bucket."""
+        self.tokens = self.capacity
+
+    def take(self, now: float) -> bool:
+        """Take a token if one is available."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class RateLimiter:
+    """Token buckets per websocket connection and per team.
+
+    Checking a call is a dictionary lookup and some arithmetic, so floods
+    are rejected before they reach the game manager.
+
+    Team ids come from clients, so only teams of the current game, as told
+    by ``has_team``, get a bucket. Calls naming any other id are charged to
+    their connection alone, so rotating made-up ids neither evicts the
+    buckets of real teams nor gets around their limit.
+    """
+
+    def __init__(self, has_team: Callable[[str], bool]) -> None:
+        """Initialize the limiter."""
+        self._has_team = has_team
+        self._connections: dict[int, TokenBucket] = {}
+        self._teams: OrderedDict[str, TokenBucket] = OrderedDict()
+        self.counters: Counter[str] = Counter()
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return bucket counts and rejection counters."""
+        return {
+            "connections": len(self._connections),
+            "teams": len(self._teams),
+            **self.counters,
+        }
+
+    def allow(self, connection_key: int, team_id: str | None, now: float | None = None) -> bool:
+        """Return if a call may proceed, taking a token from each bucket."""
+        now = time.monotonic() if now is None else now
+        bucket = self._connections.get(connection_key)
+        if bucket is None:
+            bucket = self._connections[connection_key] = TokenBucket(*RATE_LIMIT_CONNECTION, updated=now)
+        if not bucket.take(now):
+            self.counters["rejected_connection"] += 1
+            return False
+
+        if team_id is not None and not self._has_team(team_id):
+            self.counters["unknown_team"] += 1
+        elif team_id is not None:
+            team_bucket = self._teams.get(team_id)
+            if team_bucket is None:
+                team_bucket = self._teams[team_id] = TokenBucket(*RATE_LIMIT_TEAM, updated=now)
+                if len(self._teams) > MAX_TEAM_BUCKETS:
+                    self._teams.popitem(last=False)
+            else:
+                self._teams.move_to_end(team_id)
+            if not team_bucket.take(now):
+                self.counters["rejected_team"] += 1
+                return False
+
+        self.counters["allowed"] += 1
+        return True
+
+    def forget_connection(self, connection_key: int) -> None:
+        """Drop the bucket of a closed connection."""
+        self._connections.pop(connection_key, None)
@@ -0,0 +1,128 @@
+"""Scoring rules for Soundbeats."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+import yaml
+
+from .const import SCORING_RULES_FILE
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+_POSITIVE = vol.All(vol.Coerce(float), vol.Range(min=0))
+
+SCORING_SCHEMA = vol.Schema(
+    {
+        # [[max year distance, points], ...]; farther guesses score nothing
+        vol.Optional("points", default=[[0, 10], [3, 5], [5, 2]]): [
+            vol.ExactSequence([vol.All(int, vol.Range(min=0)), vol.All(int, vol.Range(min=0))])
+        ],
+        vol.Optional("bet", default={}): {
+            vol.Optional("exact_multiplier", default=2.0): _POSITIVE,
+            vol.Optional("miss_multiplier", default=0.0): _POSITIVE,
+        },
+        vol.Optional("streak", default={}): {
+            vol.Optional("length", default=3): vol.All(int, vol.Range(min=1)),
+            vol.Optional("multiplier", default=1.5): _POSITIVE,
+        },
+        vol.Optional("comeback", default={}): {
+            vol.Optional("every", default=5): vol.All(int, vol.Range(min=0)),
+            vol.Optional("bottom", default=2): vol.All(int, vol.Range(min=1)),
+            vol.Optional("multiplier", default=3.0): _POSITIVE,
+        },
+    }
+)
+
+
+@dataclass(frozen=True)
+class ScoringRules:
+    """Scoring rules compiled into lookup tables.
+
+    Points of a guess are ``points[distance]`` times one entry of each
+    multiplier vector, so scoring a round never evaluates the rules again:
+
+    - ``bet[has_bet][exact]``: a bet doubles an exact guess and loses the rest
+    - ``streak[min(streak, length)]``: bonus once a team scored ``length``
+      rounds in a row
+    - ``comeback[trailing]``: bonus for the bottom teams in every
+      ``comeback_every``-th round
+    """
+
+    points: tuple[int, ...]
+    bet: tuple[tuple[float, float], tuple[float, float]]
+    streak: tuple[float, ...]
+    comeback: tuple[float, float]
+    comeback_every: int
+    comeback_bottom: int
+
+    @classmethod
+    def compile(cls, config: Mapping[str, Any] | None = None) -> ScoringRules:
+        """Validate rules and precompute the tables."""
+        config = SCORING_SCHEMA(dict(config or {}))
+
+        thresholds = sorted(config["points"])
+        points = [0] * (thresholds[-1][0] + 1 if thresholds else 1)
+        for distance in range(len(points)):
+            points[distance] = next(
+                (value for limit, value in thresholds if distance <= limit), 0
+            )
+
+        bet = config["bet"]
+        streak = config["streak"]
+        comeback = config["comeback"]
+        return cls(
+            points=tuple(points),
+            bet=((1.0, 1.0), (bet["miss_multiplier"], bet["exact_multiplier"])),
+            streak=(1.0,) * streak["length"] + (streak["multiplier"],),
+            comeback=(1.0, comeback["multiplier"]),
+            comeback_every=comeback["every"],
+            comeback_bottom=comeback["bottom"],
+        )
+
+    def is_comeback_round(self, round_number: int, team_count: int) -> bool:
+        """Return if trailing teams get the comeback bonus this round."""
+        return (
+            self.comeback_every > 0
+            and round_number % self.comeback_every == 0
+            and team_count > self.comeback_bottom
+        )
+
+    def score(self, distance: int, has_bet: bool, streak: int, trailing: bool) -> int:
+        """Return the points of a guess ``distance`` years off."""
+        points = self.points[distance] if distance < len(self.points) else 0
+        return round(
+            points
+            * self.bet[has_bet][distance == 0]
+            * self.streak[min(streak, len(self.streak) - 1)]
+            * self.comeback[trailing]
+        )
+
+
+async def async_load_scoring_rules(hass: HomeAssistant) -> ScoringRules:
+    """Compile the rules from ``<config>/soundbeats/scoring.yaml`` or the defaults."""
+    path = Path(hass.config.path(SCORING_RULES_FILE))
+    config = await hass.async_add_executor_job(_read_rules_file, path)
+    try:
+        return ScoringRules.compile(config)
+    except (vol.Invalid, TypeError, ValueError) as err:
+        _LOGGER.error("Invalid scoring rules in %s, using defaults: %s", path, err)
+        return ScoringRules.compile()
+
+
+def _read_rules_file(path: Path) -> dict[str, Any] | None:
+    """Read the rules file; runs in the executor."""
+    if not path.exists():
+        return None
+    try:
+        return yaml.safe_load(path.read_text(encoding="utf-8"))
+    except (OSError, yaml.YAMLError) as err:
+        _LOGGER.error("Failed to read scoring rules %s: %s", path, err)
+        return None
@@ -0,0 +1,107 @@
+"""Fuzzy song search for Soundbeats."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+import heapq
+import math
+import re
+import unicodedata
+
+from .models import Song
+
+# Share of the query trigrams a song must contain to be a match
+MIN_COVERAGE = 0.3
+
+NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and punctuation."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return NON_WORD.sub(" ", text.lower()).strip()
+
+
+def trigrams(text: str) -> set[str]:
+    """Return the trigrams of each word, padded like ``  word ``."""
+    grams: set[str] = set()
+    for word in normalize(text).split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Inverted index from trigram to song ids over artist and title.
+
+    Postings are sorted tuples so membership can be tested with a binary
+    search. A query only counts the postings of its rarest trigrams in full;
+    a song that misses all of them cannot reach ``MIN_COVERAGE``, so common
+    trigrams are only checked against the candidates found that way.
+    """
+
+    __slots__ = ("_postings", "_sizes")
+
+    def __init__(
+        self, postings: dict[str, tuple[int, ...]], sizes: dict[int, int]
+    ) -> None:
+        """Initialize the index."""
+        self._postings = postings
+        self._sizes = sizes
+
+    @classmethod
+    def build(cls, songs: Iterable[Song]) -> TrigramIndex:
+        """Build the index; safe to run in the executor."""
+        postings: defaultdict[str, list[int]] = defaultdict(list)
+        sizes: dict[int, int] = {}
+        for song in sorted(songs, key=lambda song: song.id):
+            grams = trigrams(f"{song.artist} {song.title}")
+            sizes[song.id] = len(grams)
+            for gram in grams:
+                postings[gram].append(song.id)
+        return cls({gram: tuple(ids) for gram, ids in postings.items()}, sizes)
+
+    def search(self, query: str, limit: int = 20) -> list[tuple[int, float]]:
+        """Return up to ``limit`` (song id, score) pairs, best match first.
+
+        The score is the share of query trigrams found in the song; ties go
+        to the song with fewer extra trigrams.
+        """
+        grams = trigrams(query)
+        if not grams or limit <= 0:
+            return []
+        min_shared = math.ceil(len(grams) * MIN_COVERAGE)
+        known = sorted(
+            (self._postings[gram] for gram in grams if gram in self._postings), key=len
+        )
+        if len(known) < min_shared:
+            return []
+
+        # Any match shares at least one of the rarest len - min_shared + 1 trigrams
+        prefix_len = len(known) - min_shared + 1
+        shared: Counter[int] = Counter()
+        for posting in known[:prefix_len]:
+            shared.update(posting)
+
+        for posting in known[prefix_len:]:
+            if len(posting) <= len(shared):
+                shared.update(shared.keys() & posting)
+                continue
+            for song_id in list(shared):
+                position = bisect_left(posting, song_id)
+                if position < len(posting) and posting[position] == song_id:
+                    shared[song_id] += 1
+
+        total = len(grams)
+        sizes = self._sizes
+        best = heapq.nlargest(
+            limit,
+            (
+                (count, -sizes[song_id], song_id)
+                for song_id, count in shared.items()
+                if count >= min_shared
+            ),
+        )
+        return [(song_id, round(count / total, 3)) for count, _, song_id in best]
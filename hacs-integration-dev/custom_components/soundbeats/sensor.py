@@ -1,15 +1,28 @@
 """Soundbeats sensor entities."""
 from __future__ import annotations
 
+import heapq
 import logging
+import time
+from datetime import datetime
 from typing import Any
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.typing import StateType
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    EVENT_GAME_STATE_CHANGED,
+    LEADERBOARD_SIZE,
+    MAX_TEAMS,
+    SENSOR_MIN_UPDATE_INTERVAL,
+)
+from .game_manager import GameManager
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,8 +32,46 @@ async def async_setup_entry(
     config_entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
-    """Set up the mock sensor."""
-    async_add_entities([MockSensor(config_entry.entry_id)], True)
+    """Set up the Soundbeats sensors."""
+    entry_id = config_entry.entry_id
+    game_manager: GameManager = hass.data[DOMAIN][entry_id]["game_manager"]
+
+    async_add_entities([MockSensor(entry_id)], True)
+    async_add_entities(
+        [
+            CurrentRoundSensor(entry_id, game_manager),
+            LeaderSensor(entry_id, game_manager),
+            FinalScoreSensor(entry_id, game_manager),
+        ]
+    )
+
+    # Team score sensors are bound to a team slot (1st, 2nd, ... team of the
+    # active game) rather than to a team id, so new games reuse the same
+    # entities instead of leaving orphans behind in the entity registry.
+    # Large-team games only get sensors for the first MAX_TEAMS slots.
+    slot_count = 0
+
+    @callback
+    def _async_add_team_slots(game_state: dict[str, Any] | None) -> None:
+        """Add score sensors for team slots not seen before."""
+        nonlocal slot_count
+        if not game_state:
+            return
+        team_count = min(len(game_state["teams"]), MAX_TEAMS)
+        if team_count <= slot_count:
+            return
+        new_slots = range(slot_count, team_count)
+        slot_count = team_count
+        async_add_entities(
+            [TeamScoreSensor(entry_id, game_manager, slot) for slot in new_slots]
+        )
+
+    _async_add_team_slots(game_manager.get_state())
+    config_entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, f"{EVENT_GAME_STATE_CHANGED}_{entry_id}", _async_add_team_slots
+        )
+    )
 
 
 class MockSensor(SensorEntity):
@@ -29,7 +80,7 @@ class MockSensor(SensorEntity):
     _attr_has_entity_name = True
     _attr_name = "Mock Sensor"
     _attr_native_unit_of_measurement = "units"
-    
+
     def __init__(self, entry_id: str) -> None:
         """Initialize the mock sensor."""
         self._entry_id = entry_id
@@ -45,4 +96,214 @@ class MockSensor(SensorEntity):
             "manufacturer": "Mock Manufacturer",
             "model": "Mock Model",
             "sw_version": "1.0.0",
-        }
\ No newline at end of file
+        }
+
+
+class GameSensor(SensorEntity):
+    """Base class for sensors driven by the game state signal.
+
+    Every ``async_write_ha_state`` call creates a recorder row, so writes are
+    skipped when neither value nor attributes changed and are coalesced to at
+    most one per ``SENSOR_MIN_UPDATE_INTERVAL``.
+    """
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(self, entry_id: str, game_manager: GameManager, key: str) -> None:
+        """Initialize the game sensor."""
+        self._entry_id = entry_id
+        self._game_manager = game_manager
+        self._attr_unique_id = f"{entry_id}_{key}"
+        self._attr_native_value = None
+        self._attr_extra_state_attributes = None
+        self._pending: tuple[StateType, dict[str, Any] | None] | None = None
+        self._last_write = 0.0
+        self._cancel_write: CALLBACK_TYPE | None = None
+
+    @property
+    def device_info(self) -> dict[str, Any]:
+        """Return device info."""
+        return {
+            "identifiers": {(DOMAIN, self._entry_id)},
+            "name": "Mock Media Device",
+            "manufacturer": "Mock Manufacturer",
+            "model": "Mock Model",
+            "sw_version": "1.0.0",
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to game state changes."""
+        self._apply(*self._compute(self._game_manager.get_state()))
+        self._last_write = time.monotonic()
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                f"{EVENT_GAME_STATE_CHANGED}_{self._entry_id}",
+                self._async_handle_game_state,
+            )
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel any deferred write."""
+        if self._cancel_write is not None:
+            self._cancel_write()
+            self._cancel_write = None
+
+    def _compute(
+        self, game_state: dict[str, Any] | None
+    ) -> tuple[StateType, dict[str, Any] | None]:
+        """Return the native value and extra attributes for a game state."""
+        raise NotImplementedError
+
+    def _apply(self, value: StateType, attributes: dict[str, Any] | None) -> None:
+        """Store a computed value and attributes on the entity."""
+        self._attr_native_value = value
+        self._attr_extra_state_attributes = attributes
+
+    @callback
+    def _async_handle_game_state(self, game_state: dict[str, Any] | None) -> None:
+        """Handle a game state broadcast."""
+        self._pending = self._compute(game_state)
+        if self._cancel_write is not None:
+            # A deferred write is scheduled and will pick up the latest values
+            return
+
+        if self._pending == (self._attr_native_value, self._attr_extra_state_attributes):
+            self._pending = None
+            return
+
+        elapsed = time.monotonic() - self._last_write
+        if elapsed >= SENSOR_MIN_UPDATE_INTERVAL:
+            self._async_flush()
+        else:
+            self._cancel_write = async_call_later(
+                self.hass, SENSOR_MIN_UPDATE_INTERVAL - elapsed, self._async_flush
+            )
+
+    @callback
+    def _async_flush(self, _now: datetime | None = None) -> None:
+        """Write the pending value if it differs from the current one."""
+        self._cancel_write = None
+        pending, self._pending = self._pending, None
+        if pending is None or pending == (
+            self._attr_native_value,
+            self._attr_extra_state_attributes,
+        ):
+            return
+        self._apply(*pending)
+        self._last_write = time.monotonic()
+        self.async_write_ha_state()
+
+
+def _standings(game_state: dict[str, Any]) -> list[dict[str, Any]]:
+    """Return the top teams sorted by score, best first."""
+    return heapq.nlargest(
+        LEADERBOARD_SIZE,
+        ({"name": team["name"], "score": team["score"]} for team in game_state["teams"]),
+        key=lambda team: team["score"],
+    )
+
+
+class CurrentRoundSensor(GameSensor):
+    """Current round of the active game."""
+
+    _attr_name = "Current Round"
+    _attr_icon = "mdi:counter"
+
+    def __init__(self, entry_id: str, game_manager: GameManager) -> None:
+        """Initialize the current round sensor."""
+        super().__init__(entry_id, game_manager, "current_round")
+
+    def _compute(
+        self, game_state: dict[str, Any] | None
+    ) -> tuple[StateType, dict[str, Any] | None]:
+        """Return the current round number."""
+        if not game_state or not game_state["is_active"]:
+            return None, None
+        return game_state["current_round"], {"game_id": game_state["game_id"]}
+
+
+class LeaderSensor(GameSensor):
+    """Name of the team currently in the lead."""
+
+    _attr_name = "Leader"
+    _attr_icon = "mdi:trophy"
+    _unrecorded_attributes = frozenset({"standings"})
+
+    def __init__(self, entry_id: str, game_manager: GameManager) -> None:
+        """Initialize the leader sensor."""
+        super().__init__(entry_id, game_manager, "leader")
+
+    def _compute(
+        self, game_state: dict[str, Any] | None
+    ) -> tuple[StateType, dict[str, Any] | None]:
+        """Return the leading team and the full standings."""
+        if not game_state or not game_state["is_active"] or not game_state["teams"]:
+            return None, None
+        standings = _standings(game_state)
+        return standings[0]["name"], {
+            "score": standings[0]["score"],
+            "standings": standings,
+        }
+
+
+class TeamScoreSensor(GameSensor):
+    """Score of the team in a given slot of the active game."""
+
+    _attr_icon = "mdi:scoreboard"
+    _attr_native_unit_of_measurement = "points"
+
+    def __init__(self, entry_id: str, game_manager: GameManager, slot: int) -> None:
+        """Initialize the team score sensor."""
+        super().__init__(entry_id, game_manager, f"team_{slot + 1}_score")
+        self._slot = slot
+        self._attr_name = f"Team {slot + 1} Score"
+
+    @property
+    def available(self) -> bool:
+        """Return if the slot is occupied by a team."""
+        return self._attr_native_value is not None
+
+    def _compute(
+        self, game_state: dict[str, Any] | None
+    ) -> tuple[StateType, dict[str, Any] | None]:
+        """Return the score and name of the team in this slot."""
+        if not game_state or len(game_state["teams"]) <= self._slot:
+            return None, None
+        team = game_state["teams"][self._slot]
+        return team["score"], {"team_id": team["id"], "team_name": team["name"]}
+
+
+class FinalScoreSensor(GameSensor):
+    """Winning score of the last finished game.
+
+    The sensor has no state class; long-term statistics of finished games
+    are imported by ``GameStatisticsExporter`` instead.
+    """
+
+    _attr_name = "Final Score"
+    _attr_icon = "mdi:flag-checkered"
+    _attr_native_unit_of_measurement = "points"
+    _unrecorded_attributes = frozenset({"standings"})
+
+    def __init__(self, entry_id: str, game_manager: GameManager) -> None:
+        """Initialize the final score sensor."""
+        super().__init__(entry_id, game_manager, "final_score")
+
+    def _compute(
+        self, game_state: dict[str, Any] | None
+    ) -> tuple[StateType, dict[str, Any] | None]:
+        """Return the winning score once the game has finished."""
+        if not game_state or game_state["is_active"] or not game_state["teams"]:
+            # Keep the last result until the next game finishes
+            if self._pending is not None:
+                return self._pending
+            return self._attr_native_value, self._attr_extra_state_attributes
+        standings = _standings(game_state)
+        return standings[0]["score"], {
+            "game_id": game_state["game_id"],
+            "winner": standings[0]["name"],
+            "rounds": game_state["round_count"],
+            "standings": standings,
+        }
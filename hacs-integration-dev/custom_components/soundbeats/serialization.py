@@ -0,0 +1,221 @@
+"""Versioned storage layout of the game models.
+
+The websocket API and the history use the dictionaries of ``to_dict``.
+The active game is persisted in a compact layout instead: teams and
+rounds are rows in field order, so restoring a long game is one
+constructor call per row rather than a lookup per field.
+
+Layout of schema 3::
+
+    {
+        "schema": 3,
+        "game": [game_id, playlist_id, current_round, played_song_ids,
+                 is_active, created_at, difficulty, large_teams, reveal],
+        "teams": [[id, name, score, current_guess, has_bet, streak], ...],
+        "rounds": [ROUND, ...],
+        "active_round": ROUND | None,
+        "archived": [[rounds, points, guesses, error_sum], [BLOCK, ...]],
+    }
+
+where ``ROUND`` is ``[round_number, song_id, team_guesses, team_bets,
+team_scores, actual_year, timestamp, guesses_locked]`` and ``BLOCK`` is
+a base64 string of zlib compressed JSON rows of archived rounds. Archived
+rounds stay compressed after a restore. Data without a ``schema`` key is
+the ``to_dict`` layout, schema 1; schema 2 had no archived rounds.
+"""
+from __future__ import annotations
+
+import base64
+from collections.abc import Callable
+from dataclasses import astuple
+from datetime import datetime
+import json
+from typing import Any
+import uuid
+import zlib
+
+from .models import ArchivedRounds, GameRound, GameState, RoundTotals, Team
+
+SCHEMA_VERSION = 3
+
+_fromisoformat = datetime.fromisoformat
+
+
+def encode_game(state: GameState) -> dict[str, Any]:
+    """Return the compact layout of a game."""
+    return {
+        "schema": SCHEMA_VERSION,
+        "game": [
+            state.game_id,
+            state.playlist_id,
+            state.current_round,
+            state.played_song_ids,
+            state.is_active,
+            state.created_at.isoformat(),
+            state.difficulty,
+            state.large_teams,
+            state.reveal,
+        ],
+        "teams": [
+            [team.id, team.name, team.score, team.current_guess, team.has_bet, team.streak]
+            for team in state.teams
+        ],
+        "rounds": [_encode_round(game_round) for game_round in state.rounds_played],
+        "active_round": _encode_round(state.active_round) if state.active_round else None,
+        "archived": [
+            list(astuple(state.archived_rounds.totals)),
+            [base64.b64encode(block).decode() for block in state.archived_rounds.blocks],
+        ],
+    }
+
+
+def decode_game(data: dict[str, Any]) -> GameState:
+    """Restore a game stored in any known layout."""
+    schema = data.get("schema", 1)
+    if schema > SCHEMA_VERSION:
+        raise ValueError(f"Unsupported game schema {schema}")
+    while schema < SCHEMA_VERSION:
+        data = _MIGRATIONS[schema](data)
+        schema += 1
+
+    (
+        game_id,
+        playlist_id,
+        current_round,
+        played_song_ids,
+        is_active,
+        created_at,
+        difficulty,
+        large_teams,
+        reveal,
+    ) = data["game"]
+    active_round = data["active_round"]
+    totals, blocks = data["archived"]
+    return GameState(
+        game_id=game_id,
+        teams=[Team(*row) for row in data["teams"]],
+        current_round=current_round,
+        rounds_played=_decode_rounds(data["rounds"]),
+        playlist_id=playlist_id,
+        played_song_ids=played_song_ids,
+        is_active=is_active,
+        created_at=_fromisoformat(created_at),
+        active_round=_decode_rounds([active_round])[0] if active_round else None,
+        difficulty=difficulty,
+        large_teams=large_teams,
+        reveal=reveal,
+        archived_rounds=ArchivedRounds(
+            blocks=tuple(base64.b64decode(block) for block in blocks),
+            totals=RoundTotals(*totals),
+        ),
+    )
+
+
+def compress_rounds(rounds: list[GameRound]) -> bytes:
+    """Return a block of archived rounds."""
+    rows = [_encode_round(game_round) for game_round in rounds]
+    return zlib.compress(json.dumps(rows, separators=(",", ":")).encode())
+
+
+def decompress_rounds(block: bytes) -> list[GameRound]:
+    """Restore the rounds of an archived block."""
+    return _decode_rounds(json.loads(zlib.decompress(block)))
+
+
+def all_rounds(state: GameState) -> list[GameRound]:
+    """Return every round of a game, decoding the archived ones."""
+    rounds = [
+        game_round
+        for block in state.archived_rounds.blocks
+        for game_round in decompress_rounds(block)
+    ]
+    return rounds + state.rounds_played
+
+
+def _encode_round(game_round: GameRound) -> list[Any]:
+    """Return a round as a row."""
+    return [
+        game_round.round_number,
+        game_round.song_id,
+        game_round.team_guesses,
+        game_round.team_bets,
+        game_round.team_scores,
+        game_round.actual_year,
+        game_round.timestamp.isoformat(),
+        game_round.guesses_locked,
+    ]
+
+
+def _decode_rounds(rows: list[list[Any]]) -> list[GameRound]:
+    """Restore rounds from their rows."""
+    return [
+        GameRound(number, song_id, guesses, bets, scores, year, _fromisoformat(timestamp), locked)
+        for number, song_id, guesses, bets, scores, year, timestamp, locked in rows
+    ]
+
+
+def _migrate_1(data: dict[str, Any]) -> dict[str, Any]:
+    """Convert the ``to_dict`` layout; fills in fields older versions lacked."""
+    now = datetime.now().isoformat()
+
+    def round_row(round_data: dict[str, Any]) -> list[Any]:
+        return [
+            round_data["round_number"],
+            round_data.get("song_id", 0),
+            round_data.get("team_guesses", {}),
+            round_data.get("team_bets", {}),
+            round_data.get("team_scores", {}),
+            round_data.get("actual_year", 0),
+            _valid_timestamp(round_data.get("timestamp"), now),
+            round_data.get("guesses_locked", False),
+        ]
+
+    active_round = data.get("active_round")
+    return {
+        "schema": 2,
+        "game": [
+            data.get("game_id", str(uuid.uuid4())),
+            data.get("playlist_id", "default"),
+            data.get("current_round", 0),
+            data.get("played_song_ids", []),
+            data.get("is_active", True),
+            _valid_timestamp(data.get("created_at"), now),
+            data.get("difficulty"),
+            data.get("large_teams", False),
+            data.get("reveal"),
+        ],
+        "teams": [
+            [
+                team["id"],
+                team["name"],
+                team["score"],
+                team.get("current_guess"),
+                team.get("has_bet", False),
+                team.get("streak", 0),
+            ]
+            for team in data.get("teams", [])
+        ],
+        "rounds": [round_row(round_data) for round_data in data.get("rounds_played", [])],
+        "active_round": round_row(active_round) if active_round else None,
+    }
+
+
+def _valid_timestamp(value: Any, default: str) -> str:
+    """Return an ISO timestamp, or the default if the value is not one."""
+    try:
+        _fromisoformat(value)
+    except (TypeError, ValueError):
+        return default
+    return value
+
+
+def _migrate_2(data: dict[str, Any]) -> dict[str, Any]:
+    """Add the empty archive of rounds."""
+    return {**data, "schema": 3, "archived": [list(astuple(RoundTotals())), []]}
+
+
+# Converts the layout of a schema to the next one
+_MIGRATIONS: dict[int, Callable[[dict[str, Any]], dict[str, Any]]] = {
+    1: _migrate_1,
+    2: _migrate_2,
+}
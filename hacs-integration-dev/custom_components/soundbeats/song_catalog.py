@@ -0,0 +1,351 @@
+"""Song catalog for Soundbeats."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Collection, Iterable, Mapping, Sequence
+from datetime import datetime
+import json
+import logging
+import random
+from pathlib import Path
+from typing import Any
+import weakref
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import (
+    CATALOG_REBUILD_COOLDOWN,
+    CATALOG_WATCH_INTERVAL,
+    DEFAULT_PLAYLIST,
+    DOMAIN,
+    SONG_CATALOG_FILE,
+)
+from .models import Song
+from .playlists import ConstraintChecker, ConstraintPlaylist, PlaylistRules
+from .search import TrigramIndex
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CatalogIndex:
+    """Immutable snapshot of the catalog.
+
+    An index is built off the event loop and never changed afterwards, so a
+    game can keep using the snapshot it started with while newer versions
+    are swapped in.
+    """
+
+    __slots__ = (
+        "version",
+        "songs",
+        "playlists",
+        "dynamic_playlists",
+        "year_buckets",
+        "search_index",
+        "__weakref__",
+    )
+
+    def __init__(
+        self,
+        version: int,
+        songs: Mapping[int, Song],
+        playlists: Mapping[str, tuple[int, ...]],
+        dynamic_playlists: Mapping[str, ConstraintPlaylist] | None = None,
+        year_buckets: Mapping[int, tuple[int, ...]] | None = None,
+        search_index: TrigramIndex | None = None,
+    ) -> None:
+        """Initialize the index."""
+        self.version = version
+        self.songs = songs
+        self.playlists = playlists
+        self.dynamic_playlists = dynamic_playlists or {}
+        self.year_buckets = year_buckets or {}
+        self.search_index = search_index or TrigramIndex({}, {})
+
+    @classmethod
+    def build(
+        cls,
+        version: int,
+        songs: Mapping[int, Song],
+        playlists: Mapping[str, Iterable[int]],
+        rules: Mapping[str, PlaylistRules] | None = None,
+    ) -> CatalogIndex:
+        """Build an index from source data; safe to run in the executor."""
+        years: dict[int, list[int]] = {}
+        for song in songs.values():
+            years.setdefault(song.year, []).append(song.id)
+        year_buckets = {year: tuple(song_ids) for year, song_ids in years.items()}
+
+        return cls(
+            version,
+            songs,
+            {
+                playlist_id: tuple(song_id for song_id in song_ids if song_id in songs)
+                for playlist_id, song_ids in playlists.items()
+            },
+            {
+                playlist_id: ConstraintPlaylist(playlist_rules, songs, year_buckets)
+                for playlist_id, playlist_rules in (rules or {}).items()
+            },
+            year_buckets,
+            TrigramIndex.build(songs.values()),
+        )
+
+    def __len__(self) -> int:
+        """Return the number of songs in the index."""
+        return len(self.songs)
+
+    def get_song(self, song_id: int) -> Song | None:
+        """Return a song by id."""
+        return self.songs.get(song_id)
+
+    def search(self, query: str, limit: int = 20) -> list[tuple[Song, float]]:
+        """Return songs whose artist or title fuzzily match a query."""
+        return [
+            (self.songs[song_id], score)
+            for song_id, score in self.search_index.search(query, limit)
+        ]
+
+    def checker(self, playlist_id: str) -> ConstraintChecker | None:
+        """Return a constraint checker for a game, if the playlist is dynamic."""
+        if (playlist := self.dynamic_playlists.get(playlist_id)) is None:
+            return None
+        return playlist.checker()
+
+    def pick_song(
+        self,
+        playlist_id: str = DEFAULT_PLAYLIST,
+        exclude: Sequence[int] = (),
+        checker: ConstraintChecker | None = None,
+    ) -> Song | None:
+        """Pick a random song from a playlist that has not been played yet.
+
+        ``exclude`` lists the songs played so far, oldest first; ``checker``
+        is the game's checker from ``checker()`` for dynamic playlists.
+        """
+        if playlist_id in self.dynamic_playlists:
+            return self.dynamic_playlists[playlist_id].pick_song(exclude, checker=checker)
+        if playlist_id in self.playlists:
+            candidates: Collection[int] = self.playlists[playlist_id]
+        else:
+            candidates = self.songs.keys()
+
+        excluded = set(exclude)
+        remaining = [song_id for song_id in candidates if song_id not in excluded]
+        if not remaining:
+            return None
+        return self.songs[random.choice(remaining)]
+
+
+class SongCatalog:
+    """Songs and playlists available to games.
+
+    The catalog is read from ``<config>/soundbeats/songs.json``::
+
+        {
+            "songs": [{"id": 1, "title": "...", "artist": "...",
+                       "year": 1984, "media_id": "spotify:track:..."}],
+            "playlists": {"80s": [1, 2, 3],
+                          "classics": {"year_min": 1975, "year_max": 1995}}
+        }
+
+    and merged with songs streamed in by the music library indexer. Changes
+    to either source rebuild a new ``CatalogIndex`` in the background, which
+    then replaces the current one in a single assignment. Games lease the
+    index that was current when they asked for their first song and keep it
+    until they are released, after which the old index can be freed.
+
+    Nothing is read until the catalog is first used, so a large catalog does
+    not delay setting up the config entry.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the song catalog."""
+        self.hass = hass
+        self._path = Path(hass.config.path(SONG_CATALOG_FILE))
+        self._file_mtime: float | None = None
+        self._file_songs: dict[int, Song] = {}
+        self._file_playlists: dict[str, list[int]] = {}
+        self._file_rules: dict[str, PlaylistRules] = {}
+        self._library_songs: dict[int, Song] = {}
+        self._index = CatalogIndex(0, {}, {})
+        self._leases: dict[str, CatalogIndex] = {}
+        self._live_indexes: weakref.WeakSet[CatalogIndex] = weakref.WeakSet()
+        self._rebuild_lock = asyncio.Lock()
+        self._load_task: asyncio.Task[None] | None = None
+        self._rebuild_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=CATALOG_REBUILD_COOLDOWN,
+            immediate=False,
+            function=self.async_rebuild,
+        )
+
+    def __len__(self) -> int:
+        """Return the number of songs in the current index."""
+        return len(self._index)
+
+    @property
+    def index(self) -> CatalogIndex:
+        """Return the current index."""
+        return self._index
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return index versions and leases."""
+        return {
+            "version": self._index.version,
+            "songs": len(self._index),
+            "leased_versions": sorted({index.version for index in self._leases.values()}),
+            "live_versions": sorted(index.version for index in self._live_indexes),
+        }
+
+    async def async_load(self) -> None:
+        """Load the catalog from disk without blocking the event loop."""
+        mtime, data = await self.hass.async_add_executor_job(
+            _read_catalog_file, self._path
+        )
+        self._file_mtime = mtime
+        if data is None:
+            # Keep serving the previous songs until the file is fixed
+            return
+
+        songs: dict[int, Song] = {}
+        for song_data in data.get("songs", []):
+            try:
+                song = Song.from_dict(song_data)
+            except (KeyError, TypeError, ValueError) as err:
+                _LOGGER.warning("Skipping invalid song entry %s: %s", song_data, err)
+                continue
+            songs[song.id] = song
+
+        playlists: dict[str, list[int]] = {}
+        rules: dict[str, PlaylistRules] = {}
+        for playlist_id, definition in data.get("playlists", {}).items():
+            try:
+                if isinstance(definition, dict):
+                    rules[str(playlist_id)] = PlaylistRules.from_dict(definition)
+                else:
+                    playlists[str(playlist_id)] = list(definition)
+            except (AttributeError, TypeError, ValueError) as err:
+                _LOGGER.warning("Skipping invalid playlist %s: %s", playlist_id, err)
+
+        self._file_songs = songs
+        self._file_playlists = playlists
+        self._file_rules = rules
+        await self.async_rebuild()
+        _LOGGER.info(
+            "Loaded %d songs and %d playlists",
+            len(self._index),
+            len(self._index.playlists) + len(self._index.dynamic_playlists),
+        )
+
+    async def async_ensure_loaded(self) -> None:
+        """Load the catalog on first use; concurrent callers share the load."""
+        if self._load_task is None:
+            self._load_task = self.hass.async_create_task(
+                self.async_load(), f"{DOMAIN}_catalog_load"
+            )
+        task = self._load_task
+        try:
+            await asyncio.shield(task)
+        except Exception:
+            # Forget the failed load so the next use retries it
+            if self._load_task is task:
+                self._load_task = None
+            raise
+
+    @callback
+    def async_start_watching(self) -> Callable[[], None]:
+        """Reload the catalog file whenever it changes; return a stop callback."""
+
+        async def _async_check(_now: datetime) -> None:
+            """Reload the catalog file if its modification time changed."""
+            if self._load_task is None or not self._load_task.done():
+                # Not used yet; the first use reads the current file anyway
+                return
+            mtime = await self.hass.async_add_executor_job(_file_mtime, self._path)
+            if mtime != self._file_mtime:
+                _LOGGER.info("Song catalog %s changed, reloading", self._path)
+                await self.async_load()
+
+        return async_track_time_interval(self.hass, _async_check, CATALOG_WATCH_INTERVAL)
+
+    async def async_rebuild(self) -> None:
+        """Build a new index in the executor and swap it in."""
+        async with self._rebuild_lock:
+            songs = {**self._file_songs, **self._library_songs}
+            index = await self.hass.async_add_executor_job(
+                CatalogIndex.build,
+                self._index.version + 1,
+                songs,
+                self._file_playlists,
+                self._file_rules,
+            )
+            self._live_indexes.add(index)
+            self._index = index
+        _LOGGER.debug("Swapped in catalog index version %d", index.version)
+
+    def add_songs(self, songs: Iterable[Song]) -> None:
+        """Add or replace library songs; the index is rebuilt shortly after."""
+        for song in songs:
+            self._library_songs[song.id] = song
+        self._rebuild_debouncer.async_schedule_call()
+
+    def remove_songs(self, song_ids: Iterable[int]) -> None:
+        """Remove library songs; the index is rebuilt shortly after."""
+        removed = [
+            song_id for song_id in song_ids if self._library_songs.pop(song_id, None)
+        ]
+        if removed:
+            self._rebuild_debouncer.async_schedule_call()
+
+    def get_song(self, song_id: int) -> Song | None:
+        """Return a song by id from the latest source data."""
+        return self._library_songs.get(song_id) or self._file_songs.get(song_id)
+
+    def get_playlists(self) -> list[str]:
+        """Return the available playlist ids."""
+        return [*self._index.playlists, *self._index.dynamic_playlists]
+
+    def index_for(self, game_id: str) -> CatalogIndex:
+        """Return the index a game uses, leasing the current one on first use."""
+        if (index := self._leases.get(game_id)) is None:
+            index = self._leases[game_id] = self._index
+        return index
+
+    def release(self, game_id: str) -> None:
+        """Release the index leased by a game."""
+        self._leases.pop(game_id, None)
+
+    async def async_shutdown(self) -> None:
+        """Cancel any pending rebuild."""
+        self._rebuild_debouncer.async_cancel()
+
+
+def _file_mtime(path: Path) -> float | None:
+    """Return the modification time of a file; runs in the executor."""
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return None
+
+
+def _read_catalog_file(path: Path) -> tuple[float | None, dict[str, Any] | None]:
+    """Read the catalog file and its mtime; runs in the executor.
+
+    Returns no data when the file exists but cannot be parsed.
+    """
+    if (mtime := _file_mtime(path)) is None:
+        _LOGGER.warning("Song catalog %s not found, starting with no songs", path)
+        return None, {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(data, dict):
+            raise ValueError(f"expected an object, got {type(data).__name__}")
+        return mtime, data
+    except (OSError, ValueError) as err:
+        _LOGGER.error("Failed to read song catalog %s: %s", path, err)
+        return mtime, None
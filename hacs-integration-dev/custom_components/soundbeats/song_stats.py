@@ -0,0 +1,252 @@
+"""Per-song guess statistics for Soundbeats."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+import heapq
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .models import GameRound
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 30
+
+DIGEST_COMPRESSION = 25
+DIGEST_BUFFER = 32
+
+# Guesses needed before a song gets a difficulty
+MIN_GUESSES = 3
+
+DIFFICULTY_EASY = "easy"
+DIFFICULTY_MEDIUM = "medium"
+DIFFICULTY_HARD = "hard"
+DIFFICULTIES = (DIFFICULTY_EASY, DIFFICULTY_MEDIUM, DIFFICULTY_HARD)
+
+# Upper bound of the mean absolute error, in years, of each difficulty
+DIFFICULTY_THRESHOLDS = ((DIFFICULTY_EASY, 3.0), (DIFFICULTY_MEDIUM, 8.0))
+
+
+class TDigest:
+    """Merging t-digest for streaming quantiles in bounded memory.
+
+    Values are buffered and merged into at most about ``compression``
+    centroids, smaller ones near the tails, so adding a value is amortized
+    O(1) and quantiles stay accurate at the extremes.
+    """
+
+    __slots__ = ("compression", "count", "_centroids", "_buffer")
+
+    def __init__(
+        self,
+        compression: int = DIGEST_COMPRESSION,
+        centroids: Iterable[list[float]] = (),
+    ) -> None:
+        """Initialize the digest."""
+        self.compression = compression
+        self._centroids = [[float(mean), float(weight)] for mean, weight in centroids]
+        self.count = sum(weight for _, weight in self._centroids)
+        self._buffer: list[list[float]] = []
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        """Add a value."""
+        self._buffer.append([float(value), weight])
+        self.count += weight
+        if len(self._buffer) >= DIGEST_BUFFER:
+            self._compress()
+
+    def quantile(self, q: float) -> float | None:
+        """Return the estimated value at quantile ``q`` (0..1)."""
+        self._compress()
+        centroids = self._centroids
+        if not centroids:
+            return None
+        if len(centroids) == 1:
+            return centroids[0][0]
+
+        target = q * self.count
+        cumulative = 0.0
+        previous_center = previous_mean = None
+        for mean, weight in centroids:
+            center = cumulative + weight / 2
+            if target <= center:
+                if previous_center is None:
+                    return mean
+                fraction = (target - previous_center) / (center - previous_center)
+                return previous_mean + fraction * (mean - previous_mean)
+            previous_center, previous_mean = center, mean
+            cumulative += weight
+        return centroids[-1][0]
+
+    def to_list(self) -> list[list[float]]:
+        """Return the centroids in a compact JSON friendly form."""
+        self._compress()
+        return [[round(mean, 3), weight] for mean, weight in self._centroids]
+
+    def _compress(self) -> None:
+        """Merge buffered values into the centroids."""
+        if not self._buffer:
+            return
+        points = sorted(self._centroids + self._buffer)
+        self._buffer = []
+        total = self.count
+        merged: list[list[float]] = [points[0]]
+        cumulative = 0.0
+        for mean, weight in points[1:]:
+            current = merged[-1]
+            q = (cumulative + current[1] + weight / 2) / total
+            limit = 4 * total * q * (1 - q) / self.compression
+            if current[1] + weight <= limit:
+                combined = current[1] + weight
+                current[0] += (mean - current[0]) * weight / combined
+                current[1] = combined
+            else:
+                cumulative += current[1]
+                merged.append([mean, weight])
+        self._centroids = merged
+
+
+class SongStats:
+    """Running guess statistics of one song."""
+
+    __slots__ = ("guesses", "error_sum", "exact", "digest")
+
+    def __init__(
+        self,
+        guesses: int = 0,
+        error_sum: int = 0,
+        exact: int = 0,
+        digest: TDigest | None = None,
+    ) -> None:
+        """Initialize the statistics."""
+        self.guesses = guesses
+        self.error_sum = error_sum
+        self.exact = exact
+        self.digest = digest or TDigest()
+
+    @property
+    def mean_error(self) -> float:
+        """Return the mean absolute error in years."""
+        return self.error_sum / self.guesses if self.guesses else 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the share of guesses that named the exact year."""
+        return self.exact / self.guesses if self.guesses else 0.0
+
+    @property
+    def difficulty(self) -> str | None:
+        """Return the difficulty once enough guesses were made."""
+        if self.guesses < MIN_GUESSES:
+            return None
+        mean_error = self.mean_error
+        for difficulty, threshold in DIFFICULTY_THRESHOLDS:
+            if mean_error <= threshold:
+                return difficulty
+        return DIFFICULTY_HARD
+
+    def add(self, error: int) -> None:
+        """Add the absolute error of a guess."""
+        self.guesses += 1
+        self.error_sum += error
+        self.exact += error == 0
+        self.digest.add(error)
+
+    def to_list(self) -> list[Any]:
+        """Return the statistics in a compact JSON friendly form."""
+        return [self.guesses, self.error_sum, self.exact, self.digest.to_list()]
+
+    @classmethod
+    def from_list(cls, data: list[Any]) -> SongStats:
+        """Create statistics from their compact form."""
+        guesses, error_sum, exact, centroids = data
+        return cls(guesses, error_sum, exact, TDigest(centroids=centroids))
+
+
+class SongStatsTracker:
+    """Keeps statistics of every song that has been guessed.
+
+    Statistics are updated when a round ends, in time proportional to the
+    number of guesses of that round, and saved with a delay so a busy game
+    does not write to disk after every round.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the tracker."""
+        self.hass = hass
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.song_stats"
+        )
+        self._songs: dict[int, SongStats] = {}
+
+    def __len__(self) -> int:
+        """Return the number of songs with statistics."""
+        return len(self._songs)
+
+    async def async_load(self) -> None:
+        """Load the statistics from storage."""
+        stored = await self._store.async_load() or {}
+        for song_id, data in stored.get("songs", {}).items():
+            try:
+                self._songs[int(song_id)] = SongStats.from_list(data)
+            except (TypeError, ValueError) as err:
+                _LOGGER.warning("Dropping invalid statistics of song %s: %s", song_id, err)
+
+    async def async_save(self) -> None:
+        """Save the statistics now."""
+        await self._store.async_save(self._data_to_save())
+
+    def record_round(self, game_round: GameRound) -> None:
+        """Add the guesses of a finished round."""
+        if not game_round.song_id or not game_round.team_guesses:
+            return
+        stats = self._songs.get(game_round.song_id)
+        if stats is None:
+            stats = self._songs[game_round.song_id] = SongStats()
+        for guess in game_round.team_guesses.values():
+            stats.add(abs(guess - game_round.actual_year))
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def get(self, song_id: int) -> SongStats | None:
+        """Return the statistics of a song."""
+        return self._songs.get(song_id)
+
+    def difficulty(self, song_id: int) -> str | None:
+        """Return the difficulty of a song, if known."""
+        stats = self._songs.get(song_id)
+        return stats.difficulty if stats else None
+
+    def hardest(self, limit: int = 10) -> list[dict[str, Any]]:
+        """Return the songs with the highest mean error."""
+        rated = (
+            (song_id, stats)
+            for song_id, stats in self._songs.items()
+            if stats.guesses >= MIN_GUESSES
+        )
+        return [
+            {
+                "song_id": song_id,
+                "guesses": stats.guesses,
+                "mean_error": round(stats.mean_error, 2),
+                "hit_rate": round(stats.hit_rate, 3),
+                "median_error": stats.digest.quantile(0.5),
+                "p90_error": stats.digest.quantile(0.9),
+                "difficulty": stats.difficulty,
+            }
+            for song_id, stats in heapq.nlargest(
+                limit, rated, key=lambda item: item[1].mean_error
+            )
+        ]
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to store."""
+        return {
+            "songs": {
+                str(song_id): stats.to_list() for song_id, stats in self._songs.items()
+            }
+        }
@@ -0,0 +1,120 @@
+"""Game state subscriptions of websocket connections."""
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.components.websocket_api import ActiveConnection
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import EVENT_GAME_STATE_CHANGED, MAX_SUBSCRIPTIONS_PER_CONNECTION
+
+# Sends one game state to a subscriber
+Forwarder = Callable[[dict[str, Any]], None]
+
+# Returns the state to send to subscribers
+PayloadFactory = Callable[[], dict[str, Any] | None]
+
+
+class SubscriptionRegistry:
+    """Subscribers to the game state of one config entry.
+
+    A single dispatcher listener fans each state out to every subscriber,
+    so the listener count does not grow with open panels. Unloading the
+    entry drops all subscriptions at once instead of leaving them behind
+    until their connections close.
+
+    ``payload`` builds the state sent to clients, which may be smaller than
+    the state broadcast to the entities. It is called once per broadcast,
+    however many subscribers there are.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, entry_id: str, payload: PayloadFactory | None = None
+    ) -> None:
+        """Initialize the registry."""
+        self.hass = hass
+        self.entry_id = entry_id
+        self._payload = payload
+        # connection -> {message id: forwarder}
+        self._subscribers: dict[ActiveConnection, dict[int, Forwarder]] = {}
+        self._unsub_dispatcher: CALLBACK_TYPE | None = None
+        self.peak = 0
+        self.counters: Counter[str] = Counter()
+
+    @property
+    def count(self) -> int:
+        """Return the number of open subscriptions."""
+        return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return subscriber counts and counters."""
+        return {
+            "subscribers": self.count,
+            "connections": len(self._subscribers),
+            "peak": self.peak,
+            "listening": self._unsub_dispatcher is not None,
+            **self.counters,
+        }
+
+    @callback
+    def async_start(self) -> CALLBACK_TYPE:
+        """Listen for state changes; returns a callback that tears everything down."""
+        self._unsub_dispatcher = async_dispatcher_connect(
+            self.hass, f"{EVENT_GAME_STATE_CHANGED}_{self.entry_id}", self._async_forward
+        )
+        return self.async_shutdown
+
+    @callback
+    def async_add(
+        self, connection: ActiveConnection, msg_id: int, forward: Forwarder
+    ) -> CALLBACK_TYPE | None:
+        """Add a subscription; returns its unsubscribe callback or None when over the cap."""
+        if self._unsub_dispatcher is None:
+            self.counters["rejected_unloaded"] += 1
+            return None
+        subscriptions = self._subscribers.setdefault(connection, {})
+        if len(subscriptions) >= MAX_SUBSCRIPTIONS_PER_CONNECTION:
+            self.counters["rejected_cap"] += 1
+            return None
+        subscriptions[msg_id] = forward
+        self.peak = max(self.peak, self.count)
+
+        @callback
+        def _async_remove() -> None:
+            """Remove the subscription if it is still registered."""
+            if (remaining := self._subscribers.get(connection)) is None:
+                return
+            remaining.pop(msg_id, None)
+            if not remaining:
+                del self._subscribers[connection]
+
+        return _async_remove
+
+    @callback
+    def _async_forward(self, game_state: dict[str, Any]) -> None:
+        """Send a state to every subscriber."""
+        if self._payload is not None:
+            game_state = self._payload() or game_state
+        for subscriptions in list(self._subscribers.values()):
+            for forward in list(subscriptions.values()):
+                forward(game_state)
+        self.counters["broadcasts"] += 1
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop listening and drop every subscription.
+
+        The subscriptions are also removed from their connections, so nothing
+        of this entry outlives the unload.
+        """
+        if self._unsub_dispatcher is not None:
+            self._unsub_dispatcher()
+            self._unsub_dispatcher = None
+        for connection, subscriptions in self._subscribers.items():
+            for msg_id in subscriptions:
+                connection.subscriptions.pop(msg_id, None)
+        self._subscribers.clear()
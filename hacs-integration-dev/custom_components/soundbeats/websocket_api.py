@@ -1,15 +1,21 @@
 """WebSocket API for Soundbeats game management."""
+from functools import wraps
 import logging
-from typing import Any, Dict
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
 import voluptuous as vol
 from homeassistant.components import websocket_api
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.dispatcher import async_dispatcher_connect
-from .const import DOMAIN, EVENT_GAME_STATE_CHANGED
+from .const import DEFAULT_PLAYLIST, DOMAIN, LEADERBOARD_SIZE, MAX_TEAMS_LARGE, ROUND_BLOCK_SIZE
 from .game_manager import GameManager
+from .rate_limit import RateLimiter
+from .song_catalog import SongCatalog
+from .song_stats import DIFFICULTIES, SongStatsTracker
+from .subscriptions import SubscriptionRegistry
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
 
 def async_setup_websocket_api(hass: HomeAssistant) -> None:
     """Set up WebSocket API commands."""
@@ -18,14 +24,77 @@ def async_setup_websocket_api(hass: HomeAssistant) -> None:
     websocket_api.async_register_command(hass, websocket_update_team_name)
     websocket_api.async_register_command(hass, websocket_add_team)
     websocket_api.async_register_command(hass, websocket_remove_team)
+    websocket_api.async_register_command(hass, websocket_start_round)
+    websocket_api.async_register_command(hass, websocket_submit_guess)
+    websocket_api.async_register_command(hass, websocket_lock_guesses)
+    websocket_api.async_register_command(hass, websocket_end_round)
+    websocket_api.async_register_command(hass, websocket_end_game)
+    websocket_api.async_register_command(hass, websocket_get_playlists)
+    websocket_api.async_register_command(hass, websocket_search_songs)
+    websocket_api.async_register_command(hass, websocket_get_song_stats)
+    websocket_api.async_register_command(hass, websocket_get_stats)
+    websocket_api.async_register_command(hass, websocket_get_leaderboard)
+    websocket_api.async_register_command(hass, websocket_get_rounds)
     websocket_api.async_register_command(hass, websocket_subscribe_game_state)
 
 
+def _rate_limited(handler: Callable[..., None]) -> Callable[..., None]:
+    """Reject a command when its connection or team runs out of tokens.
+    
+    The check runs before the handler is scheduled, so a flood of commands
+    never reaches the game manager, its saves or its broadcasts.
+    """
+    
+    @callback
+    @wraps(handler)
+    def _check(
+        hass: HomeAssistant,
+        connection: websocket_api.ActiveConnection,
+        msg: Dict[str, Any],
+    ) -> None:
+        entry_data = hass.data[DOMAIN].get(msg["entry_id"])
+        if entry_data is not None:
+            limiter: RateLimiter = entry_data["rate_limiter"]
+            key = id(connection)
+            unsub_key = f"{DOMAIN}_rate_limit_{msg['entry_id']}"
+            if unsub_key not in connection.subscriptions:
+                connection.subscriptions[unsub_key] = lambda: limiter.forget_connection(key)
+            if not limiter.allow(key, msg.get("team_id")):
+                connection.send_error(msg["id"], "rate_limited", "Too many requests")
+                return
+        handler(hass, connection, msg)
+    
+    return _check
+
+
+async def _async_run_once(
+    game_manager: GameManager,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+    operation: Callable[[], Awaitable[_T]],
+) -> _T:
+    """Run a command's operation once per user, command and operation id.
+    
+    Scoping the client id keeps one command from getting the cached
+    result of another, or of another user, that happened to use the
+    same id. Retries after a reconnect still match, as the user stays
+    the same.
+    """
+    op_id = msg.get("op_id")
+    op_key = None if op_id is None else (connection.user.id, msg["type"], op_id)
+    return await game_manager.async_run_once(op_key, operation)
+
+
 @websocket_api.websocket_command({
     vol.Required("type"): "soundbeats/new_game",
     vol.Required("entry_id"): str,
-    vol.Required("team_count"): vol.All(int, vol.Range(min=1, max=5)),
+    vol.Optional("op_id"): str,
+    vol.Required("team_count"): vol.All(int, vol.Range(min=1, max=MAX_TEAMS_LARGE)),
+    vol.Optional("difficulty"): vol.In(DIFFICULTIES),
+    vol.Optional("large_teams", default=False): bool,
+    vol.Optional("playlist_id", default=DEFAULT_PLAYLIST): str,
 })
+@_rate_limited
 @websocket_api.async_response
 async def websocket_new_game(
     hass: HomeAssistant,
@@ -42,9 +111,16 @@ async def websocket_new_game(
     
     game_manager: GameManager = hass.data[DOMAIN][entry_id]["game_manager"]
     
+    async def _new_game() -> Dict[str, Any]:
+        """Create the game and return its state."""
+        game_state = await game_manager.new_game(
+            team_count, msg.get("difficulty"), msg["large_teams"], msg["playlist_id"]
+        )
+        return game_state.to_dict()
+    
     try:
-        game_state = await game_manager.new_game(team_count)
-        connection.send_result(msg["id"], game_state.to_dict())
+        result = await _async_run_once(game_manager, connection, msg, _new_game)
+        connection.send_result(msg["id"], result)
     except Exception as err:
         _LOGGER.error("Error creating new game: %s", err)
         connection.send_error(msg["id"], "game_error", str(err))
@@ -76,9 +152,11 @@ async def websocket_get_game_state(
 @websocket_api.websocket_command({
     vol.Required("type"): "soundbeats/update_team_name",
     vol.Required("entry_id"): str,
+    vol.Optional("op_id"): str,
     vol.Required("team_id"): str,
     vol.Required("name"): str,
 })
+@_rate_limited
 @websocket_api.async_response
 async def websocket_update_team_name(
     hass: HomeAssistant,
@@ -95,7 +173,12 @@ async def websocket_update_team_name(
     game_manager: GameManager = hass.data[DOMAIN][entry_id]["game_manager"]
     
     try:
-        await game_manager.update_team_name(msg["team_id"], msg["name"])
+        await _async_run_once(
+            game_manager,
+            connection,
+            msg,
+            lambda: game_manager.update_team_name(msg["team_id"], msg["name"]),
+        )
         connection.send_result(msg["id"], {"success": True})
     except Exception as err:
         _LOGGER.error("Error updating team name: %s", err)
@@ -105,7 +188,9 @@ async def websocket_update_team_name(
 @websocket_api.websocket_command({
     vol.Required("type"): "soundbeats/add_team",
     vol.Required("entry_id"): str,
+    vol.Optional("op_id"): str,
 })
+@_rate_limited
 @websocket_api.async_response
 async def websocket_add_team(
     hass: HomeAssistant,
@@ -121,10 +206,15 @@ async def websocket_add_team(
     
     game_manager: GameManager = hass.data[DOMAIN][entry_id]["game_manager"]
     
-    try:
+    async def _add_team() -> Optional[Dict[str, Any]]:
+        """Add a team and return it, if the limit allows."""
         team = await game_manager.add_team()
+        return team.to_dict() if team else None
+    
+    try:
+        team = await _async_run_once(game_manager, connection, msg, _add_team)
         if team:
-            connection.send_result(msg["id"], {"success": True, "team": team.to_dict()})
+            connection.send_result(msg["id"], {"success": True, "team": team})
         else:
             connection.send_error(msg["id"], "limit_reached", "Maximum team limit reached")
     except Exception as err:
@@ -135,8 +225,10 @@ async def websocket_add_team(
 @websocket_api.websocket_command({
     vol.Required("type"): "soundbeats/remove_team",
     vol.Required("entry_id"): str,
+    vol.Optional("op_id"): str,
     vol.Required("team_id"): str,
 })
+@_rate_limited
 @websocket_api.async_response
 async def websocket_remove_team(
     hass: HomeAssistant,
@@ -153,7 +245,12 @@ async def websocket_remove_team(
     game_manager: GameManager = hass.data[DOMAIN][entry_id]["game_manager"]
     
     try:
-        success = await game_manager.remove_team(msg["team_id"])
+        success = await _async_run_once(
+            game_manager,
+            connection,
+            msg,
+            lambda: game_manager.remove_team(msg["team_id"]),
+        )
         if success:
             connection.send_result(msg["id"], {"success": True})
         else:
@@ -164,18 +261,342 @@ async def websocket_remove_team(
 
 
 @websocket_api.websocket_command({
-    vol.Required("type"): "soundbeats/subscribe_game_state",
+    vol.Required("type"): "soundbeats/start_round",
     vol.Required("entry_id"): str,
+    vol.Optional("op_id"): str,
 })
+@_rate_limited
 @websocket_api.async_response
-async def websocket_subscribe_game_state(
+async def websocket_start_round(
     hass: HomeAssistant,
     connection: websocket_api.ActiveConnection,
     msg: Dict[str, Any],
 ) -> None:
-    """Subscribe to game state changes."""
+    """Start the next round."""
+    entry_id = msg["entry_id"]
+    
+    if entry_id not in hass.data[DOMAIN]:
+        connection.send_error(msg["id"], "invalid_entry", "Invalid entry ID")
+        return
+    
+    game_manager: GameManager = hass.data[DOMAIN][entry_id]["game_manager"]
+    
+    async def _start_round() -> Dict[str, Any]:
+        """Start the round and return it."""
+        return (await game_manager.start_round()).to_dict()
+    
+    try:
+        game_round = await _async_run_once(game_manager, connection, msg, _start_round)
+        connection.send_result(msg["id"], {"success": True, "round": game_round})
+    except Exception as err:
+        _LOGGER.error("Error starting round: %s", err)
+        connection.send_error(msg["id"], "round_error", str(err))
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "soundbeats/submit_guess",
+    vol.Required("entry_id"): str,
+    vol.Optional("op_id"): str,
+    vol.Required("team_id"): str,
+    vol.Required("year"): vol.All(int, vol.Range(min=1900, max=2100)),
+    vol.Optional("bet", default=False): bool,
+})
+@_rate_limited
+@websocket_api.async_response
+async def websocket_submit_guess(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Submit a team's guess for the round in progress."""
+    entry_id = msg["entry_id"]
+    
+    if entry_id not in hass.data[DOMAIN]:
+        connection.send_error(msg["id"], "invalid_entry", "Invalid entry ID")
+        return
+    
+    game_manager: GameManager = hass.data[DOMAIN][entry_id]["game_manager"]
+    
+    try:
+        await _async_run_once(
+            game_manager,
+            connection,
+            msg,
+            lambda: game_manager.submit_guess(msg["team_id"], msg["year"], msg["bet"]),
+        )
+        connection.send_result(msg["id"], {"success": True})
+    except Exception as err:
+        _LOGGER.error("Error submitting guess: %s", err)
+        connection.send_error(msg["id"], "guess_error", str(err))
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "soundbeats/lock_guesses",
+    vol.Required("entry_id"): str,
+    vol.Optional("op_id"): str,
+})
+@_rate_limited
+@websocket_api.async_response
+async def websocket_lock_guesses(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Close the round in progress for guesses."""
+    entry_id = msg["entry_id"]
+    
+    if entry_id not in hass.data[DOMAIN]:
+        connection.send_error(msg["id"], "invalid_entry", "Invalid entry ID")
+        return
+    
+    game_manager: GameManager = hass.data[DOMAIN][entry_id]["game_manager"]
+    
+    try:
+        await _async_run_once(game_manager, connection, msg, game_manager.lock_guesses)
+        connection.send_result(msg["id"], {"success": True})
+    except Exception as err:
+        _LOGGER.error("Error locking guesses: %s", err)
+        connection.send_error(msg["id"], "round_error", str(err))
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "soundbeats/end_round",
+    vol.Required("entry_id"): str,
+    vol.Optional("op_id"): str,
+})
+@_rate_limited
+@websocket_api.async_response
+async def websocket_end_round(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """End the round in progress."""
+    entry_id = msg["entry_id"]
+    
+    if entry_id not in hass.data[DOMAIN]:
+        connection.send_error(msg["id"], "invalid_entry", "Invalid entry ID")
+        return
+    
+    game_manager: GameManager = hass.data[DOMAIN][entry_id]["game_manager"]
+    
+    async def _end_round() -> Dict[str, Any]:
+        """End the round and return it."""
+        return (await game_manager.end_round()).to_dict()
+    
+    try:
+        game_round = await _async_run_once(game_manager, connection, msg, _end_round)
+        connection.send_result(msg["id"], {"success": True, "round": game_round})
+    except Exception as err:
+        _LOGGER.error("Error ending round: %s", err)
+        connection.send_error(msg["id"], "round_error", str(err))
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "soundbeats/end_game",
+    vol.Required("entry_id"): str,
+    vol.Optional("op_id"): str,
+})
+@_rate_limited
+@websocket_api.async_response
+async def websocket_end_game(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """End the active game."""
+    entry_id = msg["entry_id"]
+    
+    if entry_id not in hass.data[DOMAIN]:
+        connection.send_error(msg["id"], "invalid_entry", "Invalid entry ID")
+        return
+    
+    game_manager: GameManager = hass.data[DOMAIN][entry_id]["game_manager"]
+    
+    try:
+        await _async_run_once(game_manager, connection, msg, game_manager.end_game)
+        connection.send_result(msg["id"], {"success": True})
+    except Exception as err:
+        _LOGGER.error("Error ending game: %s", err)
+        connection.send_error(msg["id"], "game_error", str(err))
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "soundbeats/get_playlists",
+    vol.Required("entry_id"): str,
+})
+@websocket_api.async_response
+async def websocket_get_playlists(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """List the playlists a new game can be played on."""
+    entry_id = msg["entry_id"]
+    
+    if entry_id not in hass.data[DOMAIN]:
+        connection.send_error(msg["id"], "invalid_entry", "Invalid entry ID")
+        return
+    
+    catalog: SongCatalog = hass.data[DOMAIN][entry_id]["catalog"]
+    await catalog.async_ensure_loaded()
+    connection.send_result(msg["id"], {
+        "playlists": [DEFAULT_PLAYLIST, *catalog.get_playlists()],
+    })
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "soundbeats/search_songs",
+    vol.Required("entry_id"): str,
+    vol.Required("query"): str,
+    vol.Optional("limit", default=20): vol.All(int, vol.Range(min=1, max=100)),
+})
+@websocket_api.async_response
+async def websocket_search_songs(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Search the song catalog by artist and title."""
+    entry_id = msg["entry_id"]
+    
+    if entry_id not in hass.data[DOMAIN]:
+        connection.send_error(msg["id"], "invalid_entry", "Invalid entry ID")
+        return
+    
+    catalog: SongCatalog = hass.data[DOMAIN][entry_id]["catalog"]
+    await catalog.async_ensure_loaded()
+    results = catalog.index.search(msg["query"], msg["limit"])
+    
+    connection.send_result(msg["id"], {
+        "songs": [{**song.to_dict(), "score": score} for song, score in results],
+    })
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "soundbeats/get_song_stats",
+    vol.Required("entry_id"): str,
+    vol.Optional("limit", default=10): vol.All(int, vol.Range(min=1, max=100)),
+})
+@websocket_api.async_response
+async def websocket_get_song_stats(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Report the hardest songs."""
+    entry_id = msg["entry_id"]
+    
+    if entry_id not in hass.data[DOMAIN]:
+        connection.send_error(msg["id"], "invalid_entry", "Invalid entry ID")
+        return
+    
+    song_stats: SongStatsTracker = hass.data[DOMAIN][entry_id]["song_stats"]
+    catalog: SongCatalog = hass.data[DOMAIN][entry_id]["catalog"]
+    await catalog.async_ensure_loaded()
+    hardest = song_stats.hardest(msg["limit"])
+    for entry in hardest:
+        song = catalog.get_song(entry["song_id"])
+        entry["song"] = song.to_dict() if song else None
+    
+    connection.send_result(msg["id"], {"hardest": hardest})
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "soundbeats/get_stats",
+    vol.Required("entry_id"): str,
+})
+@websocket_api.async_response
+async def websocket_get_stats(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Report statistics across all finished games."""
     entry_id = msg["entry_id"]
     
+    if entry_id not in hass.data[DOMAIN]:
+        connection.send_error(msg["id"], "invalid_entry", "Invalid entry ID")
+        return
+    
+    game_manager: GameManager = hass.data[DOMAIN][entry_id]["game_manager"]
+    analytics = await game_manager.async_get_analytics()
+    connection.send_result(msg["id"], analytics.as_dict() if analytics else None)
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "soundbeats/get_leaderboard",
+    vol.Required("entry_id"): str,
+    vol.Optional("limit", default=LEADERBOARD_SIZE): vol.All(int, vol.Range(min=1, max=100)),
+    vol.Optional("offset", default=0): vol.All(int, vol.Range(min=0)),
+    vol.Optional("team_id"): str,
+})
+@callback
+def websocket_get_leaderboard(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Report a page of the ranked teams and the rank of the asking team."""
+    entry_id = msg["entry_id"]
+    
+    if entry_id not in hass.data[DOMAIN]:
+        connection.send_error(msg["id"], "invalid_entry", "Invalid entry ID")
+        return
+    
+    game_manager: GameManager = hass.data[DOMAIN][entry_id]["game_manager"]
+    leaderboard = game_manager.get_leaderboard(msg["limit"], msg.get("team_id"), msg["offset"])
+    if leaderboard is None:
+        connection.send_error(msg["id"], "no_game", "No active game")
+        return
+    
+    connection.send_result(msg["id"], leaderboard)
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "soundbeats/get_rounds",
+    vol.Required("entry_id"): str,
+    vol.Optional("start", default=0): vol.All(int, vol.Range(min=0)),
+    vol.Optional("limit", default=ROUND_BLOCK_SIZE): vol.All(int, vol.Range(min=1, max=200)),
+})
+@callback
+def websocket_get_rounds(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Get played rounds, including those no longer in the game state."""
+    entry_id = msg["entry_id"]
+    
+    if entry_id not in hass.data[DOMAIN]:
+        connection.send_error(msg["id"], "invalid_entry", "Invalid entry ID")
+        return
+    
+    game_manager: GameManager = hass.data[DOMAIN][entry_id]["game_manager"]
+    rounds = game_manager.get_rounds(msg["start"], msg["limit"])
+    if rounds is None:
+        connection.send_error(msg["id"], "no_game", "No active game")
+        return
+    
+    connection.send_result(msg["id"], {"start": msg["start"], "rounds": rounds})
+
+
+@websocket_api.websocket_command({
+    vol.Required("type"): "soundbeats/subscribe_game_state",
+    vol.Required("entry_id"): str,
+})
+@callback
+def websocket_subscribe_game_state(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Subscribe to game state changes."""
+    entry_data = hass.data[DOMAIN].get(msg["entry_id"])
+    if entry_data is None or "subscriptions" not in entry_data:
+        connection.send_error(msg["id"], "not_found", "Unknown entry")
+        return
+    
     @callback
     def forward_game_state(game_state: Dict[str, Any]) -> None:
         """Forward game state to websocket."""
@@ -183,20 +604,17 @@ async def websocket_subscribe_game_state(
             websocket_api.event_message(msg["id"], {"state": game_state})
         )
     
-    # Subscribe to state changes
-    unsub = async_dispatcher_connect(
-        hass,
-        f"{EVENT_GAME_STATE_CHANGED}_{entry_id}",
-        forward_game_state
-    )
-    
-    # Send initial state
-    if entry_id in hass.data[DOMAIN] and "game_manager" in hass.data[DOMAIN][entry_id]:
-        game_manager: GameManager = hass.data[DOMAIN][entry_id]["game_manager"]
-        state = game_manager.get_state()
-        if state:
-            forward_game_state(state)
+    registry: SubscriptionRegistry = entry_data["subscriptions"]
+    unsub = registry.async_add(connection, msg["id"], forward_game_state)
+    if unsub is None:
+        connection.send_error(msg["id"], "too_many_subscriptions", "Too many subscriptions")
+        return
     
     # Handle unsubscribe
     connection.subscriptions[msg["id"]] = unsub
-    connection.send_result(msg["id"])
\ No newline at end of file
+    connection.send_result(msg["id"])
+    
+    # Send initial state
+    game_manager: GameManager = entry_data["game_manager"]
+    if state := game_manager.get_broadcast_state():
+        forward_game_state(state)
@@ -0,0 +1,68 @@
+"""Test the Soundbeats cross-game analytics."""
+from custom_components.soundbeats.analytics import GameAnalytics
+
+
+def _game(scores: dict[str, int], rounds: list[tuple[int, list[int]]]) -> dict:
+    """Return an archived game dict."""
+    return {
+        "teams": [
+            {"id": name, "name": name, "score": score} for name, score in scores.items()
+        ],
+        "rounds_played": [
+            {
+                "round_number": number + 1,
+                "actual_year": year,
+                "team_guesses": {f"team{i}": guess for i, guess in enumerate(guesses)},
+                "team_scores": {f"team{i}": 5 for i, _ in enumerate(guesses)},
+            }
+            for number, (year, guesses) in enumerate(rounds)
+        ],
+    }
+
+
+GAMES = [
+    _game({"Red": 20, "Blue": 10}, [(1984, [1984, 1990]), (1999, [1995, 2001])]),
+    _game({"Red": 5, "Blue": 15}, [(1975, [1975, 1970])]),
+    _game({"Red": 0, "Blue": 0}, []),
+]
+
+
+def test_incremental_matches_rebuild() -> None:
+    """Test folding games one by one gives the same views as a rebuild."""
+    incremental = GameAnalytics()
+    for game in GAMES:
+        incremental.add_game(game)
+
+    rebuilt = GameAnalytics()
+    rebuilt.rebuild(GAMES)
+
+    assert incremental.as_dict() == rebuilt.as_dict()
+
+
+def test_views() -> None:
+    """Test the aggregated values."""
+    analytics = GameAnalytics()
+    analytics.rebuild(GAMES)
+    stats = analytics.as_dict()
+
+    assert stats["games"] == 3
+    assert stats["rounds"] == 3
+    assert stats["guesses"] == 6
+    assert stats["points_per_round"] == 10.0
+    assert stats["teams"] == [
+        {"name": "Red", "games": 3, "wins": 1, "win_rate": 0.333},
+        {"name": "Blue", "games": 3, "wins": 1, "win_rate": 0.333},
+    ]
+    assert stats["decades"] == [
+        {"decade": 1970, "guesses": 2, "mean_error": 2.5, "exact_rate": 0.5},
+        {"decade": 1980, "guesses": 2, "mean_error": 3.0, "exact_rate": 0.5},
+        {"decade": 1990, "guesses": 2, "mean_error": 3.0, "exact_rate": 0.0},
+    ]
+
+
+def test_empty() -> None:
+    """Test views without any games."""
+    stats = GameAnalytics().as_dict()
+    assert stats["games"] == 0
+    assert stats["teams"] == []
+    assert stats["decades"] == []
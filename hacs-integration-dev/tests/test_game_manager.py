@@ -1,18 +1,22 @@
 """Test the game manager functionality."""
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 import asyncio
+from dataclasses import replace
 from datetime import datetime
 
-# Mock Home Assistant imports
-import sys
-sys.modules['homeassistant'] = Mock()
-sys.modules['homeassistant.core'] = Mock()
-sys.modules['homeassistant.helpers'] = Mock()
-sys.modules['homeassistant.helpers.dispatcher'] = Mock()
-
+from custom_components.soundbeats.const import HOT_ROUNDS, ROUND_BLOCK_SIZE
 from custom_components.soundbeats.game_manager import GameManager
-from custom_components.soundbeats.models import GameState, Team
+from custom_components.soundbeats.models import GameRound, GameState, Team
+from custom_components.soundbeats.serialization import decode_game
+
+
+async def _publish_actual_year(game_manager, year):
+    """Publish a copy of the snapshot whose active round has the song's year."""
+    state = game_manager.snapshot
+    await game_manager._async_publish(
+        replace(state, active_round=replace(state.active_round, actual_year=year))
+    )
 
 
 class TestGameManager:
@@ -92,6 +96,57 @@ class TestGameManager:
         state = game_manager.get_state()
         assert len(state["teams"]) == 5
     
+    @pytest.mark.asyncio
+    async def test_large_teams(self, game_manager):
+        """Test large-team mode lifts the team limit."""
+        with pytest.raises(ValueError):
+            await game_manager.new_game(50)
+        
+        await game_manager.new_game(50, large_teams=True)
+        assert await game_manager.add_team() is not None
+        assert len(game_manager.get_state()["teams"]) == 51
+        assert game_manager.get_state()["large_teams"] is True
+    
+    @pytest.mark.asyncio
+    async def test_leaderboard(self, game_manager):
+        """Test leaderboards return the top teams and one team's rank."""
+        assert game_manager.get_leaderboard() is None
+        
+        game_state = await game_manager.new_game(40, large_teams=True)
+        await game_manager.start_round()
+        await _publish_actual_year(game_manager, 1985)
+        for i, team in enumerate(game_state.teams):
+            await game_manager.submit_guess(team.id, 1985 + i // 2)
+        await game_manager.end_round()
+        
+        last = game_state.teams[-1].id
+        leaderboard = game_manager.get_leaderboard(3, last)
+        assert leaderboard["team_count"] == 40
+        assert [(row["rank"], row["score"]) for row in leaderboard["top"]] == [
+            (1, 10), (1, 10), (3, 5)
+        ]
+        assert leaderboard["team"]["id"] == last
+        assert leaderboard["team"]["rank"] == 13
+        assert game_manager.get_leaderboard(3, "unknown")["team"] is None
+        
+        page = game_manager.get_leaderboard(3, offset=7)["top"]
+        assert [(row["rank"], row["score"]) for row in page] == [(3, 5), (9, 2), (9, 2)]
+        
+        # Subscribers get the leaderboard's teams instead of all 40
+        broadcast = game_manager.get_broadcast_state()
+        assert broadcast["team_count"] == 40
+        assert [team["score"] for team in broadcast["teams"]] == [10, 10] + [5] * 6 + [2] * 2
+        assert broadcast["rounds_played"] == []
+        assert broadcast["round_count"] == 1
+        assert game_manager.get_broadcast_state() is broadcast
+        assert len(game_manager.get_state()["teams"]) == 40
+    
+    @pytest.mark.asyncio
+    async def test_broadcast_state_small_game(self, game_manager):
+        """Test games without large-team mode broadcast their full state."""
+        await game_manager.new_game(3)
+        assert game_manager.get_broadcast_state() is game_manager.get_state()
+    
     @pytest.mark.asyncio
     async def test_remove_team(self, game_manager):
         """Test removing a team."""
@@ -123,6 +178,236 @@ class TestGameManager:
         state = game_manager.get_state()
         assert len(state["teams"]) == 1
     
+    @pytest.mark.asyncio
+    async def test_round_lifecycle(self, game_manager):
+        """Test starting and ending rounds."""
+        await game_manager.new_game(2)
+        
+        game_round = await game_manager.start_round()
+        assert game_round.round_number == 1
+        state = game_manager.get_state()
+        assert state["current_round"] == 1
+        assert state["active_round"]["round_number"] == 1
+        
+        with pytest.raises(ValueError):
+            await game_manager.start_round()
+        
+        await game_manager.end_round()
+        state = game_manager.get_state()
+        assert state["active_round"] is None
+        assert len(state["rounds_played"]) == 1
+        
+        with pytest.raises(ValueError):
+            await game_manager.end_round()
+    
+    @pytest.mark.asyncio
+    async def test_submit_guess(self, game_manager):
+        """Test guesses are recorded on the round and the team."""
+        game_state = await game_manager.new_game(2)
+        team_id = game_state.teams[0].id
+        
+        with pytest.raises(ValueError):
+            await game_manager.submit_guess(team_id, 1985)
+        
+        await game_manager.start_round()
+        await game_manager.submit_guess(team_id, 1985, bet=True)
+        state = game_manager.get_state()
+        assert state["active_round"]["team_guesses"] == {team_id: 1985}
+        assert state["active_round"]["team_bets"] == {team_id: True}
+        assert state["teams"][0]["current_guess"] == 1985
+        
+        with pytest.raises(ValueError):
+            await game_manager.submit_guess("unknown", 1985)
+        
+        await game_manager.end_round()
+        await game_manager.start_round()
+        assert game_manager.get_state()["teams"][0]["current_guess"] is None
+    
+    @pytest.mark.asyncio
+    async def test_round_scoring(self, game_manager):
+        """Test guesses are scored when the round ends."""
+        game_state = await game_manager.new_game(2)
+        red, blue = (team.id for team in game_state.teams)
+        
+        await game_manager.start_round()
+        await _publish_actual_year(game_manager, 1985)
+        await game_manager.submit_guess(red, 1985, bet=True)
+        await game_manager.submit_guess(blue, 1988)
+        await game_manager.end_round()
+        
+        state = game_manager.get_state()
+        assert state["rounds_played"][0]["team_scores"] == {red: 20, blue: 5}
+        assert [team["score"] for team in state["teams"]] == [20, 5]
+        assert [team["streak"] for team in state["teams"]] == [1, 1]
+    
+    @pytest.mark.asyncio
+    async def test_reveal_precomputed(self, game_manager):
+        """Test the reveal is prepared on lock and rebuilt after corrections."""
+        game_state = await game_manager.new_game(3)
+        red, blue, green = (team.id for team in game_state.teams)
+        await game_manager.start_round()
+        await _publish_actual_year(game_manager, 1985)
+        
+        await game_manager.submit_guess(red, 1990)
+        await game_manager.submit_guess(blue, 1985)
+        await game_manager.lock_guesses()
+        assert game_manager.get_state()["active_round"]["guesses_locked"] is True
+        prepared = game_manager._reveal[1]
+        
+        # A late correction invalidates the prepared reveal and builds a new one
+        await game_manager.submit_guess(red, 1984)
+        assert game_manager._reveal[1] is not prepared
+        prepared = game_manager._reveal[1]
+        
+        await game_manager.end_round()
+        assert game_manager.snapshot is prepared
+        reveal = game_manager.get_state()["reveal"]
+        assert reveal["round_number"] == 1
+        assert reveal["rank_changes"] == {red: -1, blue: 0, green: -2}
+        assert game_manager.get_state()["teams"][0]["score"] == 5
+        
+        await game_manager.start_round()
+        assert game_manager.get_state()["reveal"] is None
+    
+    @pytest.mark.asyncio
+    async def test_snapshots(self, game_manager):
+        """Test mutations publish new snapshots and leave old ones intact."""
+        await game_manager.new_game(2)
+        await game_manager.start_round()
+        before = game_manager.snapshot
+        version = game_manager.version
+        red, blue = (team.id for team in before.teams)
+        
+        await asyncio.gather(
+            game_manager.submit_guess(red, 1985),
+            game_manager.submit_guess(blue, 1990),
+        )
+        after = game_manager.snapshot
+        assert game_manager.version == version + 2
+        assert before.active_round.team_guesses == {}
+        assert before.teams[0].current_guess is None
+        assert after.active_round.team_guesses == {red: 1985, blue: 1990}
+        assert game_manager.get_state() is game_manager.get_state()
+        
+        # Untouched teams are shared between snapshots
+        await game_manager.update_team_name(red, "Red")
+        assert game_manager.snapshot.teams[1] is after.teams[1]
+        assert after.teams[0].name == "Team 1"
+    
+    @pytest.mark.asyncio
+    async def test_start_round_rebuilds_on_newer_snapshot(self, game_manager):
+        """Test changes published while a round starts are kept."""
+        await game_manager.new_game(2)
+        
+        async def take_prepared(state):
+            await game_manager.update_team_name(state.teams[0].id, "Renamed")
+            return None
+        
+        game_manager.media_controller = Mock()
+        game_manager.media_controller.async_take_prepared = take_prepared
+        await game_manager.start_round()
+        
+        state = game_manager.get_state()
+        assert state["teams"][0]["name"] == "Renamed"
+        assert state["active_round"]["round_number"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_start_round_lost_race_keeps_prepared_song(self, game_manager):
+        """Test a start that loses to a concurrent one hands its song back."""
+        game = await game_manager.new_game(2)
+        prepared = Mock(game_id=game.game_id)
+        
+        async def take_prepared(state):
+            # Another start publishes the round while this one prepares
+            await game_manager._async_publish(
+                replace(state, active_round=GameRound(round_number=1))
+            )
+            return prepared
+        
+        game_manager.media_controller = Mock()
+        game_manager.media_controller.async_take_prepared = take_prepared
+        with pytest.raises(ValueError):
+            await game_manager.start_round()
+        
+        game_manager.media_controller.async_return_prepared.assert_called_once_with(prepared)
+        game_manager.media_controller.async_start_playback.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_run_once(self, game_manager):
+        """Test retried operation ids are applied once."""
+        await game_manager.new_game(1)
+        
+        first = await game_manager.async_run_once("op-1", game_manager.add_team)
+        retry = await game_manager.async_run_once("op-1", game_manager.add_team)
+        assert retry is first
+        assert len(game_manager.get_state()["teams"]) == 2
+        
+        await game_manager.async_run_once("op-2", game_manager.add_team)
+        assert len(game_manager.get_state()["teams"]) == 3
+        
+        # Failed operations are not remembered
+        with pytest.raises(ValueError):
+            await game_manager.async_run_once(
+                "op-3", lambda: game_manager.submit_guess("unknown", 1985)
+            )
+        assert "op-3" not in game_manager._operations
+    
+    @pytest.mark.asyncio
+    async def test_end_game(self, game_manager):
+        """Test ending a game archives it when the next one starts."""
+        first_game = await game_manager.new_game(2)
+        
+        await game_manager.end_game()
+        assert game_manager.get_state()["is_active"] is False
+        assert game_manager.get_history() == []
+        
+        await game_manager.new_game(2)
+        history = game_manager.get_history()
+        assert len(history) == 1
+        assert history[0]["game_id"] == first_game.game_id
+        assert history[0]["is_active"] is False
+    
+    @pytest.mark.asyncio
+    async def test_analytics_built_on_first_use(self, hass):
+        """Test analytics are built from the history only when first requested."""
+        loop = asyncio.get_running_loop()
+        hass.async_create_task = lambda coro, name: loop.create_task(coro)
+        hass.async_add_executor_job = lambda func, *args: loop.run_in_executor(None, func, *args)
+        hass.data["soundbeats"]["test_entry"]["game_history"] = [{"game_id": "old"}]
+        analytics = Mock()
+        game_manager = GameManager(hass, "test_entry", analytics=analytics)
+        await game_manager.initialize()
+
+        await game_manager.new_game(1)
+        await game_manager.end_game()
+        await game_manager.new_game(1)
+        analytics.rebuild.assert_not_called()
+        analytics.add_game.assert_not_called()
+
+        assert await game_manager.async_get_analytics() is analytics
+        analytics.rebuild.assert_called_once()
+        assert len(analytics.rebuild.call_args[0][0]) == 2
+
+        await game_manager.end_game()
+        await game_manager.new_game(1)
+        analytics.add_game.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_analytics_retried_after_failure(self, hass):
+        """Test a failed analytics build is retried by the next request."""
+        loop = asyncio.get_running_loop()
+        hass.async_create_task = lambda coro, name: loop.create_task(coro)
+        hass.async_add_executor_job = lambda func, *args: loop.run_in_executor(None, func, *args)
+        analytics = Mock()
+        analytics.rebuild.side_effect = [OSError("disk"), None]
+        game_manager = GameManager(hass, "test_entry", analytics=analytics)
+        await game_manager.initialize()
+
+        with pytest.raises(OSError):
+            await game_manager.async_get_analytics()
+        assert await game_manager.async_get_analytics() is analytics
+        assert analytics.rebuild.call_count == 2
+
     @pytest.mark.asyncio
     async def test_state_persistence(self, game_manager):
         """Test game state persistence."""
@@ -144,6 +429,62 @@ class TestGameManager:
         assert restored_state["game_id"] == game_id
         assert restored_state["teams"][0]["name"] == "Team A"
         assert restored_state["teams"][1]["name"] == "Team B"
+    
+    @pytest.mark.asyncio
+    async def test_round_tiering(self, game_manager):
+        """Test old rounds are compressed and still served on request."""
+        await game_manager.new_game(2)
+        for _ in range(HOT_ROUNDS + ROUND_BLOCK_SIZE):
+            await game_manager.start_round()
+            await game_manager.end_round()
+        
+        state = game_manager.get_state()
+        assert len(state["rounds_played"]) == HOT_ROUNDS
+        assert state["round_count"] == HOT_ROUNDS + ROUND_BLOCK_SIZE
+        assert state["round_totals"]["rounds"] == HOT_ROUNDS + ROUND_BLOCK_SIZE
+        
+        rounds = game_manager.get_rounds(ROUND_BLOCK_SIZE - 5, 10)
+        assert [r["round_number"] for r in rounds] == list(range(ROUND_BLOCK_SIZE - 4, ROUND_BLOCK_SIZE + 6))
+        
+        snapshot = game_manager.snapshot
+        assert decode_game(game_manager.get_stored_state()) == snapshot
+        
+        # Re-initializing from hass.data keeps the archived rounds
+        restored = GameManager(game_manager.hass, "test_entry")
+        await restored.initialize()
+        assert restored.snapshot == snapshot
+        assert len(restored.get_rounds(0, 100)) == HOT_ROUNDS + ROUND_BLOCK_SIZE
+        
+        await game_manager.end_game()
+        await game_manager.new_game(2)
+        archived = game_manager.get_history()[-1]
+        assert len(archived["rounds_played"]) == HOT_ROUNDS + ROUND_BLOCK_SIZE
+    
+    @pytest.mark.asyncio
+    async def test_has_team(self, game_manager):
+        """Test team ids are checked against the current snapshot."""
+        assert not game_manager.has_team("anything")
+        game_state = await game_manager.new_game(2)
+        team_id = game_state.teams[1].id
+        assert game_manager.has_team(team_id)
+        
+        await game_manager.remove_team(team_id)
+        assert not game_manager.has_team(team_id)
+    
+    @pytest.mark.asyncio
+    async def test_new_game_playlist(self, hass):
+        """Test a game is played on a playlist of the catalog."""
+        media_controller = Mock()
+        media_controller.catalog.async_ensure_loaded = AsyncMock()
+        media_controller.catalog.get_playlists.return_value = ["80s"]
+        game_manager = GameManager(hass, "test_entry", media_controller)
+        
+        game_state = await game_manager.new_game(2, playlist_id="80s")
+        assert game_state.playlist_id == "80s"
+        assert (await game_manager.new_game(2)).playlist_id == "default"
+        
+        with pytest.raises(ValueError):
+            await game_manager.new_game(2, playlist_id="90s")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,89 @@
+"""Test the Soundbeats export helpers."""
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.soundbeats.http_api import (
+    EXPORT_CHUNK_SIZE,
+    _async_stream,
+    _csv_lines,
+    _filter_games,
+    _ndjson_lines,
+)
+
+GAMES = [
+    {
+        "game_id": "g1",
+        "created_at": "2026-01-02T20:00:00",
+        "teams": [{"id": "a", "name": "Red, Team"}, {"id": "b", "name": "Blue"}],
+        "rounds_played": [
+            {
+                "round_number": 1,
+                "song_id": 5,
+                "actual_year": 1980,
+                "team_guesses": {"a": 1981},
+                "team_bets": {"a": True},
+                "team_scores": {"a": 5},
+            }
+        ],
+    },
+    {"game_id": "g2", "created_at": "2026-03-01T20:00:00", "teams": [], "rounds_played": []},
+]
+
+
+def test_filter_games() -> None:
+    """Test date and game filters."""
+    def ids(*args):
+        return [game["game_id"] for game in _filter_games(GAMES, *args)]
+
+    assert ids(None, None, set()) == ["g1", "g2"]
+    assert ids("2026-01-03", None, set()) == ["g2"]
+    assert ids(None, "2026-01-02", set()) == ["g1"]
+    assert ids(None, None, {"g2"}) == ["g2"]
+
+
+def test_ndjson_lines() -> None:
+    """Test one JSON document per line."""
+    lines = list(_ndjson_lines(GAMES))
+    assert len(lines) == 2
+    assert json.loads(lines[1])["game_id"] == "g2"
+
+
+def test_csv_lines() -> None:
+    """Test one row per team per round."""
+    rows = "".join(_csv_lines(GAMES)).splitlines()
+    assert rows[0].startswith("game_id,created_at,round_number")
+    assert rows[1] == 'g1,2026-01-02T20:00:00,1,5,1980,a,"Red, Team",1981,True,5'
+    assert rows[2] == "g1,2026-01-02T20:00:00,1,5,1980,b,Blue,,False,0"
+    assert len(rows) == 3
+
+
+async def test_stream_stops_on_disconnect() -> None:
+    """Test a client disconnect ends the export without an error."""
+    response = MagicMock()
+    response.write = AsyncMock(side_effect=[None, ConnectionResetError()])
+    response.write_eof = AsyncMock()
+    produced = []
+
+    def _lines():
+        for n in range(100):
+            produced.append(n)
+            yield "x" * EXPORT_CHUNK_SIZE
+
+    await _async_stream(response, _lines())
+    assert response.write.await_count == 2
+    assert len(produced) == 2
+    response.write_eof.assert_not_awaited()
+
+
+async def test_stream_cancelled() -> None:
+    """Test a cancelled export stops writing and stays cancelled."""
+    response = MagicMock()
+    response.write = AsyncMock(side_effect=asyncio.CancelledError())
+    response.write_eof = AsyncMock()
+
+    with pytest.raises(asyncio.CancelledError):
+        await _async_stream(response, iter(["x" * EXPORT_CHUNK_SIZE] * 3))
+    response.write.assert_awaited_once()
@@ -0,0 +1,84 @@
+"""Test the Soundbeats image pipeline."""
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from PIL import Image
+
+from custom_components.soundbeats.images import ImagePipeline
+
+
+def _pipeline(tmp_path, max_bytes=10**9) -> ImagePipeline:
+    """Return a pipeline over tmp_path/images."""
+    source = tmp_path / "images"
+    (source / "playlist-images").mkdir(parents=True)
+    Image.new("RGB", (2000, 1000), "red").save(source / "playlist-images" / "80s.jpg")
+    Image.new("RGBA", (600, 600), (0, 0, 255, 128)).save(source / "logo.png")
+    return ImagePipeline(None, source, tmp_path / "cache", max_bytes)
+
+
+def test_variants(tmp_path) -> None:
+    """Test variants are resized, cached and reused."""
+    pipeline = _pipeline(tmp_path)
+
+    path, digest = pipeline._get_variant("playlist-images/80s.jpg", "thumb")
+    assert path.name == f"{digest}-thumb.webp"
+    with Image.open(path) as image:
+        assert image.size == (160, 80)
+
+    mtime = path.stat().st_mtime_ns
+    assert pipeline._get_variant("playlist-images/80s.jpg", "thumb") == (path, digest)
+    assert path.stat().st_mtime_ns >= mtime
+
+    path, _ = pipeline._get_variant("logo.png", "card")
+    with Image.open(path) as image:
+        assert image.size == (480, 480)
+        assert image.mode == "RGBA"
+    assert pipeline.stats["files"] == 2
+
+
+def test_rejects_outside_paths(tmp_path) -> None:
+    """Test only images below the source directory are served."""
+    pipeline = _pipeline(tmp_path)
+    (tmp_path / "secret.jpg").write_bytes(b"x")
+    assert pipeline._get_variant("../secret.jpg", "thumb") is None
+    assert pipeline._get_variant("missing.jpg", "thumb") is None
+    assert pipeline._get_variant("notes.txt", "thumb") is None
+
+
+def test_evicts_least_recently_served(tmp_path) -> None:
+    """Test the cache is trimmed to its size limit."""
+    pipeline = _pipeline(tmp_path, max_bytes=1)
+    first, _ = pipeline._get_variant("logo.png", "thumb")
+    second, _ = pipeline._get_variant("logo.png", "card")
+    assert not first.exists()
+    assert second.exists()
+    assert pipeline.stats["files"] == 1
+
+
+def test_concurrent_renders(tmp_path) -> None:
+    """Test renders on several threads only ever expose complete files."""
+    pipeline = _pipeline(tmp_path)
+    for n in range(4):
+        # Same content under other names renders to the same variant file
+        (tmp_path / "images" / f"copy{n}.png").write_bytes(
+            (tmp_path / "images" / "logo.png").read_bytes()
+        )
+    names = [f"copy{n}.png" for n in range(4)] * 4
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(lambda name: pipeline._get_variant(name, "card"), names))
+
+    assert len(set(results)) == 1
+    with Image.open(results[0][0]) as image:
+        assert image.size == (480, 480)
+    assert not list((tmp_path / "cache").glob("*.partial"))
+
+
+def test_undecodable_images_are_skipped(tmp_path) -> None:
+    """Test decoder failures that are not OSErrors do not escape."""
+    pipeline = _pipeline(tmp_path)
+    with patch.object(Image, "MAX_IMAGE_PIXELS", 1000):
+        assert pipeline._get_variant("logo.png", "thumb") is None
+    with patch.object(pipeline, "_render", side_effect=SyntaxError("bad header")):
+        assert pipeline._get_variant("logo.png", "card") is None
+    assert pipeline.stats["files"] == 0
@@ -1,4 +1,6 @@
 """Test the Soundbeats init."""
+import asyncio
+
 import pytest
 from unittest.mock import patch, MagicMock
 from homeassistant.core import HomeAssistant
@@ -14,16 +16,16 @@ def mock_entry():
     entry = MagicMock(spec=ConfigEntry)
     entry.entry_id = "test_entry"
     entry.data = {}
+    entry.options = {}
     return entry
 
 
 async def test_setup_entry(hass: HomeAssistant, mock_entry):
     """Test setup entry."""
-    with patch('custom_components.soundbeats.async_register_built_in_panel') as mock_panel, \
+    with patch('custom_components.soundbeats.panel.async_register_built_in_panel') as mock_panel, \
          patch('homeassistant.components.websocket_api.async_register_command'), \
-         patch('homeassistant.core.HomeAssistant.http') as mock_http:
-        
-        mock_http.async_register_static_path = MagicMock()
+         patch('homeassistant.core.HomeAssistant.http') as mock_http, \
+         patch.object(hass.config_entries, 'async_forward_entry_setups') as mock_forward:
         
         result = await async_setup_entry(hass, mock_entry)
         
@@ -31,7 +33,13 @@ async def test_setup_entry(hass: HomeAssistant, mock_entry):
         assert DOMAIN in hass.data
         assert mock_entry.entry_id in hass.data[DOMAIN]
         mock_panel.assert_called_once()
-        mock_http.async_register_static_path.assert_called_once()
+        mock_http.register_view.assert_called()
+        mock_forward.assert_awaited_once()
+    
+    # The mocked entry never unloads; stop the catalog watcher and friends
+    for call in mock_entry.async_on_unload.call_args_list:
+        if asyncio.iscoroutine(pending := call.args[0]()):
+            await pending
 
 
 async def test_unload_entry(hass: HomeAssistant, mock_entry):
@@ -47,7 +55,7 @@ async def test_unload_entry(hass: HomeAssistant, mock_entry):
 
 async def test_setup_entry_failure(hass: HomeAssistant, mock_entry):
     """Test setup entry handles failure gracefully."""
-    with patch('custom_components.soundbeats.async_register_built_in_panel', side_effect=Exception("Test error")):
+    with patch('custom_components.soundbeats.panel.async_register_built_in_panel', side_effect=Exception("Test error")):
         # Should not raise exception, but may return False
         try:
             result = await async_setup_entry(hass, mock_entry)
@@ -0,0 +1,123 @@
+"""Test the Soundbeats music library indexer."""
+import copy
+import struct
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.soundbeats.library import LIBRARY_SONG_ID_BASE, MusicLibraryIndexer
+
+MODULE = "custom_components.soundbeats.library"
+
+
+class FakeStore:
+    """In-memory stand-in for the library cache store."""
+
+    data = None
+
+    def __init__(self, *args) -> None:
+        """Initialize the store."""
+        self.saves = []
+
+    async def async_load(self):
+        """Return the saved cache."""
+        return copy.deepcopy(FakeStore.data)
+
+    async def async_save(self, data) -> None:
+        """Remember the cache."""
+        FakeStore.data = copy.deepcopy(data)
+        self.saves.append(FakeStore.data)
+
+
+def _read_tags(path, easy=True):
+    """Return tags made up from the file name, like ``Artist - Title (1985).mp3``."""
+    artist, rest = path.stem.split(" - ")
+    title, year = rest.rstrip(")").split(" (")
+    return SimpleNamespace(tags={"title": [title], "artist": [artist], "date": [year]})
+
+
+def _indexer(hass: HomeAssistant, folder) -> MusicLibraryIndexer:
+    """Return an indexer feeding a mock catalog."""
+    hass.config.media_dirs = {}
+    catalog = MagicMock()
+    catalog.get_song.return_value = None
+    FakeStore.data = None
+    with patch(f"{MODULE}.Store", FakeStore):
+        return MusicLibraryIndexer(hass, "test_entry", str(folder), catalog)
+
+
+async def test_scan_uses_cache(hass: HomeAssistant, tmp_path) -> None:
+    """Test tags are read once and unchanged files come from the cache."""
+    (tmp_path / "80s").mkdir()
+    (tmp_path / "80s" / "A-ha - Take On Me (1985).mp3").write_bytes(b"x")
+    (tmp_path / "Blur - Song 2 (1997).flac").write_bytes(b"x")
+    (tmp_path / "notes.txt").write_bytes(b"x")
+    indexer = _indexer(hass, tmp_path)
+
+    with patch(f"{MODULE}.mutagen.File", side_effect=_read_tags) as read_tags:
+        assert await indexer.async_scan() == {"files": 2, "read": 2, "cached": 0, "removed": 0}
+        songs = {
+            song.title: song
+            for call in indexer.catalog.add_songs.call_args_list
+            for song in call.args[0]
+        }
+        assert songs["Take On Me"].year == 1985
+        assert songs["Song 2"].artist == "Blur"
+        assert {song.id for song in songs.values()} == {
+            LIBRARY_SONG_ID_BASE,
+            LIBRARY_SONG_ID_BASE + 1,
+        }
+
+        (tmp_path / "Blur - Song 2 (1997).flac").unlink()
+        counters = await indexer.async_scan()
+    assert counters == {"files": 1, "read": 0, "cached": 1, "removed": 1}
+    assert read_tags.call_count == 2
+
+
+async def test_unreadable_file_is_skipped(hass: HomeAssistant, tmp_path) -> None:
+    """Test a file that cannot be stat'ed does not abort the scan."""
+    (tmp_path / "A-ha - Take On Me (1985).mp3").write_bytes(b"x")
+    (tmp_path / "Gone - Missing (1990).mp3").symlink_to(tmp_path / "nowhere.mp3")
+    indexer = _indexer(hass, tmp_path)
+
+    with patch(f"{MODULE}.mutagen.File", side_effect=_read_tags):
+        counters = await indexer.async_scan()
+    assert counters["files"] == 1
+
+
+async def test_corrupt_file_does_not_abort_batch(hass: HomeAssistant, tmp_path) -> None:
+    """Test a parser failure in one file does not abort its batch."""
+    (tmp_path / "A-ha - Take On Me (1985).mp3").write_bytes(b"x")
+    (tmp_path / "Broken.mp3").write_bytes(b"x")
+    indexer = _indexer(hass, tmp_path)
+
+    def read_tags(path, easy=True):
+        if path.stem == "Broken":
+            raise struct.error("unpack requires a buffer of 4 bytes")
+        return _read_tags(path)
+
+    with patch(f"{MODULE}.mutagen.File", side_effect=read_tags):
+        assert (await indexer.async_scan())["read"] == 2
+    titles = {
+        song.title for call in indexer.catalog.add_songs.call_args_list for song in call.args[0]
+    }
+    # Without a year the broken file is cached but not offered as a song
+    assert titles == {"Take On Me"}
+
+
+async def test_cache_saved_during_scan(hass: HomeAssistant, tmp_path) -> None:
+    """Test progress is saved between batches of a long scan."""
+    for year in range(1980, 1990):
+        (tmp_path / f"Artist - Song ({year}).mp3").write_bytes(b"x")
+    indexer = _indexer(hass, tmp_path)
+
+    with patch(f"{MODULE}.mutagen.File", side_effect=_read_tags), patch(
+        f"{MODULE}.LIBRARY_BATCH_SIZE", 2
+    ), patch(f"{MODULE}.LIBRARY_PARALLEL_BATCHES", 1), patch(
+        f"{MODULE}.LIBRARY_SAVE_INTERVAL", 0
+    ):
+        await indexer.async_scan()
+    saves = indexer._store.saves
+    assert [len(save["files"]) for save in saves] == [2, 4, 6, 8, 10, 10]
+    assert saves[0]["next_id"] == LIBRARY_SONG_ID_BASE + 10
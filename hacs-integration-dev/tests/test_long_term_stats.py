@@ -0,0 +1,97 @@
+"""Test the Soundbeats long-term statistics."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from custom_components.soundbeats.long_term_stats import GameStatisticsExporter
+
+NOW = datetime(2026, 5, 1, 20, 30, tzinfo=timezone.utc)
+HOUR = NOW.replace(minute=0)
+MODULE = "custom_components.soundbeats.long_term_stats"
+
+
+def _game(game_id: str, scores: list[int]) -> dict:
+    """Return a finished game state."""
+    return {
+        "game_id": game_id,
+        "is_active": False,
+        "teams": [{"score": score} for score in scores],
+        "round_totals": {"rounds": 10, "points": 100, "guesses": 20, "error_sum": 40},
+    }
+
+
+async def _run(hass, last_rows: dict, games: list[dict]) -> tuple[MagicMock, MagicMock]:
+    """Start an exporter on the given recorder rows and finish games."""
+    recorder = MagicMock()
+    recorder.async_add_executor_job.side_effect = hass.async_add_executor_job
+    with patch(f"{MODULE}.get_instance", return_value=recorder), patch(
+        f"{MODULE}.get_last_statistics",
+        side_effect=lambda hass, n, statistic_id, convert, types: {
+            key: rows for key, rows in last_rows.items() if key == statistic_id
+        },
+    ), patch(f"{MODULE}.async_add_external_statistics") as add_statistics, patch(
+        f"{MODULE}.async_call_later"
+    ) as call_later, patch(f"{MODULE}.async_dispatcher_connect"), patch(
+        f"{MODULE}.dt_util.utcnow", return_value=NOW
+    ):
+        exporter = GameStatisticsExporter(hass, "01ABC")
+        stop = exporter.async_start(None)
+        for game in games:
+            exporter._async_handle_game_state(game)
+        await asyncio.gather(*[
+            task for task in asyncio.all_tasks() if task is not asyncio.current_task()
+        ])
+        add_statistics.assert_not_called()
+        stop()
+    return add_statistics, call_later
+
+
+def _imports(add_statistics: MagicMock) -> dict[str, list]:
+    """Return the imported rows by statistic id."""
+    return {
+        call.args[1]["statistic_id"]: call.args[2] for call in add_statistics.call_args_list
+    }
+
+
+async def test_games_are_batched(hass) -> None:
+    """Test games finishing together are all counted in one import per statistic."""
+    add_statistics, call_later = await _run(
+        hass, {}, [_game("a", [10, 4]), _game("b", [6, 8]), _game("b", [6, 8])]
+    )
+    call_later.assert_called_once()
+    imports = _imports(add_statistics)
+    assert len(imports) == add_statistics.call_count
+
+    assert imports["soundbeats:01abc_games_played"] == [
+        {"start": HOUR, "state": 2, "sum": 2.0}
+    ]
+    [winning] = imports["soundbeats:01abc_winning_score"]
+    assert (winning["mean"], winning["min"], winning["max"], winning["state"]) == (9, 8, 10, 2)
+    assert imports["soundbeats:01abc_average_error"][0]["mean"] == 2
+    assert "soundbeats:01abc_team_3_final_score" not in imports
+
+
+async def test_restart_resumes_hour(hass) -> None:
+    """Test a restart merges into the imported hour and continues the total."""
+    last_rows = {
+        "soundbeats:01abc_games_played": [
+            {"start": HOUR.timestamp(), "state": 3, "sum": 41.0}
+        ],
+        "soundbeats:01abc_winning_score": [
+            {"start": HOUR.timestamp(), "state": 3, "mean": 6.0, "min": 2.0, "max": 9.0}
+        ],
+        "soundbeats:01abc_team_1_final_score": [
+            {"start": (HOUR - timedelta(hours=1)).timestamp(), "state": 1, "mean": 50.0}
+        ],
+    }
+    add_statistics, _ = await _run(hass, last_rows, [_game("a", [12, 0])])
+    imports = _imports(add_statistics)
+
+    assert imports["soundbeats:01abc_games_played"] == [
+        {"start": HOUR, "state": 4, "sum": 42.0}
+    ]
+    [winning] = imports["soundbeats:01abc_winning_score"]
+    assert (winning["mean"], winning["min"], winning["max"], winning["state"]) == (7.5, 2.0, 12, 4)
+    # Last imported in an earlier hour, so the current hour starts fresh
+    [team] = imports["soundbeats:01abc_team_1_final_score"]
+    assert (team["mean"], team["state"]) == (12, 1)
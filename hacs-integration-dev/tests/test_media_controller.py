@@ -0,0 +1,222 @@
+"""Test the Soundbeats media controller timing."""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.components.media_player import MediaPlayerState
+from homeassistant.components.media_player.const import (
+    ATTR_MEDIA_CONTENT_ID,
+    ATTR_MEDIA_CONTENT_TYPE,
+    ATTR_MEDIA_VOLUME_LEVEL,
+    ATTR_MEDIA_VOLUME_MUTED,
+    SERVICE_PLAY_MEDIA,
+)
+from homeassistant.const import (
+    ATTR_SUPPORTED_FEATURES,
+    SERVICE_MEDIA_PAUSE,
+    SERVICE_MEDIA_PLAY,
+    SERVICE_MEDIA_STOP,
+    SERVICE_VOLUME_MUTE,
+    SERVICE_VOLUME_SET,
+)
+
+from custom_components.soundbeats.const import (
+    CONF_CLIP_DURATION,
+    CONF_MEDIA_PLAYER,
+    DEFAULT_TARGET_SKEW,
+    DOMAIN,
+)
+from custom_components.soundbeats.game_manager import GameManager
+from custom_components.soundbeats.media_controller import MediaController
+from custom_components.soundbeats.media_player import SIMULATION_PROFILES, MockMediaPlayer
+from custom_components.soundbeats.models import Song
+from custom_components.soundbeats.song_catalog import CatalogIndex
+
+CLIP_DURATION = 30.0
+
+
+class FakeClock:
+    """Loop stand-in whose time only moves when a test moves it."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Initialize the clock."""
+        self.now = 1000.0
+        self.timers = []
+        self._loop = loop
+
+    def time(self) -> float:
+        """Return the current time."""
+        return self.now
+
+    def call_at(self, when, callback, *args):
+        """Record a timer instead of scheduling it."""
+        handle = MagicMock()
+        handle.when.return_value = when
+        self.timers.append((when, callback))
+        return handle
+
+    def create_future(self) -> asyncio.Future:
+        """Create a future on the real loop."""
+        return self._loop.create_future()
+
+
+async def _player_call(player: MockMediaPlayer, service: str, data: dict) -> None:
+    """Send a media player service call to a mock player."""
+    if service == SERVICE_PLAY_MEDIA:
+        await player.async_play_media(data[ATTR_MEDIA_CONTENT_TYPE], data[ATTR_MEDIA_CONTENT_ID])
+    elif service == SERVICE_MEDIA_PLAY:
+        await player.async_media_play()
+    elif service == SERVICE_MEDIA_PAUSE:
+        await player.async_media_pause()
+    elif service == SERVICE_MEDIA_STOP:
+        await player.async_media_stop()
+    elif service == SERVICE_VOLUME_MUTE:
+        await player.async_mute_volume(data[ATTR_MEDIA_VOLUME_MUTED])
+    elif service == SERVICE_VOLUME_SET:
+        await player.async_set_volume_level(data[ATTR_MEDIA_VOLUME_LEVEL])
+
+
+def _make_controller(latencies: dict[str, float]):
+    """Return a controller driving mock players on a fake clock.
+
+    Each player reports its new state ``latencies[entity_id]`` seconds after
+    a command, without the clock moving.
+    """
+    clock = FakeClock(asyncio.get_running_loop())
+    hass = MagicMock()
+    hass.loop = clock
+    hass.data = {DOMAIN: {"test_entry": {}}}
+    hass.async_create_background_task.side_effect = (
+        lambda coro, name, **kwargs: asyncio.get_running_loop().create_task(coro)
+    )
+
+    players = {}
+    for entity_id in latencies:
+        player = players[entity_id] = MockMediaPlayer("test_entry", profile=SIMULATION_PROFILES["instant"])
+        player.hass = hass
+        player.async_write_ha_state = MagicMock()
+
+    def _state(entity_id):
+        player = players[entity_id]
+        return SimpleNamespace(
+            state=player.state,
+            attributes={
+                ATTR_SUPPORTED_FEATURES: player.supported_features,
+                ATTR_MEDIA_CONTENT_ID: player.media_content_id,
+            },
+        )
+
+    hass.states.get.side_effect = _state
+
+    entry = MagicMock(
+        entry_id="test_entry",
+        data={CONF_MEDIA_PLAYER: list(latencies), CONF_CLIP_DURATION: CLIP_DURATION},
+        options={},
+    )
+    songs = {1: Song(id=1, title="Song", artist="Artist", year=1985, media_id="song-1")}
+    catalog = MagicMock()
+    catalog.async_ensure_loaded = AsyncMock()
+    catalog.index_for.return_value = CatalogIndex.build(1, songs, {})
+    controller = MediaController(hass, entry, catalog)
+
+    async def _call(self, service, entity_id, data=None):
+        await _player_call(players[entity_id], service, data or {})
+
+    async def _call_and_wait(self, entity_id, service, data, timeout, states=(MediaPlayerState.PLAYING,)):
+        await _player_call(players[entity_id], service, data)
+        if players[entity_id].state in states:
+            return clock.now + latencies[entity_id]
+        return None
+
+    patches = (
+        patch.object(MediaController, "_async_call", _call),
+        patch.object(MediaController, "_async_call_and_wait", _call_and_wait),
+        patch(
+            "custom_components.soundbeats.media_controller.media_source.is_media_source_id",
+            return_value=False,
+        ),
+    )
+    return controller, players, clock, patches
+
+
+async def test_prepared_song_starts_round() -> None:
+    """Test the song prefetched for a new game is warm-started by start_round."""
+    controller, players, clock, patches = _make_controller({"media_player.a": 0.1})
+    with patches[0], patches[1], patches[2]:
+        game_manager = GameManager(controller.hass, "test_entry", controller)
+        await game_manager.new_game(2)
+        prepared = await controller._prefetch_task
+        assert prepared.warmed == {"media_player.a"}
+        assert players["media_player.a"].state == MediaPlayerState.PAUSED
+
+        with patch.object(
+            controller, "async_start_playback", wraps=controller.async_start_playback
+        ) as start_playback:
+            game_round = await game_manager.start_round()
+        start_playback.assert_called_once_with(prepared)
+        assert game_round.song_id == prepared.song.id
+        await asyncio.gather(*[
+            task for task in asyncio.all_tasks() if task is not asyncio.current_task()
+        ])
+
+    player = players["media_player.a"]
+    assert player.state == MediaPlayerState.PLAYING
+    assert player.command_counts["play_media"] == 1  # only the pre-roll
+    assert player.command_counts["media_play"] == 1
+    assert controller.stats["warm_starts"] == 1
+    assert clock.timers[-1][0] == pytest.approx(clock.now + 0.1 + CLIP_DURATION)
+
+
+async def test_clip_stops_at_deadline_minus_lead() -> None:
+    """Test the stop is sent early by the learned stop lead."""
+    controller, players, clock, patches = _make_controller({"media_player.a": 0.2})
+    scheduler = controller.clip_scheduler
+    with patches[0], patches[1], patches[2]:
+        await players["media_player.a"].async_play_media("music", "song-1")
+        scheduler.async_schedule(["media_player.a"], 100.0, 1)
+        when, fire = clock.timers[-1]
+        assert when == 100.0 + CLIP_DURATION
+
+        clock.now = when
+        fire()
+        await asyncio.gather(*[
+            task for task in asyncio.all_tasks() if task is not asyncio.current_task()
+        ])
+        assert players["media_player.a"].state == MediaPlayerState.PAUSED
+        assert scheduler.stats["last_length"] == pytest.approx(CLIP_DURATION + 0.2)
+
+        # Half of the observed 200 ms lag is learned as lead
+        scheduler.async_schedule(["media_player.a"], 200.0, 1)
+        assert clock.timers[-1][0] == pytest.approx(200.0 + CLIP_DURATION - 0.1)
+
+
+async def test_group_starts_within_stagger() -> None:
+    """Test faster players are held back so the group starts together."""
+    latencies = {"media_player.slow": 0.4, "media_player.fast": 0.1}
+    controller, players, clock, patches = _make_controller(latencies)
+    group = controller.playback_group
+    commands = {
+        entity_id: (SERVICE_PLAY_MEDIA, {ATTR_MEDIA_CONTENT_ID: "song-1", ATTR_MEDIA_CONTENT_TYPE: "music"})
+        for entity_id in latencies
+    }
+    delays = []
+
+    async def _sleep(delay):
+        delays.append(delay)
+        clock.now += delay
+
+    with patches[0], patches[1], patches[2], patch(
+        "custom_components.soundbeats.media_controller.asyncio.sleep", _sleep
+    ):
+        # The first start learns the latencies and misses the target
+        await group.async_start(commands)
+        assert group.stats["skew_misses"] == 1
+        assert delays == []
+
+        reached = await group.async_start(commands)
+
+    assert delays == [pytest.approx(0.3)]
+    assert max(reached.values()) - min(reached.values()) <= DEFAULT_TARGET_SKEW
+    assert group.stats["skew_misses"] == 1
+    assert group.stats["last_skew"] <= DEFAULT_TARGET_SKEW
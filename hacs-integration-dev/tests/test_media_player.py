@@ -0,0 +1,125 @@
+"""Test the Soundbeats mock media player simulation."""
+import random
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.components.media_player import MediaPlayerState
+from homeassistant.core import HomeAssistant
+
+from custom_components.soundbeats.media_player import (
+    SIMULATION_PROFILES,
+    MockMediaPlayer,
+    SimulationProfile,
+    parse_latencies,
+)
+
+
+@pytest.fixture
+def make_player(hass: HomeAssistant):
+    """Create mock players that do not need to be added to hass."""
+    def _make_player(profile: SimulationProfile) -> MockMediaPlayer:
+        player = MockMediaPlayer("test_entry", profile=profile, seed=1)
+        player.hass = hass
+        player.async_write_ha_state = MagicMock()
+        return player
+    return _make_player
+
+
+def test_parse_latencies():
+    """Test parsing the mock latency option."""
+    assert parse_latencies("0") == [0.0]
+    assert parse_latencies("0.1, 0.4,") == [0.1, 0.4]
+    with pytest.raises(ValueError):
+        parse_latencies("")
+    with pytest.raises(ValueError):
+        parse_latencies("-1")
+
+
+def test_sample_latency_is_never_negative():
+    """Test that jitter never produces a negative latency."""
+    profile = SimulationProfile(latency_mean=0.01, latency_jitter=1.0)
+    rng = random.Random(0)
+    assert all(profile.sample_latency(rng) >= 0 for _ in range(1000))
+    assert SIMULATION_PROFILES["instant"].sample_latency(rng) == 0
+
+
+async def test_commands_are_counted(make_player):
+    """Test that every command is counted."""
+    player = make_player(SIMULATION_PROFILES["instant"])
+
+    await player.async_play_media("music", "spotify:track:1")
+    await player.async_media_pause()
+    await player.async_media_play()
+
+    assert player.state == MediaPlayerState.PLAYING
+    assert player.media_content_id == "spotify:track:1"
+    assert player.command_counts == {"play_media": 1, "media_pause": 1, "media_play": 1}
+    assert player.extra_state_attributes["commands_received"] == 3
+
+
+async def test_dropped_commands_have_no_effect(make_player):
+    """Test that dropped commands are counted but ignored."""
+    player = make_player(SimulationProfile(drop_rate=1.0))
+
+    await player.async_play_media("music", "spotify:track:1")
+
+    assert player.state == MediaPlayerState.IDLE
+    assert player.dropped_commands == 1
+    assert player.command_counts["play_media"] == 1
+
+
+async def test_every_command_can_be_dropped(make_player):
+    """Test that volume, mute, seek and track commands go through the simulation."""
+    player = make_player(SimulationProfile(drop_rate=1.0))
+
+    await player.async_set_volume_level(0.2)
+    await player.async_mute_volume(True)
+    await player.async_volume_up()
+    await player.async_media_seek(30)
+    await player.async_media_next_track()
+
+    assert player.volume_level == 0.5
+    assert player.is_volume_muted is False
+    assert player.dropped_commands == 5
+    player.async_write_ha_state.assert_not_called()
+
+
+async def test_seek_moves_position(make_player):
+    """Test seeking while paused reports the new position."""
+    player = make_player(SIMULATION_PROFILES["instant"])
+    player.hass = MagicMock()
+    player.hass.loop.time.side_effect = [100.0, 110.0]
+
+    await player.async_play_media("music", "spotify:track:1")
+    await player.async_media_pause()
+    await player.async_media_seek(0)
+
+    assert player.media_position == 0
+    assert player.command_counts["media_seek"] == 1
+
+
+async def test_buffering_before_playing(make_player):
+    """Test that new media passes through buffering."""
+    player = make_player(SimulationProfile(buffering_delay=0.01))
+    states = []
+    player.async_write_ha_state.side_effect = lambda: states.append(player.state)
+
+    await player.async_play_media("music", "spotify:track:1")
+
+    assert states == [MediaPlayerState.BUFFERING, MediaPlayerState.PLAYING]
+
+
+async def test_state_written_on_changes_only(make_player):
+    """Test playback writes state on state changes, not as time passes."""
+    player = make_player(SIMULATION_PROFILES["instant"])
+    player.hass = MagicMock()
+    player.hass.loop.time.side_effect = [100.0, 130.0]
+
+    await player.async_play_media("music", "spotify:track:1")
+    assert player.async_write_ha_state.call_count == 1
+    assert player.media_position == 0
+
+    await player.async_media_pause()
+    assert player.async_write_ha_state.call_count == 2
+    assert player.media_position == 30
+    assert "command_counts" in player._unrecorded_attributes
@@ -0,0 +1,38 @@
+"""Test the Soundbeats panel assets."""
+import json
+
+from custom_components.soundbeats.panel import PANEL_ENTRY, _scan_dist, _select
+
+
+def test_scan_dist_hashed(tmp_path) -> None:
+    """Test the panel entry comes from the build manifest."""
+    (tmp_path / ".vite").mkdir()
+    (tmp_path / ".vite" / "manifest.json").write_text(
+        json.dumps(
+            {"src/soundbeats-panel.ts": {"file": "soundbeats-panel.Ab12_-yz.js", "isEntry": True}}
+        )
+    )
+    for name in ("soundbeats-panel.Ab12_-yz.js", "soundbeats-panel.Ab12_-yz.js.gz"):
+        (tmp_path / name).write_text("x")
+
+    assets, entry = _scan_dist(tmp_path)
+    assert entry == "soundbeats-panel.Ab12_-yz.js"
+    assert set(assets) == {entry}
+    assert set(assets[entry]) == {"identity", "gzip"}
+
+
+def test_scan_dist_without_manifest(tmp_path) -> None:
+    """Test an unhashed build still loads."""
+    (tmp_path / PANEL_ENTRY).write_text("x")
+    assets, entry = _scan_dist(tmp_path)
+    assert entry == PANEL_ENTRY
+    assert set(assets[entry]) == {"identity"}
+
+
+def test_select_encoding(tmp_path) -> None:
+    """Test the smallest accepted encoding is served."""
+    variants = {"identity": tmp_path / "a.js", "gzip": tmp_path / "a.js.gz", "br": tmp_path / "a.js.br"}
+    assert _select(variants, "gzip, deflate, br")[0] == "br"
+    assert _select(variants, "gzip, br;q=0")[0] == "gzip"
+    assert _select(variants, "")[0] == "identity"
+    assert _select({"identity": variants["identity"]}, "br")[0] == "identity"
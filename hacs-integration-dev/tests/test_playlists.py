@@ -0,0 +1,119 @@
+"""Test the Soundbeats constraint playlists."""
+from collections import Counter
+import random
+
+from custom_components.soundbeats.models import Song
+from custom_components.soundbeats.playlists import (
+    AliasTable,
+    ConstraintChecker,
+    PlaylistRules,
+)
+from custom_components.soundbeats.song_catalog import CatalogIndex
+
+
+def _songs() -> dict[int, Song]:
+    """Return 8 songs per year from 1970 to 1999, 4 artists per year."""
+    songs = {}
+    for year in range(1970, 2000):
+        for n in range(8):
+            song_id = len(songs) + 1
+            songs[song_id] = Song(
+                id=song_id,
+                title=f"Song {song_id}",
+                artist=f"Artist {year}-{n % 4}",
+                year=year,
+                media_id=str(song_id),
+            )
+    return songs
+
+
+def test_alias_table_follows_weights() -> None:
+    """Test draws follow the weights."""
+    table = AliasTable([1.0, 0.0, 3.0])
+    rng = random.Random(0)
+    counts = Counter(table.sample(rng) for _ in range(20000))
+    assert counts[1] == 0
+    assert 2.7 < counts[2] / counts[0] < 3.3
+
+
+def test_rules_from_dict() -> None:
+    """Test parsing a playlist definition."""
+    rules = PlaylistRules.from_dict(
+        {"year_min": 1975, "balance": "decade", "decade_weights": {"1980": 2}}
+    )
+    assert rules.year_min == 1975
+    assert rules.year_max is None
+    assert rules.decade_weights == {1980: 2.0}
+
+
+def test_constraint_playlist_respects_rules() -> None:
+    """Test year range, artist gap and decade balance."""
+    songs = _songs()
+    rules = PlaylistRules(year_min=1975, year_max=1994, artist_gap=10, balance="decade")
+    index = CatalogIndex.build(1, songs, {}, {"classics": rules})
+    playlist = index.dynamic_playlists["classics"]
+    assert len(playlist) == 20 * 8
+
+    played: list[int] = []
+    decades: Counter[int] = Counter()
+    rng = random.Random(1)
+    for _ in range(100):
+        song = playlist.pick_song(played, rng)
+        assert song is not None
+        assert 1975 <= song.year <= 1994
+        assert song.id not in played
+        recent = {songs[song_id].artist for song_id in played[-10:]}
+        assert song.artist not in recent
+        played.append(song.id)
+        decades[song.year // 10 * 10] += 1
+
+    # 1975-1979 holds a quarter of the songs but a third of the draws
+    assert decades[1970] > 25
+
+
+def test_constraint_playlist_exhausted() -> None:
+    """Test the artist gap is relaxed before the playlist runs dry."""
+    songs = _songs()
+    index = CatalogIndex.build(
+        1, songs, {}, {"one_year": PlaylistRules(year_min=1980, year_max=1980, artist_gap=10)}
+    )
+    played: list[int] = []
+    for _ in range(8):
+        song = index.pick_song("one_year", played)
+        assert song is not None
+        played.append(song.id)
+    assert index.pick_song("one_year", played) is None
+
+
+def test_checker_is_incremental() -> None:
+    """Test a game's checker folds in new songs and expires old artists."""
+    songs = _songs()
+    checker = ConstraintChecker(PlaylistRules(artist_gap=2), songs)
+    played = [1, 2]
+    checker.sync(played)
+    assert not checker.accepts(songs[1])
+    assert not checker.accepts(songs[5])  # same artist as song 1
+
+    played += [3, 4]
+    checker.sync(played)
+    assert not checker.unplayed(songs[1])
+    assert checker.accepts(songs[5])  # song 1 left the artist window
+    assert not checker.accepts(songs[7])  # same artist as song 3
+
+    checker.sync([9])
+    assert checker.unplayed(songs[1])
+
+
+def test_pick_song_with_game_checker() -> None:
+    """Test draws with a kept checker follow the rules."""
+    songs = _songs()
+    index = CatalogIndex.build(1, songs, {}, {"gap": PlaylistRules(artist_gap=10)})
+    checker = index.checker("gap")
+    assert index.checker("unknown") is None
+
+    played: list[int] = []
+    for _ in range(50):
+        song = index.pick_song("gap", played, checker)
+        assert song is not None
+        assert song.artist not in {songs[song_id].artist for song_id in played[-10:]}
+        played.append(song.id)
@@ -0,0 +1,64 @@
+"""Test the Soundbeats rate limiter."""
+from custom_components.soundbeats.const import RATE_LIMIT_CONNECTION, RATE_LIMIT_TEAM
+from custom_components.soundbeats.rate_limit import MAX_TEAM_BUCKETS, RateLimiter, TokenBucket
+
+TEAMS = {"team_1", "team_2"}
+
+
+def test_token_bucket_refills() -> None:
+    """Test a bucket allows a burst and then its refill rate."""
+    bucket = TokenBucket(2, 1.0, updated=0.0)
+    assert bucket.take(0.0)
+    assert bucket.take(0.0)
+    assert not bucket.take(0.0)
+    assert not bucket.take(0.5)
+    assert bucket.take(1.0)
+    assert bucket.take(10.0)
+    assert bucket.take(10.0)
+    assert not bucket.take(10.0)
+
+
+def test_connection_limit() -> None:
+    """Test a flooding connection is rejected without affecting others."""
+    limiter = RateLimiter(TEAMS.__contains__)
+    burst = RATE_LIMIT_CONNECTION[0]
+    assert all(limiter.allow(1, None, now=0.0) for _ in range(burst))
+    assert not limiter.allow(1, None, now=0.0)
+    assert limiter.allow(2, None, now=0.0)
+    assert limiter.counters["rejected_connection"] == 1
+
+    limiter.forget_connection(1)
+    assert limiter.allow(1, None, now=0.0)
+    assert limiter.stats["connections"] == 2
+
+
+def test_team_limit() -> None:
+    """Test a team is limited across connections."""
+    limiter = RateLimiter(TEAMS.__contains__)
+    burst = RATE_LIMIT_TEAM[0]
+    for connection in range(burst):
+        assert limiter.allow(connection, "team_1", now=0.0)
+    assert not limiter.allow(99, "team_1", now=0.0)
+    assert limiter.allow(99, "team_2", now=0.0)
+    assert limiter.counters["rejected_team"] == 1
+
+
+def test_rotating_team_ids() -> None:
+    """Test made-up team ids neither evict real teams nor bypass their limit."""
+    limiter = RateLimiter(TEAMS.__contains__)
+    burst = RATE_LIMIT_TEAM[0]
+    for connection in range(burst):
+        assert limiter.allow(connection, "team_1", now=0.0)
+
+    # Each made-up id comes from a fresh connection, so none is limited
+    for n in range(MAX_TEAM_BUCKETS + 1):
+        assert limiter.allow(1000 + n, f"fake_{n}", now=0.0)
+    assert limiter.stats["teams"] == 1
+    assert limiter.counters["unknown_team"] == MAX_TEAM_BUCKETS + 1
+
+    assert not limiter.allow(99, "team_1", now=0.0)
+
+    # A connection rotating ids still runs out of its own tokens
+    burst = RATE_LIMIT_CONNECTION[0]
+    assert all(limiter.allow(5000, f"fake_{n}", now=0.0) for n in range(burst))
+    assert not limiter.allow(5000, "fake_new", now=0.0)
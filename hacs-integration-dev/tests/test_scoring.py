@@ -0,0 +1,46 @@
+"""Test the Soundbeats scoring rules."""
+import pytest
+import voluptuous as vol
+
+from custom_components.soundbeats.scoring import ScoringRules
+
+
+def test_default_tables() -> None:
+    """Test the default rules compile to 10/5/2 points."""
+    rules = ScoringRules.compile()
+    assert rules.points == (10, 5, 5, 5, 2, 2)
+    assert rules.score(0, False, 0, False) == 10
+    assert rules.score(3, False, 0, False) == 5
+    assert rules.score(5, False, 0, False) == 2
+    assert rules.score(6, False, 0, False) == 0
+    assert rules.score(40, False, 0, False) == 0
+
+
+def test_multipliers() -> None:
+    """Test bet, streak and comeback multipliers."""
+    rules = ScoringRules.compile()
+    assert rules.score(0, True, 0, False) == 20
+    assert rules.score(1, True, 0, False) == 0
+    assert rules.score(0, False, 2, False) == 10
+    assert rules.score(0, False, 3, False) == 15
+    assert rules.score(0, False, 7, False) == 15
+    assert rules.score(3, False, 0, True) == 15
+
+
+def test_comeback_rounds() -> None:
+    """Test comeback rounds need enough teams."""
+    rules = ScoringRules.compile()
+    assert rules.is_comeback_round(5, 3)
+    assert not rules.is_comeback_round(4, 3)
+    assert not rules.is_comeback_round(5, 2)
+    assert not ScoringRules.compile({"comeback": {"every": 0}}).is_comeback_round(5, 3)
+
+
+def test_custom_rules() -> None:
+    """Test custom rules and validation."""
+    rules = ScoringRules.compile({"points": [[1, 3]], "bet": {"miss_multiplier": 1}})
+    assert rules.points == (3, 3)
+    assert rules.score(1, True, 0, False) == 3
+
+    with pytest.raises(vol.Invalid):
+        ScoringRules.compile({"points": [[-1, 3]]})
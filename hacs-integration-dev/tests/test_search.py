@@ -0,0 +1,38 @@
+"""Test the Soundbeats fuzzy song search."""
+from custom_components.soundbeats.models import Song
+from custom_components.soundbeats.search import TrigramIndex, normalize
+
+SONGS = [
+    Song(id=1, title="Dancing Queen", artist="ABBA", year=1976, media_id="a"),
+    Song(id=2, title="Waterloo", artist="ABBA", year=1974, media_id="b"),
+    Song(id=3, title="Bohemian Rhapsody", artist="Queen", year=1975, media_id="c"),
+    Song(id=4, title="Déjà Vu", artist="Beyoncé", year=2006, media_id="d"),
+]
+
+
+def test_normalize() -> None:
+    """Test accents and punctuation are stripped."""
+    assert normalize("  Déjà-Vu!  ") == "deja vu"
+
+
+def test_search_ranks_exact_match_first() -> None:
+    """Test the best matching song comes first."""
+    index = TrigramIndex.build(SONGS)
+    results = index.search("queen rhapsody")
+    assert results[0] == (3, 1.0)
+    assert [song_id for song_id, _ in results] == [3, 1]
+
+
+def test_search_tolerates_typos() -> None:
+    """Test misspelled queries still find the song."""
+    index = TrigramIndex.build(SONGS)
+    assert index.search("dancng quen")[0][0] == 1
+    assert index.search("beyonce deja")[0][0] == 4
+
+
+def test_search_limit_and_no_match() -> None:
+    """Test the result limit and queries without matches."""
+    index = TrigramIndex.build(SONGS)
+    assert len(index.search("abba", limit=1)) == 1
+    assert index.search("zzzz") == []
+    assert index.search("") == []
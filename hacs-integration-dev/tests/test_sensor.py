@@ -0,0 +1,61 @@
+"""Test the Soundbeats sensors."""
+from unittest.mock import MagicMock, patch
+
+from custom_components.soundbeats.const import SENSOR_MIN_UPDATE_INTERVAL
+from custom_components.soundbeats.sensor import CurrentRoundSensor, FinalScoreSensor
+
+MODULE = "custom_components.soundbeats.sensor"
+
+
+def _state(current_round: int, is_active: bool = True, score: int = 0) -> dict:
+    """Return a game state broadcast."""
+    return {
+        "game_id": "game",
+        "is_active": is_active,
+        "current_round": current_round,
+        "round_count": current_round,
+        "teams": [{"id": "team", "name": "Team 1", "score": score}],
+    }
+
+
+def _sensor(sensor_class):
+    """Return a sensor whose writes and timers are recorded."""
+    sensor = sensor_class("test_entry", MagicMock())
+    sensor.hass = MagicMock()
+    sensor.async_write_ha_state = MagicMock()
+    return sensor
+
+
+def test_burst_is_coalesced() -> None:
+    """Test a burst of updates is written once, with the latest value."""
+    sensor = _sensor(CurrentRoundSensor)
+    with patch(f"{MODULE}.time.monotonic", return_value=100.0), patch(
+        f"{MODULE}.async_call_later"
+    ) as call_later:
+        sensor._async_handle_game_state(_state(1))
+        assert sensor.async_write_ha_state.call_count == 1
+
+        for current_round in range(2, 7):
+            sensor._async_handle_game_state(_state(current_round))
+        call_later.assert_called_once()
+        assert call_later.call_args.args[1] == SENSOR_MIN_UPDATE_INTERVAL
+        assert sensor.async_write_ha_state.call_count == 1
+
+        call_later.call_args.args[2](None)
+    assert sensor.async_write_ha_state.call_count == 2
+    assert sensor._attr_native_value == 6
+
+
+def test_unchanged_state_is_not_written() -> None:
+    """Test broadcasts that leave the value unchanged cause no write."""
+    sensor = _sensor(FinalScoreSensor)
+    with patch(f"{MODULE}.time.monotonic", return_value=100.0), patch(
+        f"{MODULE}.async_call_later"
+    ) as call_later:
+        sensor._async_handle_game_state(_state(3, is_active=False, score=12))
+        sensor._async_handle_game_state(_state(1, score=0))
+        sensor._async_handle_game_state(_state(3, is_active=False, score=12))
+    call_later.assert_not_called()
+    sensor.async_write_ha_state.assert_called_once()
+    assert sensor._attr_native_value == 12
+    assert getattr(sensor, "_attr_state_class", None) is None
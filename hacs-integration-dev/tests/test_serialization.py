@@ -0,0 +1,82 @@
+"""Test the Soundbeats storage layout."""
+import json
+
+import pytest
+
+from custom_components.soundbeats.models import ArchivedRounds, GameRound, GameState, Team
+from custom_components.soundbeats.serialization import (
+    SCHEMA_VERSION,
+    compress_rounds,
+    decode_game,
+    encode_game,
+)
+
+
+def _game() -> GameState:
+    """Return a game with every field set."""
+    teams = [Team(name="Red", score=12, current_guess=1984, has_bet=True, streak=2), Team(name="Blue")]
+    rounds = [
+        GameRound(
+            round_number=number,
+            song_id=number,
+            team_guesses={teams[0].id: 1980 + number},
+            team_bets={teams[0].id: True},
+            team_scores={teams[0].id: 5, teams[1].id: 0},
+            actual_year=1985,
+            guesses_locked=True,
+        )
+        for number in range(1, 4)
+    ]
+    return GameState(
+        teams=teams,
+        current_round=4,
+        rounds_played=rounds,
+        playlist_id="80s",
+        played_song_ids=[1, 2, 3],
+        active_round=GameRound(round_number=4, song_id=9),
+        difficulty="hard",
+        large_teams=True,
+        reveal={"rank_changes": {teams[0].id: 1}},
+    )
+
+
+def test_round_trip() -> None:
+    """Test every field survives storage."""
+    game = _game()
+    stored = json.loads(json.dumps(encode_game(game)))
+    assert stored["schema"] == SCHEMA_VERSION
+    assert decode_game(stored) == game
+
+
+def test_round_trip_archived() -> None:
+    """Test archived rounds are stored compressed and restored exactly."""
+    game = _game()
+    old = game.rounds_played[:2]
+    game.rounds_played = game.rounds_played[2:]
+    game.archived_rounds = ArchivedRounds().add_block(compress_rounds(old), old)
+    restored = decode_game(json.loads(json.dumps(encode_game(game))))
+    assert restored == game
+    assert restored.round_count == 3
+    assert restored.round_totals() == _game().round_totals()
+
+
+def test_migrate_to_dict_layout() -> None:
+    """Test games stored as dictionaries are restored."""
+    game = _game()
+    assert decode_game(json.loads(json.dumps(game.to_dict()))) == game
+
+    restored = decode_game({"teams": [{"id": "a", "name": "A", "score": 3}], "rounds_played": [{"round_number": 1}]})
+    assert restored.teams == [Team(id="a", name="A", score=3)]
+    assert restored.rounds_played[0].round_number == 1
+
+
+def test_unknown_schema() -> None:
+    """Test layouts from newer versions are rejected."""
+    with pytest.raises(ValueError):
+        decode_game({"schema": SCHEMA_VERSION + 1})
+
+
+def test_from_dict_keeps_timestamp() -> None:
+    """Test restoring a round from a dictionary keeps its timestamp."""
+    game_round = GameRound(round_number=1)
+    assert GameRound.from_dict(game_round.to_dict()).timestamp == game_round.timestamp
@@ -0,0 +1,99 @@
+"""Test the Soundbeats song catalog."""
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.soundbeats.const import SONG_CATALOG_FILE
+from custom_components.soundbeats.song_catalog import SongCatalog, _read_catalog_file
+
+MODULE = "custom_components.soundbeats.song_catalog"
+
+
+def _write_catalog(path, *titles: str) -> None:
+    """Write a catalog file with one song per title."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    songs = [
+        {"id": n, "title": title, "artist": "Artist", "year": 1980 + n, "media_id": str(n)}
+        for n, title in enumerate(titles, 1)
+    ]
+    path.write_text(json.dumps({"songs": songs, "playlists": {"all": list(range(1, 10))}}))
+
+
+def _catalog(hass: HomeAssistant, tmp_path) -> SongCatalog:
+    """Return a catalog reading from tmp_path."""
+    with patch.object(hass.config, "path", lambda *parts: str(tmp_path.joinpath(*parts))):
+        return SongCatalog(hass)
+
+
+async def test_loaded_lazily_once(hass: HomeAssistant, tmp_path) -> None:
+    """Test the file is read on first use only, once for concurrent callers."""
+    _write_catalog(tmp_path / SONG_CATALOG_FILE, "One", "Two")
+    with patch(f"{MODULE}._read_catalog_file", wraps=_read_catalog_file) as read:
+        catalog = _catalog(hass, tmp_path)
+        assert len(catalog) == 0
+        read.assert_not_called()
+
+        await asyncio.gather(catalog.async_ensure_loaded(), catalog.async_ensure_loaded())
+        await catalog.async_ensure_loaded()
+    read.assert_called_once()
+    assert len(catalog) == 2
+    assert catalog.get_playlists() == ["all"]
+
+
+async def test_reload_keeps_leased_index(hass: HomeAssistant, tmp_path) -> None:
+    """Test a running game keeps its index while new games get the reloaded one."""
+    path = tmp_path / SONG_CATALOG_FILE
+    _write_catalog(path, "One", "Two")
+    catalog = _catalog(hass, tmp_path)
+    await catalog.async_ensure_loaded()
+    running = catalog.index_for("running")
+
+    _write_catalog(path, "Uno", "Dos", "Tres")
+    await catalog.async_load()
+
+    assert catalog.index_for("running") is running
+    assert running.get_song(1).title == "One"
+    assert len(running) == 2
+
+    new = catalog.index_for("new")
+    assert new.version > running.version
+    assert new.get_song(1).title == "Uno"
+    assert len(new) == 3
+    assert catalog.stats["leased_versions"] == [running.version, new.version]
+
+    catalog.release("running")
+    assert catalog.stats["leased_versions"] == [new.version]
+
+
+async def test_malformed_catalog_is_skipped(hass: HomeAssistant, tmp_path) -> None:
+    """Test a catalog that is not an object or has bad playlists does not fail loading."""
+    path = tmp_path / SONG_CATALOG_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("[]")
+    catalog = _catalog(hass, tmp_path)
+    await catalog.async_ensure_loaded()
+    assert len(catalog) == 0
+
+    _write_catalog(path, "One")
+    data = json.loads(path.read_text())
+    data["playlists"]["broken"] = 5
+    path.write_text(json.dumps(data))
+    await catalog.async_load()
+    assert len(catalog) == 1
+    assert catalog.get_playlists() == ["all"]
+
+
+async def test_failed_load_is_retried(hass: HomeAssistant, tmp_path) -> None:
+    """Test a failed first load is not cached for later callers."""
+    _write_catalog(tmp_path / SONG_CATALOG_FILE, "One")
+    catalog = _catalog(hass, tmp_path)
+    with patch(f"{MODULE}._read_catalog_file", side_effect=RuntimeError("boom")):
+        with pytest.raises(RuntimeError):
+            await catalog.async_ensure_loaded()
+
+    await catalog.async_ensure_loaded()
+    assert len(catalog) == 1
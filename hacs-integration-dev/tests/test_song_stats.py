@@ -0,0 +1,56 @@
+"""Test the Soundbeats per-song statistics."""
+import random
+
+from custom_components.soundbeats.song_stats import (
+    DIFFICULTY_EASY,
+    DIFFICULTY_HARD,
+    SongStats,
+    TDigest,
+)
+
+
+def test_tdigest_quantiles() -> None:
+    """Test quantiles stay close to the exact ones in bounded memory."""
+    rng = random.Random(0)
+    values = [rng.expovariate(0.2) for _ in range(10000)]
+    digest = TDigest()
+    for value in values:
+        digest.add(value)
+
+    values.sort()
+    for q in (0.1, 0.5, 0.9, 0.99):
+        exact = values[int(q * len(values))]
+        assert abs(digest.quantile(q) - exact) <= 0.05 * exact + 0.1
+    assert len(digest.to_list()) < 200
+
+
+def test_tdigest_roundtrip() -> None:
+    """Test a digest survives its compact form."""
+    digest = TDigest()
+    for value in (0, 1, 1, 2, 10):
+        digest.add(value)
+    restored = TDigest(centroids=digest.to_list())
+    assert restored.count == 5
+    assert restored.quantile(0.5) == digest.quantile(0.5)
+    assert TDigest().quantile(0.5) is None
+
+
+def test_song_stats_difficulty() -> None:
+    """Test difficulty follows the mean error once enough guesses exist."""
+    stats = SongStats()
+    stats.add(0)
+    stats.add(2)
+    assert stats.difficulty is None
+
+    stats.add(1)
+    assert stats.mean_error == 1.0
+    assert stats.hit_rate == 1 / 3
+    assert stats.difficulty == DIFFICULTY_EASY
+
+    for _ in range(3):
+        stats.add(20)
+    assert stats.difficulty == DIFFICULTY_HARD
+
+    restored = SongStats.from_list(stats.to_list())
+    assert restored.guesses == 6
+    assert restored.difficulty == DIFFICULTY_HARD
@@ -0,0 +1,65 @@
+"""Test the Soundbeats subscription registry."""
+from unittest.mock import MagicMock, patch
+
+from custom_components.soundbeats.const import MAX_SUBSCRIPTIONS_PER_CONNECTION
+from custom_components.soundbeats.subscriptions import SubscriptionRegistry
+
+
+def _start(registry: SubscriptionRegistry) -> MagicMock:
+    """Start the registry with a mocked dispatcher."""
+    unsub_dispatcher = MagicMock()
+    with patch(
+        "custom_components.soundbeats.subscriptions.async_dispatcher_connect",
+        return_value=unsub_dispatcher,
+    ):
+        registry.async_start()
+    return unsub_dispatcher
+
+
+def test_fan_out_and_cap() -> None:
+    """Test states reach every subscriber and each connection is capped."""
+    registry = SubscriptionRegistry(MagicMock(), "entry")
+    _start(registry)
+    connection = MagicMock(subscriptions={})
+    received = []
+    for msg_id in range(MAX_SUBSCRIPTIONS_PER_CONNECTION):
+        assert registry.async_add(connection, msg_id, received.append)
+    assert registry.async_add(connection, 99, received.append) is None
+    unsub = registry.async_add(MagicMock(subscriptions={}), 1, received.append)
+
+    registry._async_forward({"status": "playing"})
+    assert len(received) == MAX_SUBSCRIPTIONS_PER_CONNECTION + 1
+
+    unsub()
+    assert registry.stats["subscribers"] == MAX_SUBSCRIPTIONS_PER_CONNECTION
+    assert registry.stats["connections"] == 1
+    assert registry.stats["peak"] == MAX_SUBSCRIPTIONS_PER_CONNECTION + 1
+    assert registry.stats["rejected_cap"] == 1
+
+
+def test_shutdown_drops_everything() -> None:
+    """Test unloading removes subscriptions from their connections."""
+    registry = SubscriptionRegistry(MagicMock(), "entry")
+    unsub_dispatcher = _start(registry)
+    connection = MagicMock(subscriptions={})
+    connection.subscriptions[1] = registry.async_add(connection, 1, MagicMock())
+
+    registry.async_shutdown()
+    unsub_dispatcher.assert_called_once()
+    assert connection.subscriptions == {}
+    assert registry.count == 0
+    assert registry.async_add(connection, 2, MagicMock()) is None
+
+
+def test_payload_built_once_per_broadcast() -> None:
+    """Test subscribers get the payload, built once however many listen."""
+    payload = MagicMock(return_value={"teams": ["top"]})
+    registry = SubscriptionRegistry(MagicMock(), "entry", payload)
+    _start(registry)
+    received = []
+    for msg_id in range(3):
+        registry.async_add(MagicMock(subscriptions={}), msg_id, received.append)
+
+    registry._async_forward({"teams": ["top", "rest"]})
+    assert received == [{"teams": ["top"]}] * 3
+    payload.assert_called_once()
@@ -0,0 +1,28 @@
+"""Test the Soundbeats websocket API."""
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from custom_components.soundbeats.game_manager import GameManager
+from custom_components.soundbeats.websocket_api import _async_run_once
+
+
+async def test_operation_ids_are_scoped() -> None:
+    """Test commands and users sharing an operation id do not share results."""
+    game_manager = GameManager(MagicMock(), "test_entry")
+    alice = SimpleNamespace(user=SimpleNamespace(id="alice"))
+    bob = SimpleNamespace(user=SimpleNamespace(id="bob"))
+    add_team = AsyncMock(return_value="team")
+    end_round = AsyncMock(return_value="round")
+
+    add_msg = {"type": "soundbeats/add_team", "op_id": "1"}
+    end_msg = {"type": "soundbeats/end_round", "op_id": "1"}
+    assert await _async_run_once(game_manager, alice, add_msg, add_team) == "team"
+    assert await _async_run_once(game_manager, alice, end_msg, end_round) == "round"
+    end_round.assert_awaited_once()
+
+    # A retry of the same command by the same user is answered from the cache
+    assert await _async_run_once(game_manager, alice, add_msg, add_team) == "team"
+    add_team.assert_awaited_once()
+
+    await _async_run_once(game_manager, bob, add_msg, add_team)
+    assert add_team.await_count == 2